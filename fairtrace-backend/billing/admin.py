@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Wallet, Tip
+from .models import LedgerEntry, Tip, TipAggregate, Wallet, WalletSnapshot
 
 @admin.register(Wallet)
 class WalletAdmin(admin.ModelAdmin):
@@ -9,3 +9,26 @@ class WalletAdmin(admin.ModelAdmin):
 class TipAdmin(admin.ModelAdmin):
     list_display = ("tx_id", "amount", "sender", "recipient", "created_at")
     readonly_fields = ("tx_id", "created_at")
+
+
+@admin.register(LedgerEntry)
+class LedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ("id", "tx_id", "kind", "wallet", "consumer", "amount", "applied", "created_at")
+    list_filter = ("kind", "applied")
+    raw_id_fields = ("wallet", "consumer")
+
+    def has_change_permission(self, request, obj=None):
+        return False  # append-only; correct with an adjustment
+
+
+@admin.register(WalletSnapshot)
+class WalletSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("wallet", "balance", "credited", "entries", "taken_at")
+    raw_id_fields = ("wallet",)
+
+
+@admin.register(TipAggregate)
+class TipAggregateAdmin(admin.ModelAdmin):
+    list_display = ("recipient", "product", "period", "start", "total", "count", "last_tip_at")
+    list_filter = ("period",)
+    raw_id_fields = ("recipient", "product")
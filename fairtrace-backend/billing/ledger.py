@@ -0,0 +1,173 @@
+# billing/ledger.py
+"""
+Wallet ledger for tips.
+
+Every movement of money is a LedgerEntry; a tip is a debit on the sender's
+Wallet (or pre-loaded Consumer) and a credit on the farmer's Wallet, both
+carrying the Tip's tx_id. The two sides are handled differently so that a
+popular farmer can take many tips at once:
+
+- the debit is a single conditional `UPDATE ... SET balance = balance - x
+  WHERE balance >= x`. No row is read and locked up front, and two
+  concurrent tips from one account can never overdraw it;
+- the credit is only an INSERT (applied=False). The farmer's Wallet row is
+  not touched at tip time, so tips to the same farmer do not queue behind
+  each other's row lock.
+
+The `fold_ledger` task adds pending credits to Wallet.balance every
+LEDGER_FOLD_SECONDS, one UPDATE per wallet per run, and records a
+WalletSnapshot of the new balance; the same transaction adds the folded
+tips to the dashboard aggregates (billing/stats.py). `available` adds the
+credits still pending, so a farmer sees a tip immediately.
+
+Wallet.balance (and Consumer.balance) always equals the sum of the
+account's applied entries, and each tip's entries sum to zero; the
+`reconcile_ledger` command checks both.
+"""
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import stats
+from .models import Consumer, LedgerEntry, Tip, Wallet, WalletSnapshot
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0.00")
+
+
+class InsufficientFunds(Exception):
+    pass
+
+
+def _positive(amount):
+    # a negative debit would be a credit that skips the balance check
+    if amount <= 0:
+        raise ValueError(f"Ledger amounts must be positive, got {amount}")
+
+
+def _account(account):
+    return {"consumer": account} if isinstance(account, Consumer) else {"wallet": account}
+
+
+def debit(account, amount, tx_id, kind="tip"):
+    """
+    Take `amount` off `account` (a Wallet or Consumer) in one conditional
+    UPDATE, or raise InsufficientFunds. Call inside a transaction.
+    """
+    _positive(amount)
+    if not type(account).objects.filter(pk=account.pk, balance__gte=amount).update(balance=F("balance") - amount):
+        raise InsufficientFunds
+    return LedgerEntry.objects.create(tx_id=tx_id, amount=-amount, kind=kind, **_account(account))
+
+
+def credit(wallet, amount, tx_id, kind="tip"):
+    """Queue `amount` for `wallet`; `fold` adds it to the balance."""
+    _positive(amount)
+    return LedgerEntry.objects.create(tx_id=tx_id, wallet=wallet, amount=amount, kind=kind, applied=False)
+
+
+def tip(source, recipient_wallet, amount, **fields):
+    """
+    Move `amount` from `source` to `recipient_wallet` and record the Tip
+    (`fields` as for Tip, e.g. sender, consumer, note). Returns the Tip and
+    the new balance of `source`; raises InsufficientFunds.
+    """
+    with transaction.atomic():
+        tip = Tip(amount=amount, recipient_id=recipient_wallet.user_id, **fields)
+        debit(source, amount, tip.tx_id)
+        credit(recipient_wallet, amount, tip.tx_id)
+        tip.save()
+        balance = type(source).objects.filter(pk=source.pk).values_list("balance", flat=True).get()
+    return tip, balance
+
+
+def pending(wallet):
+    """Credits for `wallet` not folded into its balance yet."""
+    return LedgerEntry.objects.filter(wallet=wallet, applied=False).aggregate(
+        total=Coalesce(Sum("amount"), Value(ZERO))
+    )["total"]
+
+
+def available(wallet):
+    """The balance of `wallet` including pending credits."""
+    return wallet.balance + pending(wallet)
+
+
+def fold(batch_size=None):
+    """Add pending credits to their wallets' balances; returns how many entries were applied."""
+    batch_size = batch_size or settings.LEDGER_FOLD_BATCH_SIZE
+    applied = 0
+    while True:
+        with transaction.atomic():
+            # SKIP LOCKED: overlapping runs split the work instead of waiting
+            entries = list(
+                LedgerEntry.objects.select_for_update(skip_locked=True)
+                .filter(applied=False)
+                .order_by("id")
+                .values_list("id", "wallet_id", "amount", "tx_id", "kind")[:batch_size]
+            )
+            if not entries:
+                return applied
+            totals, counts = defaultdict(Decimal), defaultdict(int)
+            for _, wallet_id, amount, _, _ in entries:
+                totals[wallet_id] += amount
+                counts[wallet_id] += 1
+            for wallet_id in sorted(totals):  # fixed order, so concurrent folds cannot deadlock
+                Wallet.objects.filter(pk=wallet_id).update(balance=F("balance") + totals[wallet_id])
+            LedgerEntry.objects.filter(pk__in=[entry[0] for entry in entries]).update(applied=True)
+            WalletSnapshot.objects.bulk_create(
+                WalletSnapshot(wallet_id=wallet_id, balance=balance, credited=totals[wallet_id], entries=counts[wallet_id])
+                for wallet_id, balance in Wallet.objects.filter(pk__in=totals).values_list("pk", "balance")
+            )
+            # the dashboards count a tip once its credit is applied
+            stats.record(
+                Tip.objects.filter(tx_id__in=[entry[3] for entry in entries if entry[4] == "tip"])
+                .values_list("recipient_id", "product_id", "amount", "created_at")
+            )
+        applied += len(entries)
+        logger.info("Folded %s ledger credits into %s wallets", len(entries), len(totals))
+        if len(entries) < batch_size:
+            return applied
+
+
+def _drift(model):
+    """Accounts of `model` whose balance differs from their applied ledger entries, with the ledger sum."""
+    return (
+        model.objects.annotate(
+            ledger=Coalesce(Sum("ledger_entries__amount", filter=Q(ledger_entries__applied=True)), Value(ZERO))
+        )
+        .exclude(balance=F("ledger"))
+        .order_by("pk")
+    )
+
+
+def reconcile():
+    """
+    Check the ledger against the balances. Returns {"wallets": [...],
+    "consumers": [...]} of accounts whose balance is off (with a `ledger`
+    attribute holding what it should be) and "transactions": the tx_ids
+    of tips whose entries do not add up to zero.
+    """
+    unbalanced = (
+        LedgerEntry.objects.filter(kind="tip")
+        .values("tx_id")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .exclude(total=0, count=2)
+        .values_list("tx_id", flat=True)
+    )
+    return {
+        "wallets": list(_drift(Wallet)),
+        "consumers": list(_drift(Consumer)),
+        "transactions": list(unbalanced),
+    }
+
+
+def adjust(account):
+    """Record an adjustment so that `account` (from `reconcile`) matches its balance again."""
+    return LedgerEntry.objects.create(amount=account.balance - account.ledger, kind="adjustment", **_account(account))
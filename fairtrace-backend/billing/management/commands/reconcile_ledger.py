@@ -0,0 +1,45 @@
+# billing/management/commands/reconcile_ledger.py
+"""
+Check wallet and consumer balances against the tip ledger (billing/ledger.py).
+
+    python manage.py reconcile_ledger            # report, exit 1 on any mismatch
+    python manage.py reconcile_ledger --fold     # apply pending credits first
+    python manage.py reconcile_ledger --adjust   # record the differences as adjustments
+
+A balance that was changed outside the ledger (e.g. in the admin) shows up
+as a mismatch; --adjust writes an adjustment entry for it, so that later
+runs only report new differences.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from billing import ledger
+
+
+class Command(BaseCommand):
+    help = "Verify that balances equal the sums of their ledger entries and that every tip nets to zero."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fold", action="store_true", help="Fold pending credits into balances first.")
+        parser.add_argument("--adjust", action="store_true", help="Write adjustment entries for mismatched balances.")
+
+    def handle(self, *args, **options):
+        if options["fold"]:
+            self.stdout.write(f"Folded {ledger.fold()} pending credits.")
+
+        with transaction.atomic():
+            result = ledger.reconcile()
+            accounts = [("wallet", account) for account in result["wallets"]]
+            accounts += [("consumer", account) for account in result["consumers"]]
+            for kind, account in accounts:
+                self.stdout.write(f"{kind} {account.pk}: balance {account.balance}, ledger {account.ledger}")
+                if options["adjust"]:
+                    ledger.adjust(account)
+        for tx_id in result["transactions"]:
+            self.stdout.write(f"tip {tx_id}: entries do not net to zero")
+
+        if options["adjust"] and accounts:
+            self.stdout.write(f"Recorded {len(accounts)} adjustments.")
+        if result["transactions"] or (accounts and not options["adjust"]):
+            raise CommandError(f"{len(accounts)} balances and {len(result['transactions'])} tips do not reconcile.")
+        self.stdout.write(self.style.SUCCESS("Ledger reconciles."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0003_tip_billing_tip_created_08800b_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tip',
+            index=models.Index(fields=['recipient', '-created_at'], name='tip_recipient_created_idx'),
+        ),
+    ]
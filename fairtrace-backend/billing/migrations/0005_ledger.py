@@ -0,0 +1,71 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:44
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+def open_balances(apps, schema_editor):
+    """One opening entry per existing non-zero balance, so the ledger sums match."""
+    Wallet = apps.get_model("billing", "Wallet")
+    Consumer = apps.get_model("billing", "Consumer")
+    LedgerEntry = apps.get_model("billing", "LedgerEntry")
+    LedgerEntry.objects.bulk_create(
+        [
+            LedgerEntry(wallet_id=pk, amount=balance, kind="opening")
+            for pk, balance in Wallet.objects.exclude(balance=0).values_list("pk", "balance")
+        ]
+        + [
+            LedgerEntry(consumer_id=pk, amount=balance, kind="opening")
+            for pk, balance in Consumer.objects.exclude(balance=0).values_list("pk", "balance")
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0004_tip_tip_recipient_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tip',
+            name='consumer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tips', to='billing.consumer'),
+        ),
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tx_id', models.UUIDField(default=uuid.uuid4)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('kind', models.CharField(choices=[('opening', 'Opening balance'), ('tip', 'Tip'), ('adjustment', 'Adjustment')], default='tip', max_length=20)),
+                ('applied', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('consumer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='billing.consumer')),
+                ('wallet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='billing.wallet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tx_id'], name='ledger_tx_idx'), models.Index(condition=models.Q(('applied', False)), fields=['id'], name='ledger_pending_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('consumer__isnull', True), ('wallet__isnull', False)), models.Q(('consumer__isnull', False), ('wallet__isnull', True)), _connector='OR'), name='ledger_one_account')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WalletSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('credited', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('entries', models.PositiveIntegerField()),
+                ('taken_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='billing.wallet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['wallet', '-taken_at'], name='walletsnapshot_wallet_idx')],
+            },
+        ),
+        migrations.RunPython(open_balances, migrations.RunPython.noop),
+    ]
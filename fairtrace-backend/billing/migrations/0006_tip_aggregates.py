@@ -0,0 +1,69 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:47
+
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill(apps, schema_editor):
+    """Aggregate the tips already made; those with a credit still pending are counted when it is folded."""
+    Tip = apps.get_model("billing", "Tip")
+    LedgerEntry = apps.get_model("billing", "LedgerEntry")
+    TipAggregate = apps.get_model("billing", "TipAggregate")
+    pending = LedgerEntry.objects.filter(kind="tip", applied=False).values("tx_id")
+    rows = defaultdict(lambda: [Decimal(0), 0, None])
+    for recipient_id, amount, created_at in (
+        Tip.objects.exclude(tx_id__in=pending).values_list("recipient_id", "amount", "created_at").iterator()
+    ):
+        day = timezone.localtime(created_at).date()
+        for period, start in (("all", None), ("month", day.replace(day=1)), ("day", day)):
+            row = rows[recipient_id, period, start]
+            row[0] += amount
+            row[1] += 1
+            row[2] = max(row[2], created_at) if row[2] else created_at
+    TipAggregate.objects.bulk_create(
+        [
+            TipAggregate(recipient_id=recipient_id, period=period, start=start, total=total, count=count, last_tip_at=last)
+            for (recipient_id, period, start), (total, count, last) in rows.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0005_ledger'),
+        ('products', '0015_bulkdecisionjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tip',
+            name='product',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tips', to='products.product'),
+        ),
+        migrations.CreateModel(
+            name='TipAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('all', 'All time'), ('month', 'Month'), ('day', 'Day')], max_length=5)),
+                ('start', models.DateField(blank=True, null=True)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('last_tip_at', models.DateTimeField(blank=True, null=True)),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tip_aggregates', to='products.product')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tip_aggregates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('product__isnull', True)), fields=['period', 'start', '-total'], name='tipagg_farmer_rank_idx'), models.Index(condition=models.Q(('product__isnull', False)), fields=['period', 'start', '-total'], name='tipagg_product_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('recipient', 'product', 'period', 'start'), name='tipaggregate_bucket_uniq', nulls_distinct=False)],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
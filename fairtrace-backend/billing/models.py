@@ -8,7 +8,14 @@ User = settings.AUTH_USER_MODEL  # string; use in FK below
 
 class Wallet(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="wallet")
-    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)  # KSH
+    # KSH; credits still in the ledger (LedgerEntry.applied=False) are not included, see billing/ledger.py
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding and self.balance:
+            LedgerEntry.objects.create(wallet=self, amount=self.balance, kind="opening")
 
     def __str__(self):
         return f"Wallet({self.user}, {self.balance})"
@@ -21,9 +28,17 @@ class Tip(models.Model):
     anonymous_to_recipient = models.BooleanField(default=True)  # for explicitness
     created_at = models.DateTimeField(default=timezone.now)
     note = models.CharField(max_length=255, blank=True, null=True)
+    # tips from the pre-loaded consumer accounts have no sender
+    consumer = models.ForeignKey("Consumer", on_delete=models.SET_NULL, related_name="tips", null=True, blank=True)
+    # the product the tip was given for, when sent from a product page or certificate
+    product = models.ForeignKey("products.Product", on_delete=models.SET_NULL, related_name="tips", null=True, blank=True)
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["created_at", "id"]),  # keyset pagination
+            models.Index(fields=["recipient", "-created_at"], name="tip_recipient_created_idx"),
+        ]
 
     def __str__(self):
         return f"Tip {self.tx_id} {self.amount} from {self.sender} -> {self.recipient}"
@@ -36,5 +51,108 @@ class Consumer(models.Model):
     balance = models.DecimalField(default=5000, max_digits=10, decimal_places=2)
     name = models.CharField(max_length=60)
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding and self.balance:
+            LedgerEntry.objects.create(consumer=self, amount=self.balance, kind="opening")
+
     def __str__(self):
         return f"{self.name} ({self.phone})"
+
+
+class LedgerEntry(models.Model):
+    """
+    One movement of money on a Wallet or a Consumer balance, never updated
+    except to mark a credit applied. A tip is a debit and a credit with the
+    tip's tx_id; see billing/ledger.py.
+    """
+    KIND_CHOICES = [
+        ("opening", "Opening balance"),
+        ("tip", "Tip"),
+        ("adjustment", "Adjustment"),  # written by reconcile_ledger --adjust
+    ]
+    tx_id = models.UUIDField(default=uuid.uuid4)
+    wallet = models.ForeignKey(Wallet, on_delete=models.PROTECT, related_name="ledger_entries", null=True, blank=True)
+    consumer = models.ForeignKey(Consumer, on_delete=models.PROTECT, related_name="ledger_entries", null=True, blank=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)  # negative for debits
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default="tip")
+    # False for credits the fold task has not added to Wallet.balance yet
+    applied = models.BooleanField(default=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["tx_id"], name="ledger_tx_idx"),
+            models.Index(fields=["id"], condition=models.Q(applied=False), name="ledger_pending_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(wallet__isnull=False, consumer__isnull=True)
+                | models.Q(wallet__isnull=True, consumer__isnull=False),
+                name="ledger_one_account",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.amount} ({self.tx_id})"
+
+
+class WalletSnapshot(models.Model):
+    """Wallet balance after a fold of pending credits (billing/ledger.py)."""
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name="snapshots")
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+    credited = models.DecimalField(max_digits=12, decimal_places=2)  # folded into `balance` by this run
+    entries = models.PositiveIntegerField()
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["wallet", "-taken_at"], name="walletsnapshot_wallet_idx")]
+
+    def __str__(self):
+        return f"Snapshot({self.wallet_id}, {self.balance}, {self.taken_at})"
+
+
+
+class TipAggregate(models.Model):
+    """
+    Running tip totals of a farmer (product=None) or of one of their
+    products, over all time, a calendar month or a day. Maintained by
+    billing/stats.py as tip credits are folded; dashboards read these rows
+    instead of scanning billing_tip.
+    """
+    PERIOD_CHOICES = [
+        ("all", "All time"),
+        ("month", "Month"),
+        ("day", "Day"),
+    ]
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="tip_aggregates")
+    product = models.ForeignKey(
+        "products.Product", on_delete=models.CASCADE, related_name="tip_aggregates", null=True, blank=True
+    )
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    start = models.DateField(null=True, blank=True)  # first day of the month/day; None for "all"
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+    last_tip_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipient", "product", "period", "start"],
+                name="tipaggregate_bucket_uniq",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            # leaderboards: farmers and products ranked within one bucket
+            models.Index(
+                fields=["period", "start", "-total"], condition=models.Q(product__isnull=True), name="tipagg_farmer_rank_idx"
+            ),
+            models.Index(
+                fields=["period", "start", "-total"], condition=models.Q(product__isnull=False), name="tipagg_product_rank_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient_id}/{self.product_id} {self.period} {self.start}: {self.total} ({self.count})"
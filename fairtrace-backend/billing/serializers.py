@@ -1,15 +1,24 @@
+from decimal import Decimal
+
 from rest_framework import serializers
+from . import ledger
 from .models import Wallet, Tip
 from django.conf import settings
 
 class WalletSerializer(serializers.ModelSerializer):
+    # tips received but not yet folded into `balance` (billing/ledger.py)
+    pending = serializers.SerializerMethodField()
+
     class Meta:
         model = Wallet
-        fields = ("user", "balance")
+        fields = ("user", "balance", "pending")
         read_only_fields = ("user",)
 
+    def get_pending(self, obj):
+        return str(ledger.pending(obj))
+
 class TipCreateSerializer(serializers.Serializer):
-    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal("0.01"))
     farmer_id = serializers.IntegerField(required=False)
     product_uid = serializers.UUIDField(required=False)
     note = serializers.CharField(required=False, allow_blank=True, allow_null=True)
@@ -20,6 +29,14 @@ class TipCreateSerializer(serializers.Serializer):
         # amount must be positive handled by DecimalField
         return data
 
+class TipLeaderboardQuerySerializer(serializers.Serializer):
+    period = serializers.ChoiceField(choices=["all", "month", "week"], default="all")
+    scope = serializers.ChoiceField(choices=["farmers", "products"], default="farmers")
+    limit = serializers.IntegerField(min_value=1, default=10)
+
+    def validate_limit(self, value):
+        return min(value, settings.TIP_LEADERBOARD_MAX)
+
 class TipListSerializer(serializers.ModelSerializer):
     sender_email = serializers.EmailField(source="sender.email", read_only=True)
     recipient_email = serializers.EmailField(source="recipient.email", read_only=True)
@@ -37,6 +54,7 @@ class TipListSerializer(serializers.ModelSerializer):
             "sender_email",
             "recipient",
             "recipient_email",
+            "product",
         ]
 
 from rest_framework import serializers
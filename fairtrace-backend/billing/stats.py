@@ -0,0 +1,181 @@
+# billing/stats.py
+"""
+Materialized tip totals for farmer dashboards and the leaderboard.
+
+Every tip adds to up to six TipAggregate rows: all-time, its calendar month
+and its day, for the farmer and (when the tip names one) for the product.
+Those rows are written by `ledger.fold`, in the same transaction that
+applies the tips' credits, with one INSERT ... ON CONFLICT DO UPDATE per
+batch. Each tip is therefore counted exactly once, when its money reaches
+the wallet. Doing it at tip time instead would put the farmer's aggregate
+row lock back on the path that billing/ledger.py keeps free of it.
+
+Reads are a handful of rows: `summary` returns the all-time row, the last
+TIP_SUMMARY_MONTHS month rows and the last seven day rows of a farmer or
+product. `leaderboard` ranks one bucket through a partial index on
+(period, start, -total). Days are local dates (TIME_ZONE).
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Max, Q, Sum
+from django.utils import timezone
+
+from .models import TipAggregate
+
+WEEK_DAYS = 7
+
+
+def buckets(recipient_id, product_id, created_at):
+    """The (recipient, product, period, start) keys a tip at `created_at` adds to."""
+    day = timezone.localtime(created_at).date()
+    for product in (None, product_id) if product_id else (None,):
+        yield recipient_id, product, "all", None
+        yield recipient_id, product, "month", day.replace(day=1)
+        yield recipient_id, product, "day", day
+
+
+def record(tips):
+    """Add `tips` ((recipient_id, product_id, amount, created_at) tuples) to their aggregates."""
+    rows = defaultdict(lambda: [Decimal(0), 0, None])
+    for recipient_id, product_id, amount, created_at in tips:
+        for key in buckets(recipient_id, product_id, created_at):
+            row = rows[key]
+            row[0] += amount
+            row[1] += 1
+            row[2] = max(row[2], created_at) if row[2] else created_at
+    if not rows:
+        return 0
+
+    # fixed order, so concurrent folds lock the rows the same way round
+    keys = sorted(rows, key=lambda key: (key[0], key[1] or 0, key[2], key[3] or date.min))
+    table = TipAggregate._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (recipient_id, product_id, period, start, total, count, last_tip_at)
+            VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(keys))}
+            ON CONFLICT ON CONSTRAINT tipaggregate_bucket_uniq DO UPDATE SET
+                total = {table}.total + EXCLUDED.total,
+                count = {table}.count + EXCLUDED.count,
+                last_tip_at = GREATEST({table}.last_tip_at, EXCLUDED.last_tip_at)
+            """,
+            [value for key in keys for value in (*key, *rows[key])],
+        )
+    return len(keys)
+
+
+def _week_start():
+    return timezone.localdate() - timedelta(days=WEEK_DAYS - 1)
+
+
+def _totals(row):
+    return {"total": str(row.total if row else Decimal("0.00")), "count": row.count if row else 0}
+
+
+def summary(recipient, product=None):
+    """
+    Tip totals of `recipient`, or of `product` if given: all-time, the last
+    seven days, and per month (newest first). A farmer's summary also
+    lists their products.
+    """
+    today = timezone.localdate()
+    month = today.replace(day=1)
+    for _ in range(settings.TIP_SUMMARY_MONTHS - 1):
+        month = (month - timedelta(days=1)).replace(day=1)
+    rows = list(
+        TipAggregate.objects.filter(recipient=recipient, product=product).filter(
+            Q(period="all") | Q(period="month", start__gte=month) | Q(period="day", start__gte=_week_start())
+        )
+    )
+    overall = next((row for row in rows if row.period == "all"), None)
+    days = [row for row in rows if row.period == "day"]
+    data = {
+        **_totals(overall),
+        "last_tip_at": overall.last_tip_at if overall else None,
+        "last_7_days": {
+            "total": str(sum((row.total for row in days), Decimal("0.00"))),
+            "count": sum(row.count for row in days),
+        },
+        "months": [
+            {"month": row.start.strftime("%Y-%m"), **_totals(row)}
+            for row in sorted((row for row in rows if row.period == "month"), key=lambda row: row.start, reverse=True)
+        ],
+    }
+    if product is None:
+        data["products"] = products(recipient)
+    return data
+
+
+def products(recipient):
+    """All-time and last-seven-day totals of each of `recipient`'s tipped products, highest first."""
+    week = defaultdict(lambda: [Decimal("0.00"), 0])
+    overall = []
+    for row in TipAggregate.objects.select_related("product").filter(
+        Q(period="all") | Q(period="day", start__gte=_week_start()), recipient=recipient, product__isnull=False
+    ):
+        if row.period == "all":
+            overall.append(row)
+        else:
+            week[row.product_id][0] += row.total
+            week[row.product_id][1] += row.count
+    return [
+        {
+            "uid": str(row.product.uid),
+            "title": row.product.title,
+            **_totals(row),
+            "last_7_days": {"total": str(week[row.product_id][0]), "count": week[row.product_id][1]},
+        }
+        for row in sorted(overall, key=lambda row: row.total, reverse=True)
+    ]
+
+
+def _name(first_name, last_name):
+    return f"{first_name} {last_name}".strip()
+
+
+def leaderboard(period="all", scope="farmers", limit=10):
+    """
+    The `limit` farmers (or products) with the most tips over `period`:
+    "all", "month" (this calendar month) or "week" (the last seven days).
+    """
+    rows = TipAggregate.objects.filter(product__isnull=scope == "farmers")
+    if period == "week":
+        # seven day rows per entry, summed
+        group = ["recipient_id", "recipient__first_name", "recipient__last_name"]
+        if scope == "products":
+            group += ["product__uid", "product__title"]
+        entries = list(
+            rows.filter(period="day", start__gte=_week_start())
+            .values(*group)
+            .annotate(tip_total=Sum("total"), tip_count=Sum("count"), tip_last=Max("last_tip_at"))
+            .order_by("-tip_total", "recipient_id")[:limit]
+        )
+    else:
+        start = timezone.localdate().replace(day=1) if period == "month" else None
+        entries = list(
+            rows.filter(period=period, start=start)
+            .order_by("-total", "recipient_id")
+            .values(
+                "recipient_id", "recipient__first_name", "recipient__last_name", "product__uid", "product__title",
+                tip_total=F("total"), tip_count=F("count"), tip_last=F("last_tip_at"),
+            )[:limit]
+        )
+
+    board = []
+    for rank, entry in enumerate(entries, start=1):
+        item = {
+            "rank": rank,
+            "farmer_id": entry["recipient_id"],
+            "farmer_name": _name(entry["recipient__first_name"], entry["recipient__last_name"]),
+            "total": str(entry["tip_total"]),
+            "count": entry["tip_count"],
+            "last_tip_at": entry["tip_last"],
+        }
+        if scope == "products":
+            item.update(uid=str(entry["product__uid"]), title=entry["product__title"])
+        board.append(item)
+    return board
@@ -0,0 +1,10 @@
+# billing/tasks.py
+from celery import shared_task
+
+from . import ledger
+
+
+@shared_task
+def fold_ledger():
+    """Add pending tip credits to wallet balances (billing/ledger.py)."""
+    return ledger.fold()
@@ -1,3 +1,148 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from products.models import Product
+from users.models import User
+
+from . import ledger, stats
+from .models import Consumer, LedgerEntry, Tip, TipAggregate, Wallet, WalletSnapshot
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.farmer = User.objects.create_user("farmer@example.com", "pw")
+        self.product = Product.objects.create(farmer=self.farmer, title="Coffee", quantity=Decimal("10"))
+        self.consumer = Consumer.objects.create(phone="0722000000", pin="1234", name="Amina", balance=Decimal("100"))
+        self.client = APIClient()
+
+    def consumer_tip(self, amount):
+        return self.client.post(
+            "/api/consumer/tip/", {"phone": self.consumer.phone, "amount": amount, "product_uid": str(self.product.uid)}
+        )
+
+    def test_tip_is_a_debit_and_a_pending_credit(self):
+        response = self.consumer_tip("30")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data["new_balance"], response.data["farmer_wallet_balance"]), ("70.00", "30.00"))
+
+        tip = Tip.objects.get()
+        self.assertEqual((tip.consumer, tip.sender, tip.recipient), (self.consumer, None, self.farmer))
+        entries = LedgerEntry.objects.filter(tx_id=tip.tx_id)
+        self.assertEqual(sorted(entry.amount for entry in entries), [Decimal("-30"), Decimal("30")])
+
+        # the farmer's wallet row is untouched until the credit is folded
+        wallet = Wallet.objects.get(user=self.farmer)
+        self.assertEqual((wallet.balance, ledger.pending(wallet)), (0, Decimal("30")))
+        self.assertEqual(ledger.fold(), 1)
+        wallet.refresh_from_db()
+        self.assertEqual((wallet.balance, ledger.pending(wallet)), (Decimal("30"), 0))
+        snapshot = WalletSnapshot.objects.get()
+        self.assertEqual((snapshot.wallet, snapshot.balance, snapshot.entries), (wallet, Decimal("30"), 1))
+        self.assertEqual(ledger.reconcile(), {"wallets": [], "consumers": [], "transactions": []})
+
+    def test_debit_never_overdraws(self):
+        self.assertEqual(self.consumer_tip("60").status_code, 200)
+        # the second tip passes the view's stale balance check but not the conditional UPDATE
+        self.assertEqual(self.consumer_tip("60").status_code, 400)
+        self.consumer.refresh_from_db()
+        self.assertEqual(self.consumer.balance, Decimal("40"))
+        self.assertEqual(Tip.objects.count(), 1)
+        self.assertEqual(LedgerEntry.objects.filter(kind="tip").count(), 2)
+
+    def test_user_tip_takes_no_row_locks(self):
+        sender = User.objects.create_user("buyer@example.com", "pw")
+        Wallet.objects.create(user=sender, balance=Decimal("50"))
+        Wallet.objects.create(user=self.farmer)
+        self.client.force_authenticate(sender)
+        # recipient, both wallets, then UPDATE + 3 INSERTs + balance read in one savepoint
+        with self.assertNumQueries(10) as queries:
+            response = self.client.post("/api/tips/send/", {"amount": "20", "farmer_id": self.farmer.id})
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["new_sender_balance"], "30.00")
+        self.assertFalse([q for q in queries.captured_queries if "FOR UPDATE" in q["sql"]])
+
+    def test_amounts_must_be_positive(self):
+        sender = User.objects.create_user("buyer@example.com", "pw")
+        wallet = Wallet.objects.create(user=sender, balance=Decimal("50"))
+        for amount in (Decimal("0"), Decimal("-20")):
+            with self.assertRaises(ValueError):
+                ledger.debit(wallet, amount, tx_id=None)
+            with self.assertRaises(ValueError):
+                ledger.credit(wallet, amount, tx_id=None)
+
+        self.client.force_authenticate(sender)
+        response = self.client.post("/api/tips/send/", {"amount": "-20", "farmer_id": self.farmer.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("amount", response.data)
+        wallet.refresh_from_db()
+        self.assertEqual(wallet.balance, Decimal("50"))
+        self.assertFalse(LedgerEntry.objects.filter(kind="tip").exists())
+
+    def test_reconcile_command_reports_and_adjusts_drift(self):
+        Consumer.objects.filter(pk=self.consumer.pk).update(balance=Decimal("150"))  # edited outside the ledger
+        with self.assertRaises(CommandError):
+            call_command("reconcile_ledger", stdout=StringIO())
+
+        out = StringIO()
+        call_command("reconcile_ledger", "--adjust", stdout=out)
+        self.assertIn(f"consumer {self.consumer.pk}: balance 150.00, ledger 100.00", out.getvalue())
+        self.assertEqual(LedgerEntry.objects.get(kind="adjustment").amount, Decimal("50"))
+        call_command("reconcile_ledger", stdout=StringIO())
+
+
+class TipStatsTests(TestCase):
+    def setUp(self):
+        self.jane = User.objects.create_user("jane@example.com", "pw", first_name="Jane", last_name="Wanjiku")
+        self.peter = User.objects.create_user("peter@example.com", "pw", first_name="Peter", last_name="Otieno")
+        self.coffee = Product.objects.create(farmer=self.jane, title="Coffee", quantity=Decimal("10"))
+        self.tea = Product.objects.create(farmer=self.jane, title="Tea", quantity=Decimal("10"))
+        self.maize = Product.objects.create(farmer=self.peter, title="Maize", quantity=Decimal("10"))
+        self.consumer = Consumer.objects.create(phone="0722000000", pin="1234", name="Amina", balance=Decimal("1000"))
+        self.client = APIClient()
+
+    def tip(self, product, amount):
+        wallet, _ = Wallet.objects.get_or_create(user=product.farmer)
+        ledger.tip(self.consumer, wallet, Decimal(amount), consumer=self.consumer, product=product)
+
+    def test_fold_materializes_farmer_and_product_totals(self):
+        self.tip(self.coffee, "50")
+        self.tip(self.coffee, "25")
+        self.tip(self.tea, "10")
+        self.tip(self.maize, "40")
+        # a tip from two months ago, already folded
+        stats.record([(self.jane.id, self.tea.id, Decimal("5"), timezone.now() - timedelta(days=62))])
+        self.assertFalse(TipAggregate.objects.filter(count=4).exists())  # nothing counted before the fold
+
+        ledger.fold()
+        ledger.fold()  # nothing left to count twice
+
+        self.client.force_authenticate(self.jane)
+        with self.assertNumQueries(2):  # the farmer's rows, then their products' rows
+            response = self.client.get("/api/tips/summary/")
+        data = response.json()
+        self.assertEqual((data["total"], data["count"]), ("90.00", 4))
+        self.assertEqual(data["last_7_days"], {"total": "85.00", "count": 3})
+        self.assertEqual([(m["total"], m["count"]) for m in data["months"]], [("85.00", 3), ("5.00", 1)])
+        self.assertEqual(
+            [(p["title"], p["total"], p["last_7_days"]["total"]) for p in data["products"]],
+            [("Coffee", "75.00", "75.00"), ("Tea", "15.00", "10.00")],
+        )
+
+        response = self.client.get("/api/tips/summary/", {"product": str(self.tea.uid)})
+        self.assertEqual((response.json()["total"], response.json()["count"]), ("15.00", 2))
+        self.assertEqual(self.client.get("/api/tips/summary/", {"product": str(self.maize.uid)}).status_code, 404)
 
-# Create your tests here.
+        response = self.client.get("/api/tips/leaderboard/", {"period": "week"})
+        self.assertEqual(
+            [(r["rank"], r["farmer_name"], r["total"]) for r in response.json()["results"]],
+            [(1, "Jane Wanjiku", "85.00"), (2, "Peter Otieno", "40.00")],
+        )
+        response = self.client.get("/api/tips/leaderboard/", {"scope": "products", "limit": 2})
+        self.assertEqual([(r["title"], r["total"]) for r in response.json()["results"]], [("Coffee", "75.00"), ("Maize", "40.00")])
+        self.assertEqual(self.client.get("/api/tips/leaderboard/", {"period": "year"}).status_code, 400)
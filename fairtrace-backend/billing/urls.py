@@ -3,6 +3,8 @@ from .views import (
     WalletView,
     TipCreateView,
     TipsReceivedView,
+    TipSummaryView,
+    TipLeaderboardView,
     ConsumerLoginAPIView,
     ConsumerTipAPIView,
 )
@@ -11,6 +13,8 @@ urlpatterns = [
     path("wallet/", WalletView.as_view(), name="wallet-detail"),
     path("tips/send/", TipCreateView.as_view(), name="tip-create"),
     path("tips/received/", TipsReceivedView.as_view(), name="tips-received"),
+    path("tips/summary/", TipSummaryView.as_view(), name="tips-summary"),
+    path("tips/leaderboard/", TipLeaderboardView.as_view(), name="tips-leaderboard"),
     path("consumer/login/", ConsumerLoginAPIView.as_view(), name="consumer-login"),
     path("consumer/tip/", ConsumerTipAPIView.as_view(), name="consumer-tip"),
 ]
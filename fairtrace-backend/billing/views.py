@@ -1,12 +1,13 @@
 from rest_framework import status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db import transaction
 from django.shortcuts import get_object_or_404
 from decimal import Decimal
 
+from . import ledger, stats
 from .models import Wallet, Tip, Consumer
-from .serializers import WalletSerializer, TipCreateSerializer, TipListSerializer
+from .serializers import WalletSerializer, TipCreateSerializer, TipListSerializer, TipLeaderboardQuerySerializer
+from fairtrace_backend.pagination import paginated_response
 
 # If your Product model is in another app (e.g., 'products' or 'trace'),
 # import it here. Replace 'products' with the actual app name.
@@ -52,6 +53,7 @@ class TipCreateView(APIView):
         product_uid = serializer.validated_data.get("product_uid")
 
         # determine recipient user
+        product = None
         if farmer_id:
             from django.contrib.auth import get_user_model
             User = get_user_model()
@@ -65,31 +67,27 @@ class TipCreateView(APIView):
         if recipient.id == request.user.id:
             return Response({"detail": "Farmer cannot tip themselves."}, status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
-            sender_wallet = Wallet.objects.select_for_update().get(user=request.user)
-            recipient_wallet = Wallet.objects.select_for_update().get(user=recipient)
+        sender_wallet, _ = Wallet.objects.get_or_create(user=request.user)
+        recipient_wallet, _ = Wallet.objects.get_or_create(user=recipient)
 
-            if sender_wallet.balance < amount:
-                return Response({"detail": "Insufficient balance."}, status=status.HTTP_400_BAD_REQUEST)
-
-            # debit & credit
-            sender_wallet.balance -= Decimal(amount)
-            recipient_wallet.balance += Decimal(amount)
-            sender_wallet.save()
-            recipient_wallet.save()
-
-            tip = Tip.objects.create(
-                amount=amount,
+        # conditional debit + ledger credit, no row locks held up front (billing/ledger.py)
+        try:
+            tip, sender_balance = ledger.tip(
+                sender_wallet,
+                recipient_wallet,
+                amount,
                 sender=request.user,
-                recipient=recipient,
+                product=product,
                 anonymous_to_recipient=True,
-                note=note or ""
+                note=note or "",
             )
+        except ledger.InsufficientFunds:
+            return Response({"detail": "Insufficient balance."}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({
             "tx_id": str(tip.tx_id),
             "amount": str(tip.amount),
-            "new_sender_balance": str(sender_wallet.balance),
+            "new_sender_balance": str(sender_balance),
             "recipient_id": recipient.id,
             "message": "Tip sent successfully."
         }, status=status.HTTP_201_CREATED)
@@ -99,9 +97,42 @@ class TipsReceivedView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        tips = Tip.objects.filter(recipient=request.user).order_by("-created_at")
-        serializer = TipListSerializer(tips, many=True)
-        return Response(serializer.data)
+        tips = Tip.objects.select_related("sender", "recipient").filter(recipient=request.user)
+        return paginated_response(request, tips, TipListSerializer)
+
+
+class TipSummaryView(APIView):
+    """
+    Tip totals of the logged-in farmer (all-time, last 7 days, per month and
+    per product), or of one of their products with ?product=<uid>. Read from
+    the TipAggregate rows (billing/stats.py), so tips folded into the
+    wallet in the last LEDGER_FOLD_SECONDS are not included yet.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        product = None
+        product_uid = request.query_params.get("product")
+        if product_uid:
+            if Product is None:
+                return Response({"detail": "Product model not configured on server."}, status=status.HTTP_400_BAD_REQUEST)
+            product = get_object_or_404(Product.objects.only("id"), uid=product_uid, farmer=request.user)
+        return Response(stats.summary(request.user, product=product))
+
+
+class TipLeaderboardView(APIView):
+    """Top farmers or products by tips: ?period=all|month|week&scope=farmers|products&limit=10."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        query = TipLeaderboardQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        return Response({
+            "period": params["period"],
+            "scope": params["scope"],
+            "results": stats.leaderboard(params["period"], params["scope"], params["limit"]),
+        })
 
 # --------------------------
 # Pre-loaded Consumer accounts for frontend demo (no real users)
@@ -144,7 +175,6 @@ class IgnoreAuthentication(BaseAuthentication):
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db import transaction
 from decimal import Decimal
 from django.shortcuts import get_object_or_404
 
@@ -191,21 +221,19 @@ class ConsumerTipAPIView(APIView):
         # 3️⃣ Get/create farmer wallet
         wallet, _ = Wallet.objects.get_or_create(user=farmer)
 
-        # 4️⃣ Perform transaction atomically
-        with transaction.atomic():
-            consumer.balance -= amount
-            consumer.save()
-
-            wallet.balance += amount
-            wallet.save()
-
-            # Optional: fake tx for demo
-            fake_tx = f"tx_{phone[-4:]}_{int(amount*100)}"
+        # 4️⃣ Debit the consumer and credit the farmer through the ledger
+        try:
+            tip, consumer_balance = ledger.tip(consumer, wallet, amount, consumer=consumer, product=product)
+        except ledger.InsufficientFunds:
+            return Response(
+                {"detail": "Invalid amount or insufficient balance"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
         return Response({
-            "tx": fake_tx,
-            "new_balance": str(consumer.balance),
-            "farmer_wallet_balance": str(wallet.balance),
+            "tx": str(tip.tx_id),
+            "new_balance": str(consumer_balance),
+            "farmer_wallet_balance": str(ledger.available(wallet)),
             "message": f"Tip of {amount} KSH sent to {farmer.email}"  # <-- FIXED
         }, status=status.HTTP_200_OK)
 
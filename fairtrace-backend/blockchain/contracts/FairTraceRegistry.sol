@@ -12,6 +12,7 @@ contract FarmerRegistry {
 
     uint256 private nextFarmerId = 1;
     mapping(uint256 => Farmer) private farmers; // keep internal, expose via functions
+    mapping(bytes32 => uint256) private batchCounts; // Merkle root of a bulk import -> farmers under it
 
     // ----------------- Events -----------------
     event FarmerRegistered(
@@ -26,6 +27,12 @@ contract FarmerRegistry {
         string newLocation
     );
 
+    event FarmerBatchRegistered(
+        bytes32 indexed root,
+        uint256 count,
+        address indexed registrar
+    );
+
     // ----------------- Core Logic -----------------
 
     /// @notice Register a new farmer
@@ -50,13 +57,46 @@ contract FarmerRegistry {
         return farmerId;
     }
 
+    /// @notice Commit to a bulk import: the Merkle root over the payload hashes of `count` farmers
+    /// @dev Each farmer keeps its own proof off-chain; nothing is added to the farmer list
+    function registerFarmerBatch(bytes32 root, uint256 count) external {
+        require(root != bytes32(0) && count > 0, "Empty batch");
+        require(batchCounts[root] == 0, "Batch already registered");
+        batchCounts[root] = count;
+        emit FarmerBatchRegistered(root, count, msg.sender);
+    }
+
+    /// @notice Number of farmers committed under a batch root (0 if it was never registered)
+    function farmerBatchCount(bytes32 root) external view returns (uint256) {
+        return batchCounts[root];
+    }
+
     /// @notice Get a single farmer by ID
     function getFarmer(uint256 _farmerId) external view returns (Farmer memory) {
         require(_farmerId > 0 && _farmerId < nextFarmerId, "Farmer does not exist");
         return farmers[_farmerId];
     }
 
+    /// @notice Number of registered farmers (for paging with getFarmers)
+    function farmerCount() external view returns (uint256) {
+        return nextFarmerId - 1;
+    }
+
+    /// @notice Farmers [offset, offset + limit) by ID (farmer offset + 1 first); shorter (or empty) past the end
+    function getFarmers(uint256 offset, uint256 limit) external view returns (Farmer[] memory page) {
+        uint256 total = nextFarmerId - 1;
+        if (offset >= total) {
+            return new Farmer[](0);
+        }
+        uint256 end = limit > total - offset ? total : offset + limit;
+        page = new Farmer[](end - offset);
+        for (uint256 i = offset; i < end; i++) {
+            page[i - offset] = farmers[i + 1];
+        }
+    }
+
     /// @notice Get all farmers (for frontend tables)
+    /// @dev Cost grows with the registry and hits node gas/response limits; page with getFarmers instead
     function getAllFarmers() external view returns (Farmer[] memory) {
         Farmer[] memory all = new Farmer[](nextFarmerId - 1);
         for (uint256 i = 1; i < nextFarmerId; i++) {
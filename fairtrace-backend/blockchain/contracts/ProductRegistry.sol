@@ -68,7 +68,26 @@ contract ProductRegistry {
         return records[pid];
     }
 
+    /// @notice Number of registered products (for paging with getProducts)
+    function productCount() external view returns (uint256) {
+        return allProductIds.length;
+    }
+
+    /// @notice Products [offset, offset + limit) in registration order; shorter (or empty) past the end
+    function getProducts(uint256 offset, uint256 limit) external view returns (ProductRecord[] memory page) {
+        uint256 total = allProductIds.length;
+        if (offset >= total) {
+            return new ProductRecord[](0);
+        }
+        uint256 end = limit > total - offset ? total : offset + limit;
+        page = new ProductRecord[](end - offset);
+        for (uint256 i = offset; i < end; i++) {
+            page[i - offset] = records[allProductIds[i]];
+        }
+    }
+
     /// @notice Get all registered products
+    /// @dev Cost grows with the registry and hits node gas/response limits; page with getProducts instead
     function getAllProducts() external view returns (ProductRecord[] memory) {
         ProductRecord[] memory all = new ProductRecord[](allProductIds.length);
         for (uint256 i = 0; i < allProductIds.length; i++) {
@@ -0,0 +1,111 @@
+// test/Pagination.gas.cjs
+// Gas per page of the paginated registry getters (getProducts/getFarmers)
+// next to the one-shot getAllProducts/getAllFarmers views they replace.
+//
+//   npx hardhat test test/Pagination.gas.cjs
+const assert = require("node:assert/strict");
+const { ethers } = require("hardhat");
+
+const RECORDS = 300;
+const PAGE_SIZES = [25, 50, 100, 200];
+// geth caps eth_call at 50M gas by default; a page must stay far below that
+const PAGE_GAS_BUDGET = 30_000_000;
+
+async function gasPerPage(contract, pageFn, total) {
+  const rows = [];
+  for (const size of PAGE_SIZES) {
+    const first = await contract.estimateGas[pageFn](0, size);
+    const last = await contract.estimateGas[pageFn](Math.max(total - size, 0), size);
+    rows.push({ pageSize: size, firstPage: first.toNumber(), lastPage: last.toNumber(), perRecord: Math.round(last.toNumber() / size) });
+  }
+  return rows;
+}
+
+async function readAllPages(contract, pageFn, total, size) {
+  const records = [];
+  for (let offset = 0; offset < total; offset += size) {
+    records.push(...(await contract[pageFn](offset, size)));
+  }
+  return records;
+}
+
+describe("Paginated registry reads", function () {
+  this.timeout(0);
+
+  describe("ProductRegistry", function () {
+    let registry;
+
+    before(async function () {
+      registry = await (await ethers.getContractFactory("ProductRegistry")).deploy();
+      await registry.deployed();
+      for (let i = 0; i < RECORDS; i++) {
+        await registry.registerProduct(`FT-2025-1-${String(i).padStart(4, "0")}`, `Coffee lot ${i}`, "farmer@example.com", `0x${i.toString(16).padStart(64, "0")}`);
+      }
+    });
+
+    it("pages through every product in registration order", async function () {
+      assert.equal((await registry.productCount()).toNumber(), RECORDS);
+      const all = await registry.getAllProducts();
+      for (const size of PAGE_SIZES) {
+        const paged = await readAllPages(registry, "getProducts", RECORDS, size);
+        assert.deepEqual(paged.map((p) => p.pid), all.map((p) => p.pid));
+      }
+    });
+
+    it("returns short and empty pages past the end without overflowing", async function () {
+      assert.equal((await registry.getProducts(RECORDS - 10, 100)).length, 10);
+      assert.equal((await registry.getProducts(RECORDS, 100)).length, 0);
+      assert.equal((await registry.getProducts(RECORDS - 1, ethers.constants.MaxUint256)).length, 1);
+    });
+
+    it("keeps gas per page flat and under budget", async function () {
+      const rows = await gasPerPage(registry, "getProducts", RECORDS);
+      const getAll = (await registry.estimateGas.getAllProducts()).toNumber();
+      console.table(rows);
+      console.log(`      getAllProducts() over ${RECORDS} products: ${getAll} gas`);
+
+      for (const row of rows) {
+        assert.ok(row.lastPage < PAGE_GAS_BUDGET, `page of ${row.pageSize} costs ${row.lastPage} gas`);
+        // cost depends on the page size, not on how deep into the registry it is
+        assert.ok(Math.abs(row.lastPage - row.firstPage) / row.firstPage < 0.1);
+        assert.ok(row.lastPage < getAll);
+      }
+    });
+  });
+
+  describe("FarmerRegistry", function () {
+    let registry;
+
+    before(async function () {
+      registry = await (await ethers.getContractFactory("FarmerRegistry")).deploy();
+      await registry.deployed();
+      for (let i = 0; i < RECORDS; i++) {
+        await registry.registerFarmer(`Farmer ${i}`, ethers.utils.id(`national-id-${i}`), "Kiambu");
+      }
+    });
+
+    it("pages through every farmer by ID", async function () {
+      assert.equal((await registry.farmerCount()).toNumber(), RECORDS);
+      const all = await registry.getAllFarmers();
+      for (const size of PAGE_SIZES) {
+        const paged = await readAllPages(registry, "getFarmers", RECORDS, size);
+        assert.deepEqual(paged.map((f) => f.farmerId.toNumber()), all.map((f) => f.farmerId.toNumber()));
+      }
+      assert.equal((await registry.getFarmers(0, 1))[0].farmerId.toNumber(), 1);
+      assert.equal((await registry.getFarmers(RECORDS, 10)).length, 0);
+    });
+
+    it("keeps gas per page flat and under budget", async function () {
+      const rows = await gasPerPage(registry, "getFarmers", RECORDS);
+      const getAll = (await registry.estimateGas.getAllFarmers()).toNumber();
+      console.table(rows);
+      console.log(`      getAllFarmers() over ${RECORDS} farmers: ${getAll} gas`);
+
+      for (const row of rows) {
+        assert.ok(row.lastPage < PAGE_GAS_BUDGET, `page of ${row.pageSize} costs ${row.lastPage} gas`);
+        assert.ok(Math.abs(row.lastPage - row.firstPage) / row.firstPage < 0.1);
+        assert.ok(row.lastPage < getAll);
+      }
+    });
+  });
+});
@@ -0,0 +1,162 @@
+# fairtrace_backend/pagination.py
+"""
+Keyset (cursor) pagination, the project-wide default for list endpoints.
+
+Pages are ordered newest first on (created_at, id), or on id alone for models
+without a created_at column, and each page continues from the last row of the
+previous one:
+
+    WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id DESC
+
+so fetching page 1000 costs the same as page 1 and needs only the composite
+(created_at, id) index. Responses look like
+
+    {"next": "<url>|null", "previous": "<url>|null", "results": [...]}
+
+Generic views and viewsets get this through REST_FRAMEWORK's
+DEFAULT_PAGINATION_CLASS; plain APIViews and function views use
+`paginated_response` (or `paginate` when they build rows by hand).
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or 50
+        try:
+            requested = int(request.query_params.get(self.page_size_query_param, page_size))
+        except (TypeError, ValueError):
+            return page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def get_key_fields(self, queryset):
+        try:
+            queryset.model._meta.get_field("created_at")
+        except FieldDoesNotExist:
+            return ("id",)
+        return ("created_at", "id")
+
+    # --- cursor encoding -------------------------------------------------
+
+    def encode_cursor(self, reverse, values):
+        payload = json.dumps({"r": int(reverse), "v": [str(v) for v in values]})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request, model, fields):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+            raw = payload["v"]
+            if len(raw) != len(fields):
+                raise ValueError
+            values = [model._meta.get_field(f).to_python(v) for f, v in zip(fields, raw)]
+            return bool(payload["r"]), values
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    # --- keyset filter ---------------------------------------------------
+
+    @staticmethod
+    def keyset_filter(fields, values, op):
+        """
+        Row comparison (f1, f2, ...) <op> (v1, v2, ...) expanded into
+        f1 <op> v1 OR (f1 = v1 AND f2 <op> v2) OR ..., which Postgres
+        answers from the composite index.
+        """
+        condition = Q()
+        for i, field in enumerate(fields):
+            branch = Q(**{f"{field}__{op}": values[i]})
+            for prev_field, prev_value in zip(fields[:i], values[:i]):
+                branch &= Q(**{prev_field: prev_value})
+            condition |= branch
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fields = self.get_key_fields(queryset)
+        self.page_size = self.get_page_size(request)
+        reverse, values = self.decode_cursor(request, queryset.model, self.fields)
+
+        if values is None:
+            qs = queryset.order_by(*[f"-{f}" for f in self.fields])
+        elif reverse:
+            # Walking back towards newer rows: ascend, then flip the page.
+            qs = queryset.filter(self.keyset_filter(self.fields, values, "gt"))
+            qs = qs.order_by(*self.fields)
+        else:
+            qs = queryset.filter(self.keyset_filter(self.fields, values, "lt"))
+            qs = qs.order_by(*[f"-{f}" for f in self.fields])
+
+        rows = list(qs[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        key = lambda obj: [getattr(obj, f) for f in self.fields]
+        self.next_key = key(rows[-1]) if rows and (has_more or reverse) else None
+        self.previous_key = key(rows[0]) if rows and (values is not None and (not reverse or has_more)) else None
+        return rows
+
+    def _link(self, reverse, values):
+        if values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(reverse, values))
+
+    def get_next_link(self):
+        return self._link(False, self.next_key)
+
+    def get_previous_link(self):
+        return self._link(True, self.previous_key)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+def paginate(request, queryset, view=None):
+    """
+    Paginate `queryset` for a plain APIView / function view.
+    Returns (paginator, rows); finish with `paginator.get_paginated_response(data)`.
+    """
+    paginator = KeysetCursorPagination()
+    return paginator, paginator.paginate_queryset(queryset, request, view=view)
+
+
+def paginated_response(request, queryset, serializer_class, **serializer_kwargs):
+    """Paginate `queryset` and serialize one page with `serializer_class`."""
+    paginator, rows = paginate(request, queryset)
+    serializer_kwargs.setdefault("context", {"request": request})
+    return paginator.get_paginated_response(serializer_class(rows, many=True, **serializer_kwargs).data)
@@ -0,0 +1,53 @@
+# fairtrace_backend/serializers.py
+"""
+Shared serializer helpers.
+
+`FieldSelectionMixin` lets clients shape a response from the query string:
+
+    ?fields=uid,title,status    only these fields
+    ?expand=images,locations    include heavy fields listed in
+                                Meta.expandable_fields (left out by default)
+
+Views can set defaults by passing `fields=` / `expand=` to the serializer;
+query parameters only apply to the top-level serializer, never to nested ones.
+"""
+from rest_framework import serializers
+
+
+def _split(value):
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+class FieldSelectionMixin:
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self._selected_fields = fields
+        self._expanded_fields = expand
+        super().__init__(*args, **kwargs)
+
+    def _is_top_level(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self._selected_fields
+        requested_expand = []
+
+        request = self.context.get("request")
+        if request is not None and self._is_top_level():
+            params = getattr(request, "query_params", request.GET)
+            selected = _split(params.get("fields")) or selected
+            requested_expand = _split(params.get("expand"))
+        expand = set(self._expanded_fields or ()) | set(requested_expand)
+
+        for name in getattr(self.Meta, "expandable_fields", ()):
+            if name not in expand:
+                fields.pop(name, None)
+        if selected:
+            keep = set(selected) | set(requested_expand)
+            for name in list(fields):
+                if name not in keep:
+                    fields.pop(name)
+        return fields
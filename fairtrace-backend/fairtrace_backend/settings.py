@@ -44,6 +44,8 @@ INSTALLED_APPS = [
     'logistics',
     'billing',
     'market',
+    'onchain',
+    'notifications',
 ]
 
 # MIDDLEWARE
@@ -106,6 +108,11 @@ else:
             'PORT': config('DB_PORT', default='5432'),
         }
     }
+# The transaction signer reserves nonces on a connection of its own, so a
+# reservation commits before the broadcast whatever transaction the caller
+# is in (onchain/signer.py).
+DATABASES['signer'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
 # PASSWORD VALIDATORS
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -137,15 +144,108 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)  # seconds per SMTP operation
+
+# NOTIFICATION OUTBOX (notifications/outbox.py)
+NOTIFY_BATCH_SIZE = config('NOTIFY_BATCH_SIZE', default=100, cast=int)  # emails per SMTP connection
+NOTIFY_MAX_ATTEMPTS = config('NOTIFY_MAX_ATTEMPTS', default=6, cast=int)
+NOTIFY_RETRY_BASE_SECONDS = config('NOTIFY_RETRY_BASE_SECONDS', default=30, cast=int)  # doubled per attempt
+NOTIFY_RETRY_MAX_SECONDS = config('NOTIFY_RETRY_MAX_SECONDS', default=3600, cast=int)
+NOTIFY_RECIPIENT_LIMIT = config('NOTIFY_RECIPIENT_LIMIT', default=10, cast=int)  # emails per address per window
+NOTIFY_PRIORITY_RECIPIENT_LIMIT = config('NOTIFY_PRIORITY_RECIPIENT_LIMIT', default=5, cast=int)  # login codes, a budget of their own
+NOTIFY_RECIPIENT_WINDOW_SECONDS = config('NOTIFY_RECIPIENT_WINDOW_SECONDS', default=3600, cast=int)
+NOTIFY_CLAIM_TIMEOUT_SECONDS = config('NOTIFY_CLAIM_TIMEOUT_SECONDS', default=600, cast=int)  # claimed rows of a dead worker
+NOTIFY_SENT_RETENTION_DAYS = config('NOTIFY_SENT_RETENTION_DAYS', default=30, cast=int)
+
+# LOGIN CODES (users/otp.py)
+OTP_TTL_MINUTES = config('OTP_TTL_MINUTES', default=10, cast=int)
+OTP_VERIFY_MAX_ATTEMPTS = config('OTP_VERIFY_MAX_ATTEMPTS', default=5, cast=int)  # wrong codes per user per window
+OTP_VERIFY_WINDOW_SECONDS = config('OTP_VERIFY_WINDOW_SECONDS', default=900, cast=int)
+OTP_PURGE_BATCH_SIZE = config('OTP_PURGE_BATCH_SIZE', default=5000, cast=int)
+
+# PROFILE CLAIMS (users/authentication.py)
+PROFILE_CACHE_TTL_SECONDS = config('PROFILE_CACHE_TTL_SECONDS', default=60, cast=int)  # per-process profile id cache
+PROFILE_CACHE_MAX_ENTRIES = config('PROFILE_CACHE_MAX_ENTRIES', default=10000, cast=int)
+
+# TIP LEDGER (billing/ledger.py)
+LEDGER_FOLD_BATCH_SIZE = config('LEDGER_FOLD_BATCH_SIZE', default=1000, cast=int)  # pending credits per transaction
+
+# TIP DASHBOARDS (billing/stats.py)
+TIP_SUMMARY_MONTHS = config('TIP_SUMMARY_MONTHS', default=12, cast=int)
+TIP_LEADERBOARD_MAX = config('TIP_LEADERBOARD_MAX', default=100, cast=int)  # largest ?limit= on the leaderboard
+
+# CACHE (Redis from docker-compose.yml; empty REDIS_CACHE_URL falls back to local memory)
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='redis://localhost:6379/1')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'KEY_PREFIX': 'fairtrace',
+            # fail fast so callers can fall back to the database
+            'OPTIONS': {'socket_connect_timeout': 1, 'socket_timeout': 1},
+        }
+    }
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
 
 # CELERY
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BEAT_SCHEDULE = {
+    'requeue-stale-anchors': {
+        'task': 'products.tasks.requeue_stale_anchors',
+        'schedule': 60.0,
+    },
+    'anchor-pending-batch': {
+        'task': 'products.tasks.anchor_pending_batch',
+        'schedule': float(config('ANCHOR_BATCH_WINDOW_SECONDS', default=300, cast=int)),
+    },
+    'rebroadcast-stuck-transactions': {
+        'task': 'onchain.tasks.rebroadcast_stuck_transactions',
+        'schedule': 60.0,
+    },
+    'index-chain-events': {
+        'task': 'onchain.tasks.index_chain_events',
+        'schedule': float(config('CHAIN_INDEXER_POLL_SECONDS', default=15, cast=int)),
+    },
+    'archive-raw-locations': {
+        'task': 'products.tasks.archive_raw_locations',
+        'schedule': 3600.0,
+    },
+    'manage-location-partitions': {
+        'task': 'products.tasks.manage_location_partitions',
+        'schedule': 86400.0,
+    },
+    'send-outbox': {
+        'task': 'notifications.tasks.send_outbox',
+        'schedule': float(config('NOTIFY_POLL_SECONDS', default=30, cast=int)),
+    },
+    'purge-outbox': {
+        'task': 'notifications.tasks.purge_outbox',
+        'schedule': 86400.0,
+    },
+    'purge-otps': {
+        'task': 'users.tasks.purge_otps',
+        'schedule': 3600.0,
+    },
+    'fold-ledger': {
+        'task': 'billing.tasks.fold_ledger',
+        'schedule': float(config('LEDGER_FOLD_SECONDS', default=60, cast=int)),
+    },
+}
 
 # DRF + JWT
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication that also resolves profile ids, see users/authentication.py
+        'users.authentication.ProfileJWTAuthentication',
     ),
+    # Keyset pagination on (created_at, id), see fairtrace_backend/pagination.py
+    'DEFAULT_PAGINATION_CLASS': 'fairtrace_backend.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': config('API_PAGE_SIZE', default=50, cast=int),
 }
 
 # SIMPLE JWT CONFIGURATION
@@ -169,10 +269,94 @@ CORS_ALLOWED_ORIGINS = [
     
 ]
 
-# WEB3 / BLOCKCHAIN SETTINGS
+# WEB3 / BLOCKCHAIN SETTINGS (onchain/client.py)
 WEB3_PROVIDER = config('WEB3_PROVIDER', default='http://127.0.0.1:8545')  # Ganache
+WEB3_POOL_SIZE = config('WEB3_POOL_SIZE', default=10, cast=int)  # keep-alive connections per process
+WEB3_REQUEST_TIMEOUT_SECONDS = config('WEB3_REQUEST_TIMEOUT_SECONDS', default=10, cast=int)
 CONTRACT_ADDRESS = config('CONTRACT_ADDRESS', default='0x0B306BF915C4d645ff596e518fAf3F9669b97016')
 PRODUCT_REGISTRY_ADDRESS = config('PRODUCT_REGISTRY_ADDRESS', default='0x959922bE3CAee4b8Cd9a407cc3ac1C251C2007B1')
+FARMER_REGISTRY_ADDRESS = config('FARMER_REGISTRY_ADDRESS', default=CONTRACT_ADDRESS)
+FAIRTRACE_TRANSPORT_ADDRESS = config('FAIRTRACE_TRANSPORT_ADDRESS', default='0x9A9f2CCfdE556A7E9Ff0848998Aa4a0CFD8863AE')
+SACCO_PURCHASES_ADDRESS = config('SACCO_PURCHASES_ADDRESS', default='0xc3e53F4d16Ae77Db1c982e75a937B9f60FE63690')
 CONTRACT_ABI_PATH = config('CONTRACT_ABI_PATH', default=str(BASE_DIR / "blockchain/artifacts/contracts/ProductRegistry.sol/ProductRegistry.json"))
 ADMIN_WALLET_ADDRESS = config('ADMIN_WALLET_ADDRESS', default='')
 ADMIN_WALLET_PRIVATE_KEY = config('ADMIN_WALLET_PRIVATE_KEY', default='')
+
+# FARMER REGISTRY (farmers/web3_helpers.py)
+# FarmerRegistry lives on its own node (reads and writes, see onchain/client.py PROVIDERS) and is
+# written with its own wallet; unset, they are WEB3_PROVIDER and the admin wallet
+SEPOLIA_RPC_URL = config('SEPOLIA_RPC_URL', default=WEB3_PROVIDER)
+WEB3_PRIVATE_KEY = config('WEB3_PRIVATE_KEY', default=ADMIN_WALLET_PRIVATE_KEY)
+
+# ON-CHAIN READS (onchain/enumeration.py)
+MULTICALL3_ADDRESS = config('MULTICALL3_ADDRESS', default='0xcA11bde05977b3631167028862bE2a173976CA11')  # canonical deployment; skipped where it has no code
+MULTICALL_BATCH_SIZE = config('MULTICALL_BATCH_SIZE', default=100, cast=int)  # calls per aggregate3
+CHAIN_PAGE_SIZE = config('CHAIN_PAGE_SIZE', default=200, cast=int)  # records per getProducts/getFarmers page
+CHAIN_READ_WORKERS = config('CHAIN_READ_WORKERS', default=4, cast=int)  # concurrent reads; keep <= WEB3_POOL_SIZE
+
+# TRANSACTION SIGNER (onchain/signer.py)
+SIGNER_STUCK_AFTER_SECONDS = config('SIGNER_STUCK_AFTER_SECONDS', default=120, cast=int)
+SIGNER_FEE_BUMP_PERCENT = config('SIGNER_FEE_BUMP_PERCENT', default=15, cast=int)  # nodes require >= 10% to replace
+SIGNER_MAX_GAS_PRICE_GWEI = config('SIGNER_MAX_GAS_PRICE_GWEI', default=200, cast=int)
+
+# CHAIN EVENT INDEXER (onchain/indexer.py)
+CHAIN_INDEXER_CONTRACTS = config(
+    'CHAIN_INDEXER_CONTRACTS',
+    default='ProductRegistry,FairTraceTransport,SaccoPurchases',
+    cast=lambda v: [name.strip() for name in v.split(',') if name.strip()],
+)
+CHAIN_INDEXER_START_BLOCK = config('CHAIN_INDEXER_START_BLOCK', default=0, cast=int)  # deployment block
+CHAIN_INDEXER_BATCH_BLOCKS = config('CHAIN_INDEXER_BATCH_BLOCKS', default=2000, cast=int)  # blocks per eth_getLogs
+CHAIN_INDEXER_REORG_DEPTH = config('CHAIN_INDEXER_REORG_DEPTH', default=12, cast=int)  # blocks re-read after a reorg
+CHAIN_INDEXER_POLL_SECONDS = config('CHAIN_INDEXER_POLL_SECONDS', default=15, cast=int)  # --follow and celery beat
+
+# PUBLIC FRONTEND / QR CODES (products/qr.py)
+FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
+QR_FORMAT = config('QR_FORMAT', default='png')  # 'png' or 'svg'
+
+# PUBLIC TRACE CACHE (products/trace_cache.py)
+TRACE_CACHE_TIMEOUT = config('TRACE_CACHE_TIMEOUT', default=3600, cast=int)  # seconds; entries are also invalidated on change
+TRACE_VERIFY_BLOCK_TTL = config('TRACE_VERIFY_BLOCK_TTL', default=5, cast=int)  # seconds the chain head is reused for ?verify=1
+TRACE_VERIFY_CACHE_TIMEOUT = config('TRACE_VERIFY_CACHE_TIMEOUT', default=600, cast=int)  # per (record, block) registry reads
+
+# API RESPONSES
+PRODUCT_LOCATIONS_LIMIT = config('PRODUCT_LOCATIONS_LIMIT', default=100, cast=int)  # latest GPS points per product
+
+# GPS INGESTION (products/ingest.py)
+LOCATION_INGEST_TOKEN = config('LOCATION_INGEST_TOKEN', default='')  # shared with socket-server; empty disables token auth
+LOCATION_INGEST_MAX_BATCH = config('LOCATION_INGEST_MAX_BATCH', default=5000, cast=int)
+LOCATION_INGEST_CHUNK_SIZE = config('LOCATION_INGEST_CHUNK_SIZE', default=1000, cast=int)
+LOCATION_FIX_MAX_FUTURE_SECONDS = config('LOCATION_FIX_MAX_FUTURE_SECONDS', default=300, cast=int)  # device clock skew allowed
+LOCATION_FIX_MAX_AGE_HOURS = config('LOCATION_FIX_MAX_AGE_HOURS', default=72, cast=int)  # older buffered fixes are rejected
+
+# TRANSPORT ROUTES (products/routes.py)
+ROUTE_SIMPLIFY_TOLERANCE_M = config('ROUTE_SIMPLIFY_TOLERANCE_M', default=10.0, cast=float)
+ROUTE_MAX_TOLERANCE_M = config('ROUTE_MAX_TOLERANCE_M', default=5000.0, cast=float)
+ROUTE_LIVE_MAX_POINTS = config('ROUTE_LIVE_MAX_POINTS', default=5000, cast=int)  # fixes read for a route still in transit
+ROUTE_RAW_RETENTION_DAYS = config('ROUTE_RAW_RETENTION_DAYS', default=30, cast=int)  # 0 keeps raw fixes forever
+ROUTE_ARCHIVE_RAW = config('ROUTE_ARCHIVE_RAW', default=True, cast=bool)  # gzipped CSV on default storage before deleting
+
+# TRANSPORT LOCATION PARTITIONS (products/partitions.py)
+LOCATION_PARTITIONS_AHEAD = config('LOCATION_PARTITIONS_AHEAD', default=3, cast=int)  # months created in advance
+LOCATION_PARTITION_RETENTION_MONTHS = config('LOCATION_PARTITION_RETENTION_MONTHS', default=0, cast=int)  # 0 keeps every month
+LOCATION_PARTITION_ARCHIVE = config('LOCATION_PARTITION_ARCHIVE', default=True, cast=bool)  # gzipped CSV before dropping
+
+# REVIEW QUEUE (products/decisions.py)
+BULK_DECISION_MAX_ITEMS = config('BULK_DECISION_MAX_ITEMS', default=1000, cast=int)  # decisions per request
+
+# FARMER BULK IMPORT (farmers/imports.py)
+FARMER_IMPORT_MAX_ROWS = config('FARMER_IMPORT_MAX_ROWS', default=50000, cast=int)
+FARMER_IMPORT_CHUNK_SIZE = config('FARMER_IMPORT_CHUNK_SIZE', default=1000, cast=int)  # rows per bulk_create transaction
+FARMER_IMPORT_MAX_ERRORS = config('FARMER_IMPORT_MAX_ERRORS', default=500, cast=int)  # invalid rows reported on the job
+
+# ON-CHAIN ANCHORING (products/tasks.py)
+# 'single': one registerProduct tx per approval; 'merkle': one root tx per batch window
+ANCHOR_MODE = config('ANCHOR_MODE', default='single')
+ANCHOR_BATCH_MAX_SIZE = config('ANCHOR_BATCH_MAX_SIZE', default=1000, cast=int)
+ANCHOR_GAS_LIMIT = config('ANCHOR_GAS_LIMIT', default=500000, cast=int)
+ANCHOR_GAS_PRICE_GWEI = config('ANCHOR_GAS_PRICE_GWEI', default=2, cast=int)
+ANCHOR_MAX_ATTEMPTS = config('ANCHOR_MAX_ATTEMPTS', default=5, cast=int)
+ANCHOR_RETRY_DELAY_SECONDS = config('ANCHOR_RETRY_DELAY_SECONDS', default=30, cast=int)
+ANCHOR_RECEIPT_POLL_SECONDS = config('ANCHOR_RECEIPT_POLL_SECONDS', default=5, cast=int)
+ANCHOR_RECEIPT_TIMEOUT_SECONDS = config('ANCHOR_RECEIPT_TIMEOUT_SECONDS', default=600, cast=int)
+ANCHOR_STALE_AFTER_SECONDS = config('ANCHOR_STALE_AFTER_SECONDS', default=300, cast=int)
@@ -7,6 +7,7 @@ from rest_framework_simplejwt.views import (
 )
 
 from users.views import TransporterListAPIView
+from products.views import qr_image
 
 # Define the home function here
 def home(request):
@@ -31,6 +32,7 @@ urlpatterns = [
     path("api/sacco_admin/", include("products.urls")),  # maps to products views
     #path('api/trace/', include('products.urls')),
     path('api/trace/', include('products.trace_urls')),
+    path('api/qr/<str:filename>', qr_image, name='product-qr'),  # content-addressed QR images
     path("api/payments/", include("payments.urls")),
     path("api/auth/", include("rest_framework.urls")),
     path("api/", include("billing.urls")),# optional for browsable
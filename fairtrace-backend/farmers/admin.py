@@ -1,8 +1,15 @@
 from django.contrib import admin
-from .models import Farmer
+from .models import Farmer, FarmerImportJob
 
 @admin.register(Farmer)
 class FarmerAdmin(admin.ModelAdmin):
     list_display = ('email', 'full_name', 'sacco_membership', 'national_id', 'onchain_status', 'created_at')
     search_fields = ('email', 'full_name', 'national_id', 'sacco_membership', 'sacco_name')
     list_filter = ('onchain_status', 'created_at')
+
+
+@admin.register(FarmerImportJob)
+class FarmerImportJobAdmin(admin.ModelAdmin):
+    list_display = ('uid', 'status', 'total_rows', 'imported_rows', 'invalid_rows', 'onchain_status', 'created_at')
+    list_filter = ('status', 'onchain_status')
+    readonly_fields = ('uid', 'merkle_root', 'tx_hash', 'block_number', 'errors', 'created_at', 'updated_at', 'finished_at')
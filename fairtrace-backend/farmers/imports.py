@@ -0,0 +1,203 @@
+# farmers/imports.py
+"""
+Bulk farmer import from a CSV or JSON file, for SACCOs onboarding their
+members in one go instead of one RegisterView request (and one on-chain
+transaction) per farmer.
+
+A FarmerImportJob holds the uploaded file and reports progress; the work
+runs in the `run_farmer_import` task (or synchronously from the
+`import_farmers` command):
+
+1. every row is validated with one reused FarmerImportRowSerializer, and
+   duplicate national IDs are found in one pass over the file and one query
+   against the table;
+2. membership numbers and payload hashes (the same hashed payload
+   RegisterView registers, see web3_helpers.farmer_payload) are computed for
+   all valid rows at once;
+3. the farmers are written with `bulk_create`, FARMER_IMPORT_CHUNK_SIZE rows
+   per transaction, and `imported_rows` is saved after every chunk;
+4. a Merkle tree (products.merkle) is built over the payload hashes and its
+   root is committed to FarmerRegistry (registerFarmerBatch) in a single
+   transaction, on the farmer registry's own network. Every farmer keeps
+   its proof, so any one of them can be checked against the anchored root.
+
+Rows that fail validation are skipped and reported on the job (the first
+FARMER_IMPORT_MAX_ERRORS of them). Imported farmers get no welcome email;
+they have no account yet.
+
+CSV files need a header row with the field names below; JSON files hold a
+list of objects, or {"farmers": [...]}.
+"""
+import csv
+import io
+import json
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from products import merkle
+
+from . import web3_helpers
+from .models import Farmer, FarmerImportJob, allocate_membership_numbers
+from .serializers import FarmerImportRowSerializer
+
+logger = logging.getLogger(__name__)
+
+FIELDS = FarmerImportRowSerializer.Meta.fields
+
+
+def read_rows(job):
+    """The rows of `job.source` as dicts, blank values dropped. Raises ValueError if unreadable."""
+    with job.source.open("rb") as f:
+        raw = f.read()
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise ValueError(f"not UTF-8 ({exc})")
+
+    if job.format == "csv":
+        try:
+            records = list(csv.DictReader(io.StringIO(text)))
+        except csv.Error as exc:
+            raise ValueError(str(exc))
+    else:
+        try:
+            records = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ValueError(str(exc))
+        if isinstance(records, dict):
+            records = records.get("farmers")
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise ValueError("expected a list of farmer objects")
+
+    rows = []
+    for record in records:
+        row = {}
+        for key, value in record.items():
+            if key is None:  # CSV row with more cells than headers
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+            if value not in ("", None):
+                row[key.strip().lower()] = value
+        rows.append(row)
+    return rows
+
+
+def validate(rows):
+    """
+    Split `rows` into unsaved Farmer instances and errors
+    ([{"row": n, "errors": {...}}], n counting from 1).
+    """
+    serializer = FarmerImportRowSerializer()
+    validated, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        try:
+            validated.append((number, serializer.run_validation(row)))
+        except serializers.ValidationError as exc:
+            errors.append({"row": number, "errors": exc.detail})
+
+    # national IDs must be unique, both within the file and against existing farmers
+    national_ids = [data["national_id"] for _, data in validated]
+    taken = set(Farmer.objects.filter(national_id__in=national_ids).values_list("national_id", flat=True))
+    farmers, seen = [], set()
+    for number, data in validated:
+        national_id = data["national_id"]
+        if national_id in taken:
+            errors.append({"row": number, "errors": {"national_id": ["A farmer with this national ID already exists."]}})
+        elif national_id in seen:
+            errors.append({"row": number, "errors": {"national_id": ["Duplicate national ID in this file."]}})
+        else:
+            seen.add(national_id)
+            farmers.append(Farmer(**data))
+    errors.sort(key=lambda error: error["row"])
+    return farmers, errors
+
+
+def _update(job, **fields):
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.save(update_fields=[*fields, "updated_at"])
+
+
+def run(job):
+    """
+    Import `job` (see the module docstring), saving its progress as it goes.
+    Returns the ChainTransaction of the Merkle root, or None if the import
+    failed or the root could not be sent.
+    """
+    _update(job, status="importing")
+    try:
+        rows = read_rows(job)
+    except ValueError as exc:
+        _update(job, status="failed", error=f"Unreadable {job.format} file: {exc}", finished_at=timezone.now())
+        return None
+    if len(rows) > settings.FARMER_IMPORT_MAX_ROWS:
+        _update(job, status="failed", total_rows=len(rows), finished_at=timezone.now(),
+                error=f"{len(rows)} rows; at most {settings.FARMER_IMPORT_MAX_ROWS} can be imported at once")
+        return None
+
+    farmers, errors = validate(rows)
+    _update(job, total_rows=len(rows), valid_rows=len(farmers), invalid_rows=len(errors),
+            errors=errors[:settings.FARMER_IMPORT_MAX_ERRORS])
+    if not farmers:
+        _update(job, status="failed", error="No valid rows", finished_at=timezone.now())
+        return None
+
+    # bulk_create does not call Farmer.save(), so the numbers are allocated here
+    for farmer, number in zip(farmers, allocate_membership_numbers(len(farmers))):
+        farmer.sacco_membership = number
+        farmer.import_job = job
+        farmer.contract_address = settings.FARMER_REGISTRY_ADDRESS
+    hashes = web3_helpers.payload_hashes(farmers)
+    levels = merkle.build_levels(hashes)
+    for index, (farmer, data_hash) in enumerate(zip(farmers, hashes)):
+        farmer.data_hash = data_hash
+        farmer.merkle_proof = merkle.merkle_proof(levels, index)
+
+    size = settings.FARMER_IMPORT_CHUNK_SIZE
+    for start in range(0, len(farmers), size):
+        try:
+            with transaction.atomic():
+                Farmer.objects.bulk_create(farmers[start:start + size])
+        except IntegrityError as exc:
+            # earlier chunks stay imported
+            _update(job, status="failed", error=f"Rows after {start} not imported: {exc}", finished_at=timezone.now())
+            return None
+        _update(job, imported_rows=min(start + size, len(farmers)))
+    logger.info("Farmer import %s: %s of %s rows imported", job.uid, job.imported_rows, job.total_rows)
+
+    _update(job, status="anchoring", merkle_root=merkle.merkle_root(levels),
+            contract_address=settings.FARMER_REGISTRY_ADDRESS, onchain_status="pending")
+    try:
+        chain_tx = web3_helpers.send_import_root(job)
+    except Exception as exc:
+        logger.warning("Anchoring farmer import %s failed: %s", job.uid, exc)
+        job.farmers.update(onchain_status="failed")
+        # the farmers are in; only the on-chain record is missing
+        _update(job, status="completed", onchain_status="failed", error=f"Merkle root not sent: {exc}",
+                finished_at=timezone.now())
+        return None
+    job.farmers.update(onchain_tx=chain_tx.tx_hash)
+    _update(job, chain_tx=chain_tx, tx_hash=chain_tx.tx_hash)
+    logger.info("Farmer import %s root %s sent: %s", job.uid, job.merkle_root, chain_tx.tx_hash)
+    return chain_tx
+
+
+def schedule(job):
+    """Run `job` on the worker once the surrounding transaction commits."""
+    from .tasks import run_farmer_import
+
+    def dispatch():
+        try:
+            run_farmer_import.delay(job.id)
+        except Exception:
+            logger.exception("Could not dispatch farmer import %s", job.uid)
+            FarmerImportJob.objects.filter(pk=job.pk, status="pending").update(
+                status="failed", error="Could not queue the import", finished_at=timezone.now(), updated_at=timezone.now()
+            )
+
+    transaction.on_commit(dispatch)
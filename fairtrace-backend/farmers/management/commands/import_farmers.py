@@ -0,0 +1,73 @@
+# farmers/management/commands/import_farmers.py
+"""
+Bulk-import farmers from a CSV or JSON file (see farmers/imports.py).
+
+    python manage.py import_farmers members.csv
+    python manage.py import_farmers members.json --created-by admin@sacco.co.ke
+    python manage.py import_farmers members.csv --async   # leave it to the worker
+
+Runs in this process by default and prints the job, which can also be
+followed at /api/farmers/import/<uid>/.
+"""
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from farmers import imports
+from farmers.models import FarmerImportJob
+from farmers.tasks import confirm_farmer_import
+
+
+class Command(BaseCommand):
+    help = "Import farmers in bulk from a CSV or JSON file and anchor the batch on-chain."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (with a header row) or JSON file.")
+        parser.add_argument("--format", choices=["csv", "json"], help="Defaults to the file extension.")
+        parser.add_argument("--created-by", help="Email of the user the job is recorded against.")
+        parser.add_argument("--async", action="store_true", dest="run_async", help="Queue the job for the worker.")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"No such file: {path}")
+        fmt = options["format"] or path.suffix.lstrip(".").lower()
+        if fmt not in dict(FarmerImportJob.FORMAT_CHOICES):
+            raise CommandError("Pass --format csv or --format json.")
+        user = None
+        if options["created_by"]:
+            user = get_user_model().objects.filter(email=options["created_by"]).first()
+            if user is None:
+                raise CommandError(f"No user {options['created_by']}")
+
+        job = FarmerImportJob(created_by=user, format=fmt)
+        with path.open("rb") as f:
+            job.source.save(f"{job.uid}.{fmt}", File(f), save=False)
+        if options["run_async"]:
+            with transaction.atomic():
+                job.save()
+                imports.schedule(job)
+            self.stdout.write(f"Queued farmer import {job.uid}")
+            return
+
+        job.save()
+        chain_tx = imports.run(job)
+        if chain_tx is not None:
+            try:
+                confirm_farmer_import.apply_async((job.id,), countdown=0)
+            except Exception as exc:
+                self.stderr.write(f"Could not queue the receipt check ({exc}); the farmers stay pending until it runs.")
+
+        self.stdout.write(
+            f"Farmer import {job.uid}: {job.status}; {job.imported_rows} imported, "
+            f"{job.invalid_rows} invalid of {job.total_rows} rows"
+        )
+        for error in job.errors:
+            self.stdout.write(f"  row {error['row']}: {error['errors']}")
+        if job.error:
+            self.stderr.write(job.error)
+        if job.merkle_root:
+            self.stdout.write(f"Merkle root {job.merkle_root}" + (f", tx {job.tx_hash}" if job.tx_hash else ""))
@@ -0,0 +1,19 @@
+# Sequence behind SACCO membership numbers (farmers.models.allocate_membership_numbers).
+# Numbers start at FT-1000000, above the random FT-100000..FT-999999 range used
+# before, so existing members keep their numbers and nothing can collide.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0008_farmerimportjob'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE SEQUENCE farmers_membership_seq START WITH 1000000 OWNED BY farmers_farmer.sacco_membership",
+            "DROP SEQUENCE farmers_membership_seq",
+        ),
+    ]
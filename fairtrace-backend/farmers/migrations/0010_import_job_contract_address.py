@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0009_membership_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='farmerimportjob',
+            name='contract_address',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
@@ -1,7 +1,27 @@
 import uuid
-from django.db import models
+from django.db import connection, models
 from django.conf import settings
 
+# Postgres sequence behind SACCO membership numbers (migration 0009). It
+# starts at 1000000, above the old random FT-NNNNNN numbers, so new numbers
+# never collide with them.
+MEMBERSHIP_SEQUENCE = 'farmers_membership_seq'
+
+
+def allocate_membership_numbers(count=1):
+    """
+    `count` new SACCO membership numbers (FT-1000000, FT-1000001, ...) in one
+    query. nextval() takes no lock and never hands out a number twice, even
+    to concurrent transactions; numbers of rolled-back transactions are
+    skipped, not reused.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT nextval('{MEMBERSHIP_SEQUENCE}') FROM generate_series(1, %s)", [count]
+        )
+        return [f"FT-{value}" for (value,) in cursor.fetchall()]
+
+
 class Farmer(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -35,13 +55,62 @@ class Farmer(models.Model):
     onchain_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     onchain_tx = models.CharField(max_length=200, blank=True)
     contract_address = models.CharField(max_length=100, blank=True)
+    data_hash = models.CharField(max_length=66, blank=True)  # keccak of the hashed payload, see web3_helpers
+    import_job = models.ForeignKey(
+        'FarmerImportJob', on_delete=models.SET_NULL, null=True, blank=True, related_name='farmers'
+    )
+    merkle_proof = models.JSONField(null=True, blank=True)  # data_hash -> import_job.merkle_root
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"])]  # keyset pagination
 
     def save(self, *args, **kwargs):
         if not self.sacco_membership:
-            # Example: auto-generate SACCO membership number, e.g., FT-123456
-            import random
-            self.sacco_membership = f"FT-{random.randint(100000, 999999)}"
+            self.sacco_membership = allocate_membership_numbers()[0]
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.full_name} - {self.uid}"
+
+
+class FarmerImportJob(models.Model):
+    """A bulk farmer import from CSV/JSON, run by farmers.tasks.run_farmer_import (see farmers/imports.py)."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('importing', 'Importing'),
+        ('anchoring', 'Anchoring'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('json', 'JSON'),
+    ]
+
+    uid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='farmer_imports'
+    )
+    source = models.FileField(upload_to='farmer_imports/')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total_rows = models.PositiveIntegerField(default=0)
+    valid_rows = models.PositiveIntegerField(default=0)
+    imported_rows = models.PositiveIntegerField(default=0)
+    invalid_rows = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # [{"row": n, "errors": {...}}], first FARMER_IMPORT_MAX_ERRORS
+    error = models.TextField(blank=True)  # why the job failed
+
+    merkle_root = models.CharField(max_length=66, blank=True)
+    contract_address = models.CharField(max_length=100, blank=True)  # the FarmerRegistry the root went to
+    onchain_status = models.CharField(max_length=20, choices=Farmer.STATUS_CHOICES, blank=True)
+    chain_tx = models.ForeignKey('onchain.ChainTransaction', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    tx_hash = models.CharField(max_length=66, blank=True)
+    block_number = models.BigIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Farmer import {self.uid} ({self.imported_rows}/{self.total_rows}) - {self.status}"
@@ -2,7 +2,7 @@
 
 # farmers/serializers.py
 from rest_framework import serializers
-from .models import Farmer
+from .models import Farmer, FarmerImportJob
 
 class FarmerSerializer(serializers.ModelSerializer):
     first_name = serializers.CharField(source='user.first_name')
@@ -11,4 +11,27 @@ class FarmerSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Farmer
-        fields = ['first_name', 'last_name', 'email', 'phone', 'farm_address']
\ No newline at end of file
+        fields = ['first_name', 'last_name', 'email', 'phone', 'farm_address']
+
+
+class FarmerImportRowSerializer(serializers.ModelSerializer):
+    """One row of a bulk import (farmers/imports.py)."""
+
+    class Meta:
+        model = Farmer
+        fields = ['full_name', 'national_id', 'phone', 'email', 'farm_address',
+                  'gps_lat', 'gps_long', 'farm_size', 'main_crops']
+
+
+class FarmerImportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = FarmerImportJob
+        fields = ['uid', 'status', 'format', 'total_rows', 'valid_rows', 'imported_rows', 'invalid_rows',
+                  'progress', 'errors', 'error', 'merkle_root', 'contract_address', 'onchain_status', 'tx_hash', 'block_number',
+                  'created_at', 'updated_at', 'finished_at']
+
+    def get_progress(self, job):
+        """Share of the valid rows imported so far, 0-1."""
+        return round(job.imported_rows / job.valid_rows, 4) if job.valid_rows else 0
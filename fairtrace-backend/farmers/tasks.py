@@ -0,0 +1,65 @@
+# farmers/tasks.py
+"""Celery tasks for bulk farmer imports (see farmers/imports.py)."""
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from web3 import Web3
+
+from products.anchoring import fetch_receipt
+
+from . import imports, web3_helpers
+from .models import FarmerImportJob
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(acks_late=True)
+def run_farmer_import(job_id):
+    """Import a pending FarmerImportJob and send its Merkle root."""
+    job = FarmerImportJob.objects.filter(pk=job_id, status="pending").first()
+    if job is None:
+        return
+    if imports.run(job) is not None:
+        confirm_farmer_import.apply_async((job.id,), countdown=settings.ANCHOR_RECEIPT_POLL_SECONDS)
+
+
+@shared_task(bind=True, acks_late=True, max_retries=None)
+def confirm_farmer_import(self, job_id):
+    """Poll for the receipt of an import's Merkle root and settle its farmers."""
+    job = FarmerImportJob.objects.select_related("chain_tx").filter(pk=job_id, status="anchoring").first()
+    if job is None or not job.tx_hash:
+        return
+
+    chain_tx = job.chain_tx
+    # roots are sent by the farmer registry's signer; jobs from before the signer only have a hash
+    receipt = web3_helpers.farmer_signer().refresh(chain_tx) if chain_tx else fetch_receipt(job.tx_hash)
+    if receipt is None:
+        last_sent = max(job.updated_at, chain_tx.updated_at) if chain_tx else job.updated_at
+        waited = timezone.now() - last_sent
+        if waited > timedelta(seconds=settings.ANCHOR_RECEIPT_TIMEOUT_SECONDS):
+            error = f"No receipt for {job.tx_hash} after {waited}"
+            with transaction.atomic():
+                job.farmers.update(onchain_status="failed")
+                FarmerImportJob.objects.filter(pk=job_id).update(
+                    status="completed", onchain_status="failed", error=error,
+                    finished_at=timezone.now(), updated_at=timezone.now(),
+                )
+            return
+        raise self.retry(countdown=settings.ANCHOR_RECEIPT_POLL_SECONDS)
+
+    if receipt.status == 1:
+        new_status, error = "confirmed", ""
+    else:
+        new_status, error = "failed", f"Transaction reverted in block {receipt.blockNumber}"
+    tx_hash = Web3.to_hex(receipt.transactionHash)
+    with transaction.atomic():
+        job.farmers.update(onchain_status=new_status, onchain_tx=tx_hash)
+        FarmerImportJob.objects.filter(pk=job_id).update(
+            status="completed", onchain_status=new_status, error=error, tx_hash=tx_hash,
+            block_number=receipt.blockNumber, finished_at=timezone.now(), updated_at=timezone.now(),
+        )
+    logger.info("Farmer import %s root %s in block %s", job.uid, new_status, receipt.blockNumber)
@@ -1,3 +1,96 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from onchain.client import get_contract
+from onchain.models import ChainTransaction
+from products import merkle
+
+from . import imports, web3_helpers
+from .models import Farmer, FarmerImportJob
+
+CSV = """full_name,national_id,phone,email,farm_address,gps_lat,gps_long,main_crops
+Jane Wanjiku,1001,0711000001,jane@example.com,Kiambu,-1.1714,36.8356,Coffee
+Peter Otieno,1002,0711000002,not-an-email,Kisumu,,,
+John Kamau,1001,0711000003,john@example.com,Nyeri,,,Tea
+Mary Achieng,1003,0711000004,mary@example.com,Siaya,,,Maize
+Ann Njeri,1004,0711000005,ann@example.com,Murang'a,,,Coffee
+"""
+
+
+REGISTRY = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+
+@override_settings(FARMER_REGISTRY_ADDRESS=REGISTRY)
+class FarmerImportTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(override_settings(MEDIA_ROOT=media, FARMER_IMPORT_CHUNK_SIZE=2))
+        chain_tx = ChainTransaction.objects.create(
+            chain_id=1337, sender="0x" + "11" * 20, nonce=0, tx_params={}, gas_price=1, tx_hash="0x" + "ab" * 32
+        )
+        self.send = self.enterContext(mock.patch.object(web3_helpers, "send_import_root", return_value=chain_tx))
+
+    def job(self, content, fmt="csv"):
+        job = FarmerImportJob(format=fmt)
+        job.source.save(f"{job.uid}.{fmt}", ContentFile(content.encode()), save=False)
+        job.save()
+        return job
+
+    def test_imports_valid_rows_and_anchors_one_root(self):
+        Farmer.objects.create(full_name="Existing", national_id="1004", phone="0", email="e@example.com", farm_address="x")
+        job = self.job(CSV)
+
+        with self.assertNumQueries(11):  # one INSERT per chunk of FARMER_IMPORT_CHUNK_SIZE rows, none per row
+            imports.run(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total_rows, job.imported_rows, job.invalid_rows), ("anchoring", 5, 2, 3))
+        self.assertEqual([error["row"] for error in job.errors], [2, 3, 5])
+        self.assertEqual(job.contract_address, REGISTRY)
+        self.send.assert_called_once()
+
+        farmers = list(job.farmers.order_by("national_id"))
+        self.assertEqual([f.national_id for f in farmers], ["1001", "1003"])
+        for farmer in farmers:
+            payload = json.dumps(web3_helpers.farmer_payload(farmer), sort_keys=True)
+            self.assertEqual(farmer.data_hash, web3_helpers.compute_data_hash(payload).to_0x_hex())
+            self.assertTrue(merkle.verify_proof(farmer.data_hash, farmer.merkle_proof, job.merkle_root))
+            self.assertEqual(farmer.onchain_tx, job.tx_hash)
+        # one sequence range, continuing from the number Farmer.save() took for "Existing"
+        numbers = sorted(int(f.sacco_membership.removeprefix("FT-")) for f in Farmer.objects.all())
+        self.assertEqual(numbers, list(range(numbers[0], numbers[0] + 3)))
+
+    def test_unreadable_file_fails_the_job(self):
+        job = self.job("{not json", fmt="json")
+        imports.run(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertIn("Unreadable json file", job.error)
+        self.send.assert_not_called()
+
+
+@override_settings(FARMER_REGISTRY_ADDRESS=REGISTRY, SEPOLIA_RPC_URL="http://farmers.test:8545",
+                   WEB3_PRIVATE_KEY="0x" + "22" * 32)
+class SendImportRootTests(TestCase):
+    def setUp(self):
+        get_contract.cache_clear()
+        self.addCleanup(get_contract.cache_clear)
+        self.get_signer = self.enterContext(mock.patch.object(web3_helpers, "get_signer"))
+
+    def test_commits_the_root_to_the_farmer_registry(self):
+        job = FarmerImportJob(format="csv", merkle_root="0x" + "cd" * 32, imported_rows=3)
+
+        web3_helpers.send_import_root(job)
+
+        # the farmer registry's own network and wallet, not ProductRegistry's
+        self.get_signer.assert_called_once_with("0x" + "22" * 32, "http://farmers.test:8545")
+        call = self.get_signer.return_value.send.call_args.args[0]
+        self.assertEqual((call.address, call.fn_name), (REGISTRY, "registerFarmerBatch"))
+        self.assertEqual(call.args, ("0x" + "cd" * 32, 3))
+        self.assertEqual(call.w3.provider.endpoint_uri, "http://farmers.test:8545")
@@ -2,10 +2,13 @@ from django.urls import path
 from . import views
 from .views import RegisterView
 from .views import SaccoAdminProductListView
+from .views import FarmerImportView, FarmerImportStatusView
 
 urlpatterns = [
     path('', views.list_farmers, name='list_farmers'),
     path('register/', RegisterView.as_view(), name='farmer-register'),
     path('', views.list_farmers, name='list_farmers'),
     path('products/', SaccoAdminProductListView.as_view(), name='sacco-admin-products'),
+    path('import/', FarmerImportView.as_view(), name='farmer-import'),
+    path('import/<uuid:uid>/', FarmerImportStatusView.as_view(), name='farmer-import-status'),
 ]
@@ -4,9 +4,10 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import api_view
 from django.conf import settings
-from django.core.mail import send_mail
+from notifications.outbox import queue_email
 from web3 import Web3
 
+from fairtrace_backend.pagination import paginate, paginated_response
 from .serializers import FarmerSerializer
 from .models import Farmer
 from . import web3_helpers
@@ -22,19 +23,11 @@ class RegisterView(APIView):
         farmer = serializer.save()
 
         # Build payload to hash (no raw PII on chain)
-        payload = {
-            "uid": str(farmer.uid),
-            "full_name_hash": Web3.keccak(text=farmer.full_name).hex(),
-            "national_id_hash": Web3.keccak(text=farmer.national_id).hex(),
-            "phone_hash": Web3.keccak(text=farmer.phone).hex(),
-            "email_hash": Web3.keccak(text=farmer.email).hex(),
-            "gps": {"lat": str(farmer.gps_lat), "long": str(farmer.gps_long)},
-            "sacco": {"membership": farmer.sacco_membership}
-        }
-        payload_json = json.dumps(payload, sort_keys=True)
+        payload_json = json.dumps(web3_helpers.farmer_payload(farmer), sort_keys=True)
 
         try:
             data_hash = web3_helpers.compute_data_hash(payload_json)
+            farmer.data_hash = Web3.to_hex(data_hash)
             tx_hash = web3_helpers.send_register_transaction(str(farmer.uid), data_hash)
             farmer.onchain_status = 'confirmed'
             farmer.onchain_tx = tx_hash
@@ -53,7 +46,7 @@ Contract: {settings.CONTRACT_ADDRESS}
 
 Keep your Farmer ID safe.
 """
-            send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [farmer.email], fail_silently=False)
+            queue_email(farmer.email, subject, message, from_email=settings.DEFAULT_FROM_EMAIL, purpose="registration")
 
             return Response({
                 "msg": "registered",
@@ -69,9 +62,8 @@ Keep your Farmer ID safe.
 # ✅ Corrected farmers list endpoint
 @api_view(['GET'])
 def list_farmers(request):
-    farmers = Farmer.objects.all()
-    serializer = FarmerSerializer(farmers, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    farmers = Farmer.objects.select_related("user")
+    return paginated_response(request, farmers, FarmerSerializer)
 
 # sacco_admin/views.py
 from rest_framework.views import APIView
@@ -90,11 +82,13 @@ class SaccoAdminProductListView(APIView):
         if not request.user.is_sacco_admin:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
-        products = Product.objects.select_related('farmer__user').all()
+        # Product.farmer is the farmer's User; phone/address live on their Farmer profile
+        paginator, products = paginate(request, Product.objects.select_related('farmer__farmer_profile'))
         data = []
         for p in products:
             # build the payload exactly the way the front-end expects
-            farmer = p.farmer
+            user = p.farmer
+            profile = getattr(user, "farmer_profile", None)
             data.append({
                 "uid": str(p.uid),
                 "title": p.title,
@@ -104,11 +98,69 @@ class SaccoAdminProductListView(APIView):
                 "status": p.status,
                 "description": p.description,
                 "farmer": {
-                    "first_name": farmer.user.first_name,
-                    "last_name":  farmer.user.last_name,
-                    "email":      farmer.user.email,
-                    "phone":      farmer.phone,           # <-- from Farmer profile
-                    "farm_address": farmer.farm_address,  # <-- from Farmer profile
+                    "first_name": user.first_name,
+                    "last_name":  user.last_name,
+                    "email":      user.email,
+                    "phone":      getattr(profile, "phone", ""),         # <-- from Farmer profile
+                    "farm_address": getattr(profile, "farm_address", ""),  # <-- from Farmer profile
                 },
             })
-        return Response(data)
+        return paginator.get_paginated_response(data)
+
+
+# bulk import (farmers/imports.py)
+import json
+from django.core.files.base import ContentFile
+from django.db import transaction
+from rest_framework.parsers import JSONParser, MultiPartParser
+from .models import FarmerImportJob
+from .serializers import FarmerImportJobSerializer
+from . import imports
+
+
+class FarmerImportView(APIView):
+    """
+    POST a CSV/JSON file as multipart `file` (format taken from `format` or the
+    file extension), or a JSON body {"farmers": [...]}. Returns 202 with the
+    job; poll its Location for progress.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, JSONParser]
+
+    def post(self, request):
+        if not request.user.is_sacco_admin:
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        upload = request.FILES.get("file")
+        if upload is not None:
+            fmt = (request.data.get("format") or upload.name.rsplit(".", 1)[-1]).lower()
+            content = upload
+        elif isinstance(request.data.get("farmers"), list):
+            fmt = "json"
+            content = ContentFile(json.dumps(request.data["farmers"]).encode())
+        else:
+            return Response({"detail": "Send a CSV/JSON `file` or a `farmers` list."}, status=status.HTTP_400_BAD_REQUEST)
+        if fmt not in dict(FarmerImportJob.FORMAT_CHOICES):
+            return Response({"detail": "Format must be csv or json."}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            job = FarmerImportJob(created_by=request.user, format=fmt)
+            job.source.save(f"{job.uid}.{fmt}", content, save=False)
+            job.save()
+            imports.schedule(job)
+
+        response = Response(FarmerImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        response["Location"] = request.build_absolute_uri(f"{job.uid}/")
+        return response
+
+
+class FarmerImportStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, uid):
+        if not request.user.is_sacco_admin:
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+        job = FarmerImportJob.objects.filter(uid=uid).first()
+        if job is None:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(FarmerImportJobSerializer(job).data)
@@ -1,66 +1,11 @@
 import json
-import os
+
+from eth_utils import keccak
 from web3 import Web3
-from eth_account import Account
 from django.conf import settings
-from functools import lru_cache
-
-
-# ------------------------------
-# Lazy Web3 connection
-# ------------------------------
-@lru_cache
-def get_w3():
-    w3 = Web3(Web3.HTTPProvider(settings.SEPOLIA_RPC_URL))
-    if not w3.is_connected():
-        raise ConnectionError("Web3 provider not connected. Check SEPOLIA_RPC_URL.")
-    return w3
-
-
-# ------------------------------
-# Load ABI (cached)
-# ------------------------------
-@lru_cache
-def get_contract_abi():
-    abi_path = os.path.join(
-        settings.BASE_DIR,
-        "blockchain",
-        "artifacts",
-        "contracts",
-        "FairTraceRegistry.sol",
-        "FarmerRegistry.json"
-    )
-
-    if os.path.exists(abi_path):
-        with open(abi_path, "r") as f:
-            artifact = json.load(f)
-            contract_abi = artifact.get("abi")
-            if not contract_abi or not isinstance(contract_abi, list):
-                raise ValueError("ABI is missing or not a list in JSON artifact.")
-            return contract_abi
-
-    if getattr(settings, "CONTRACT_ABI_JSON", None):
-        contract_abi = json.loads(settings.CONTRACT_ABI_JSON)
-        if not isinstance(contract_abi, list):
-            raise ValueError("ABI from settings.CONTRACT_ABI_JSON is not a list.")
-        return contract_abi
-
-    raise FileNotFoundError(
-        f"ABI file not found at {abi_path} and CONTRACT_ABI_JSON not set."
-    )
 
-
-# ------------------------------
-# Lazy contract getter
-# ------------------------------
-@lru_cache
-def get_contract():
-    w3 = get_w3()
-    contract_address = settings.CONTRACT_ADDRESS
-    return w3.eth.contract(
-        address=Web3.to_checksum_address(contract_address),
-        abi=get_contract_abi()
-    )
+from onchain.client import get_contract
+from onchain.signer import get_signer
 
 
 # ------------------------------
@@ -74,24 +19,53 @@ def compute_data_hash(payload_json_str: str) -> bytes:
     return Web3.keccak(text=payload_json_str)
 
 
+def farmer_payload(farmer) -> dict:
+    """What gets hashed for a farmer: hashes of the PII, never the PII itself."""
+    return {
+        "uid": str(farmer.uid),
+        "full_name_hash": keccak(text=farmer.full_name).hex(),
+        "national_id_hash": keccak(text=farmer.national_id).hex(),
+        "phone_hash": keccak(text=farmer.phone).hex(),
+        "email_hash": keccak(text=farmer.email).hex(),
+        "gps": {"lat": str(farmer.gps_lat), "long": str(farmer.gps_long)},
+        "sacco": {"membership": farmer.sacco_membership}
+    }
+
+
+def payload_hashes(farmers) -> list:
+    """`compute_data_hash` of every farmer's payload as 0x-hex, in one pass over `farmers`."""
+    encode = json.JSONEncoder(sort_keys=True).encode  # same output as json.dumps(..., sort_keys=True)
+    return ["0x" + keccak(text=encode(farmer_payload(farmer))).hex() for farmer in farmers]
+
+
+def farmer_signer():
+    """The farmer registry keeps its own network and wallet (SEPOLIA_RPC_URL, WEB3_PRIVATE_KEY)."""
+    return get_signer(settings.WEB3_PRIVATE_KEY, settings.SEPOLIA_RPC_URL)
+
+
 def send_register_transaction(farmer_uid: str, data_hash_bytes: bytes) -> str:
-    w3 = get_w3()
-    contract = get_contract()
+    contract = get_contract("FarmerRegistry", provider=settings.SEPOLIA_RPC_URL)
+    signer = farmer_signer()
 
-    acct = Account.from_key(settings.WEB3_PRIVATE_KEY)
     farmer_id_bytes32 = uid_to_bytes32(farmer_uid)
-    nonce = w3.eth.get_transaction_count(acct.address)
-
-    txn = contract.functions.registerFarmer(
-        farmer_id_bytes32,
-        data_hash_bytes
-    ).build_transaction({
-        "from": acct.address,
-        "nonce": nonce,
-        "gas": 300_000,
-        "gasPrice": w3.eth.gas_price,
-    })
-
-    signed_txn = acct.sign_transaction(txn)
-    tx_hash = w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-    return tx_hash.hex()
+    chain_tx = signer.send(
+        contract.functions.registerFarmer(farmer_id_bytes32, data_hash_bytes),
+        gas=300_000,
+        purpose=f"farmer:{farmer_uid}",
+    )
+    return chain_tx.tx_hash
+
+
+def send_import_root(job):
+    """
+    Commit the Merkle root of a FarmerImportJob with
+    FarmerRegistry.registerFarmerBatch(root, count), on the farmer registry's
+    own network and wallet. Returns the onchain.ChainTransaction.
+    """
+    contract = get_contract("FarmerRegistry", provider=settings.SEPOLIA_RPC_URL)
+    return farmer_signer().send(
+        contract.functions.registerFarmerBatch(job.merkle_root, job.imported_rows),
+        gas=settings.ANCHOR_GAS_LIMIT,
+        gas_price=Web3.to_wei(settings.ANCHOR_GAS_PRICE_GWEI, "gwei"),
+        purpose=f"farmer-import:{job.uid}",
+    )
@@ -7,5 +7,8 @@ class Feedback(models.Model):
     rating = models.IntegerField(default=5)  # 1–5 scale
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"])]  # keyset pagination
+
     def __str__(self):
         return f"Feedback {self.id} - {self.user.username}"
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistics', '0003_alter_delivery_created_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='delivery',
+            index=models.Index(fields=['created_at', 'id'], name='logistics_d_created_99eab6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transporter',
+            index=models.Index(fields=['created_at', 'id'], name='logistics_t_created_1e0542_idx'),
+        ),
+    ]
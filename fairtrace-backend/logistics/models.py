@@ -19,6 +19,9 @@ class Transporter(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"])]  # keyset pagination
+
     def __str__(self):
         # Safely get full_name, fallback to email
         full_name = getattr(self.user, "full_name", None)
@@ -52,5 +55,8 @@ class Delivery(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"])]  # keyset pagination
+
     def __str__(self):
         return f"Delivery #{self.id}"
@@ -1,3 +1,78 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from products.models import Product
+from users.models import User
+from users.serializers import MyTokenObtainPairSerializer
+from .models import Delivery, Transporter
+
+
+class ListQueryCountTests(TestCase):
+    """
+    Transporter-facing list endpoints run a fixed number of queries whatever
+    the number of rows (see products.tests.ListQueryCountTests).
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("driver@example.com", "pw", is_transporter=True)
+        self.transporter = Transporter.objects.create(user=self.user, phone="0700000000", vehicle="Truck", license_plate="KAA 001A")
+        self.client = APIClient()
+        self.login(self.user)
+
+    def login(self, user):
+        token = MyTokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def add_transporters(self, count):
+        for _ in range(count):
+            n = Transporter.objects.count()
+            user = User.objects.create_user(f"driver{n}@example.com", "pw", first_name=f"Driver {n}", is_transporter=True)
+            Transporter.objects.create(user=user, phone=f"07{n:08d}", vehicle="Pickup", license_plate=f"KBB {n:03d}B")
+
+    def add_deliveries(self, count):
+        Delivery.objects.bulk_create(
+            Delivery(transporter=self.transporter, pickup="Nyeri", dropoff="Nairobi", eta="2h", weight="100kg")
+            for _ in range(count)
+        )
+
+    def add_products(self, count, status):
+        for _ in range(count):
+            farmer = User.objects.create_user(f"farmer{User.objects.count()}@example.com", "pw")
+            Product.objects.create(farmer=farmer, title="Tea", quantity=Decimal("5"), status=status, transporter=self.transporter)
+
+    def assertConstantQueries(self, url, expected, grow):
+        """`expected` queries for `url` both before and after `grow()` adds rows."""
+        for _ in range(2):
+            with self.assertNumQueries(expected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.data)
+            grow()
+
+    def test_transporter_list(self):
+        self.add_transporters(2)
+        # user (JWT) + page
+        self.assertConstantQueries("/api/logistics/transporters/", 2, lambda: self.add_transporters(5))
+
+    def test_transporter_deliveries(self):
+        self.add_deliveries(2)
+        # user (JWT) + page; the transporter id comes from the token
+        self.assertConstantQueries("/api/logistics/transporters/deliveries/", 2, lambda: self.add_deliveries(5))
+
+    def test_pending_delivery_requests(self):
+        self.add_products(2, "approved")
+        self.assertConstantQueries("/api/logistics/delivery-requests/pending/", 2, lambda: self.add_products(5, "approved"))
+
+    def test_my_products(self):
+        self.add_products(2, "in_transit")
+        self.assertConstantQueries("/api/logistics/transporters/me/products/", 2, lambda: self.add_products(5, "in_transit"))
+
+    def test_profile_created_after_login(self):
+        user = User.objects.create_user("newdriver@example.com", "pw", is_transporter=True)
+        self.login(user)
+        self.assertEqual(self.client.get("/api/logistics/transporters/me/products/").status_code, 404)
 
-# Create your tests here.
+        transporter = Transporter.objects.create(user=user, phone="0711111111", vehicle="Van", license_plate="KCC 002C")
+        response = self.client.get("/api/logistics/transporters/me/")
+        self.assertEqual((response.status_code, response.data["id"]), (200, transporter.id))
@@ -4,6 +4,8 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from .models import Delivery
 from .serializers import TransporterSerializer, DeliverySerializer
+from fairtrace_backend.pagination import paginate
+from users.authentication import transporter_id
 import logging
 # logistics/serializers.py
 from logistics.models import Transporter  # instead of .models
@@ -34,8 +36,9 @@ class TransporterMeAPIView(APIView):
             )
 
         try:
-            transporter = Transporter.objects.get(user=user)
-            logger.debug(f"[DEBUG] Transporter profile found: {transporter}")
+            # by primary key, the id comes with the token (users/authentication.py)
+            transporter = Transporter.objects.get(pk=transporter_id(user))
+            logger.debug(f"[DEBUG] Transporter profile found: {transporter.id}")
 
             full_name = getattr(user, "full_name", None) or getattr(user, "username", None) or user.email
 
@@ -81,23 +84,21 @@ class TransporterDeliveriesAPIView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        try:
-            transporter = Transporter.objects.get(user=user)
-            logger.debug(f"[DEBUG] Transporter profile found for deliveries: {transporter}")
-        except Transporter.DoesNotExist:
+        transporter = transporter_id(user)
+        if transporter is None:
             logger.debug("[DEBUG] Transporter profile not found for deliveries!")
             return Response(
                 {"detail": "Transporter profile not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        deliveries = Delivery.objects.filter(transporter=transporter)
-        logger.debug(f"[DEBUG] Number of deliveries found: {deliveries.count()}")
+        paginator, deliveries = paginate(request, Delivery.objects.select_related("transporter__user").filter(transporter_id=transporter))
+        logger.debug(f"[DEBUG] Number of deliveries on page: {len(deliveries)}")
 
         serializer = DeliverySerializer(deliveries, many=True)
         logger.debug(f"[DEBUG] Returning deliveries data: {serializer.data}")
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serializer.data)
 
 
 # --- NEW: List all transporters for frontend dropdown ---
@@ -116,8 +117,8 @@ class TransporterListAPIView(APIView):
 
     def get(self, request):
         try:
-            transporters = Transporter.objects.all()
-            logger.debug(f"[DEBUG] Transporters queryset count: {transporters.count()}")
+            paginator, transporters = paginate(request, Transporter.objects.select_related("user"))
+            logger.debug(f"[DEBUG] Transporters on page: {len(transporters)}")
 
             # Force iterate to check each object
             for t in transporters:
@@ -137,7 +138,7 @@ class TransporterListAPIView(APIView):
                     if not d.get(key):
                         logger.error(f"[ERROR] Transporter id={d['id']} missing {key}!")
 
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return paginator.get_paginated_response(serializer.data)
 
         except Exception as e:
             logger.exception(f"[EXCEPTION] Failed to fetch transporters: {e}")
@@ -153,7 +154,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from products.models import Product
-from products.serializers import ProductSerializer
+from products.serializers import ProductSummarySerializer
 from logistics.models import Transporter
 
 logger = logging.getLogger(__name__)
@@ -169,30 +170,26 @@ class PendingDeliveryRequestsAPIView(APIView):
             logger.warning(f"[WARNING] User {user} tried to access transporter deliveries but is not a transporter.")
             return Response({"detail": "User is not a transporter."}, status=status.HTTP_403_FORBIDDEN)
 
-        try:
-            # Get the actual Transporter instance
-            transporter_instance = Transporter.objects.get(user=user)
-            logger.debug(f"[DEBUG] Transporter instance: {transporter_instance} (ID: {transporter_instance.id})")
-        except Transporter.DoesNotExist:
+        transporter = transporter_id(user)
+        if transporter is None:
             logger.error(f"[ERROR] Transporter profile not found for user: {user}")
             return Response({"detail": "Transporter profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
         try:
-            # Use the actual instance in the filter
-            pending_deliveries = Product.objects.filter(
-                transporter=transporter_instance,
+            paginator, pending_deliveries = paginate(request, Product.objects.for_summary().filter(
+                transporter_id=transporter,
                 status="approved"
-            )
-            logger.debug(f"[DEBUG] Pending deliveries count: {pending_deliveries.count()}")
+            ))
+            logger.debug(f"[DEBUG] Pending deliveries on page: {len(pending_deliveries)}")
             for pd in pending_deliveries:
                 logger.debug(f"[DEBUG] Pending delivery: {pd.title} (ID: {pd.uid})")
         except Exception as e:
             logger.exception(f"[EXCEPTION] Error fetching pending deliveries: {e}")
             return Response({"detail": "Error fetching pending deliveries."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        serializer = ProductSerializer(pending_deliveries, many=True)
+        serializer = ProductSummarySerializer(pending_deliveries, many=True, context={"request": request})
         logger.debug(f"[DEBUG] Serialized pending deliveries data: {serializer.data}")
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serializer.data)
 
 
 # logistics/views.py
@@ -200,6 +197,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from products.models import Product
+from products import routes
 from logistics.models import Transporter
 import logging
 
@@ -220,9 +218,8 @@ class AcceptDeliveryRequestAPIView(APIView):
         if not getattr(user, "is_transporter", False):
             return Response({"detail": "User is not a transporter."}, status=status.HTTP_403_FORBIDDEN)
 
-        try:
-            transporter = Transporter.objects.get(user=user)
-        except Transporter.DoesNotExist:
+        transporter = transporter_id(user)
+        if transporter is None:
             return Response({"detail": "Transporter profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
         try:
@@ -231,9 +228,9 @@ class AcceptDeliveryRequestAPIView(APIView):
             return Response({"detail": "Product not found or already accepted."}, status=status.HTTP_404_NOT_FOUND)
 
         # Assign transporter and mark as in_transit
-        product.transporter = transporter
+        product.transporter_id = transporter
         product.status = "in_transit"
-        tx_hash = log_to_blockchain(product.uid, "accepted_delivery", transporter.id)
+        tx_hash = log_to_blockchain(product.uid, "accepted_delivery", transporter)
         product.tx_hash = tx_hash
         product.save()
 
@@ -248,20 +245,20 @@ class CompleteDeliveryAPIView(APIView):
         if not getattr(user, "is_transporter", False):
             return Response({"detail": "User is not a transporter."}, status=status.HTTP_403_FORBIDDEN)
 
-        try:
-            transporter = Transporter.objects.get(user=user)
-        except Transporter.DoesNotExist:
+        transporter = transporter_id(user)
+        if transporter is None:
             return Response({"detail": "Transporter profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
         try:
-            product = Product.objects.get(uid=product_uid, transporter=transporter, status="in_transit")
+            product = Product.objects.get(uid=product_uid, transporter_id=transporter, status="in_transit")
         except Product.DoesNotExist:
             return Response({"detail": "Product not found or not assigned to you."}, status=status.HTTP_404_NOT_FOUND)
 
         product.status = "delivered"
-        tx_hash = log_to_blockchain(product.uid, "completed_delivery", transporter.id)
+        tx_hash = log_to_blockchain(product.uid, "completed_delivery", transporter)
         product.tx_hash = tx_hash
         product.save()
+        routes.schedule_build(product)  # compress the GPS track now that it is complete
 
         return Response({"detail": "Delivery completed and logged.", "tx_hash": tx_hash}, status=status.HTTP_200_OK)
 
@@ -276,8 +273,10 @@ class AcceptedDeliveryRequestsAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        transporter = Transporter.objects.get(user=request.user)
-        products = Product.objects.filter(transporter=transporter, status="approved")
+        transporter = transporter_id(request.user)
+        if transporter is None:
+            return Response({"detail": "Transporter profile not found."}, status=status.HTTP_404_NOT_FOUND)
+        paginator, products = paginate(request, Product.objects.filter(transporter_id=transporter, status="approved"))
         data = [
             {
                 "uid": p.uid,
@@ -292,15 +291,17 @@ class AcceptedDeliveryRequestsAPIView(APIView):
             }
             for p in products
         ]
-        return Response(data)
+        return paginator.get_paginated_response(data)
 
 
 class DeliveredDeliveryRequestsAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        transporter = Transporter.objects.get(user=request.user)
-        products = Product.objects.filter(transporter=transporter, status="delivered")
+        transporter = transporter_id(request.user)
+        if transporter is None:
+            return Response({"detail": "Transporter profile not found."}, status=status.HTTP_404_NOT_FOUND)
+        paginator, products = paginate(request, Product.objects.filter(transporter_id=transporter, status="delivered"))
         data = [
             {
                 "uid": p.uid,
@@ -315,7 +316,7 @@ class DeliveredDeliveryRequestsAPIView(APIView):
             }
             for p in products
         ]
-        return Response(data)
+        return paginator.get_paginated_response(data)
 
 # logistics/views.py
 from rest_framework.views import APIView
@@ -323,7 +324,7 @@ from rest_framework.response import Response
 from rest_framework import permissions, status
 from products.models import Product
 from logistics.models import Transporter
-#from .serializers import ProductSerializer
+from products.serializers import ProductSummarySerializer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -342,18 +343,16 @@ class MyProductsAPIView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        try:
-            transporter = Transporter.objects.get(user=user)
-            logger.debug(f"[DEBUG] Transporter found: {transporter} (ID: {transporter.id})")
-        except Transporter.DoesNotExist:
+        transporter = transporter_id(user)
+        if transporter is None:
             logger.error("[ERROR] Transporter profile missing for logged user!")
             return Response(
                 {"detail": "Transporter profile not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        products = Product.objects.filter(transporter=transporter)
-        logger.debug(f"[DEBUG] Total products assigned to transporter: {products.count()}")
+        paginator, products = paginate(request, Product.objects.for_summary().filter(transporter_id=transporter))
+        logger.debug(f"[DEBUG] Products assigned to transporter on page: {len(products)}")
 
         # Deep dive product logs
         for p in products:
@@ -362,10 +361,10 @@ class MyProductsAPIView(APIView):
                 f"Quantity={p.quantity}, TransporterNote={p.transporter_note}"
             )
 
-        serializer = ProductSerializer(products, many=True)
+        serializer = ProductSummarySerializer(products, many=True, context={"request": request})
         logger.debug(f"[DEBUG] Serialized product data: {serializer.data}")
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serializer.data)
 
 # logistics/views.py
 class RejectDeliveryRequestAPIView(APIView):
@@ -376,9 +375,8 @@ class RejectDeliveryRequestAPIView(APIView):
         if not getattr(user, "is_transporter", False):
             return Response({"detail": "User is not a transporter."}, status=status.HTTP_403_FORBIDDEN)
 
-        try:
-            transporter = Transporter.objects.get(user=user)
-        except Transporter.DoesNotExist:
+        transporter = transporter_id(user)
+        if transporter is None:
             return Response({"detail": "Transporter profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
         try:
@@ -387,7 +385,7 @@ class RejectDeliveryRequestAPIView(APIView):
             return Response({"detail": "Product not found or already handled."}, status=status.HTTP_404_NOT_FOUND)
 
         product.status = "rejected"
-        tx_hash = log_to_blockchain(product.uid, "rejected_delivery", transporter.id)
+        tx_hash = log_to_blockchain(product.uid, "rejected_delivery", transporter)
         product.tx_hash = tx_hash
         product.save()
 
@@ -19,6 +19,9 @@ class Listing(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"])]  # keyset pagination
+
 class Sale(models.Model):
     # When a farmer agrees to sell to a listing (or when sacco records a purchase)
     listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name='sales')
@@ -30,3 +33,6 @@ class Sale(models.Model):
     onchain_tx = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"])]  # keyset pagination
@@ -21,7 +21,8 @@ class ListingViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsSaccoAdmin])
     def my_listings(self, request):
         qs = Listing.objects.filter(sacco=request.user)
-        return Response(self.get_serializer(qs, many=True).data)
+        page = self.paginate_queryset(qs)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
 
 
 class SaleViewSet(viewsets.ModelViewSet):
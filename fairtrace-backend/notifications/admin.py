@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "to", "purpose", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status", "purpose")
+    search_fields = ("to", "subject")
+    readonly_fields = ("created_at", "sent_at", "claimed_at", "last_error")
@@ -0,0 +1,49 @@
+# notifications/models.py
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    """
+    One email waiting in (or sent from) the outbox, see notifications/outbox.py.
+    One row per recipient, so retries and rate limits apply per address.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sending", "Sending"),  # claimed by a worker
+        ("sent", "Sent"),
+        ("failed", "Failed"),  # gave up after NOTIFY_MAX_ATTEMPTS
+    ]
+    PRIORITY_NORMAL = 0
+    PRIORITY_HIGH = 10  # login codes: sent before anything else in the queue
+
+    to = models.EmailField()
+    from_email = models.CharField(max_length=254, blank=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    purpose = models.CharField(max_length=50, blank=True)  # e.g. "otp", "product-approved"
+    sensitive = models.BooleanField(default=False)  # body erased once sent or failed (OTPs)
+    priority = models.SmallIntegerField(default=PRIORITY_NORMAL)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the worker's queue scan
+            models.Index(
+                fields=["-priority", "next_attempt_at"],
+                name="outbox_due_idx",
+                condition=models.Q(status="pending"),
+            ),
+            # per-recipient rate limit
+            models.Index(fields=["to", "sent_at"], name="outbox_recipient_sent_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to} ({self.status})"
@@ -0,0 +1,228 @@
+# notifications/outbox.py
+"""
+Outbound email queue.
+
+Views and tasks never talk to SMTP themselves: they call `queue_email` (or
+`queue_emails` for a batch of EmailMessages), which writes one OutboundEmail
+row per recipient in the caller's transaction and wakes the `send_outbox`
+worker once it commits. A rolled-back request therefore sends nothing, and
+a slow or unreachable mail server no longer shows up in request latency.
+
+The worker (`deliver`):
+
+- claims up to NOTIFY_BATCH_SIZE due rows with SELECT ... FOR UPDATE SKIP
+  LOCKED, high priority (login codes) first, so several workers can drain
+  the queue side by side;
+- holds back rows whose recipient already got NOTIFY_RECIPIENT_LIMIT
+  emails in the last NOTIFY_RECIPIENT_WINDOW_SECONDS (rows other workers
+  are still sending count too), to be sent later. High priority rows have
+  their own budget, NOTIFY_PRIORITY_RECIPIENT_LIMIT, so a busy day of
+  notifications never holds back a login code;
+- sends the batch over one SMTP connection (`get_connection()` +
+  `send_messages`), reconnecting once if the server drops it;
+- reschedules failures with exponential backoff (NOTIFY_RETRY_BASE_SECONDS
+  doubling up to NOTIFY_RETRY_MAX_SECONDS) and gives up after
+  NOTIFY_MAX_ATTEMPTS.
+
+Rows claimed by a worker that died are released after
+NOTIFY_CLAIM_TIMEOUT_SECONDS, so delivery is at-least-once. The body of
+`sensitive` rows (OTPs) is erased once they are sent or given up on.
+
+    from notifications.outbox import queue_email
+    queue_email(user.email, "Your FairTrace OTP", body, purpose="otp", sensitive=True)
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def schedule():
+    """Wake a `send_outbox` worker once the surrounding transaction commits."""
+    from .tasks import send_outbox
+
+    def dispatch():
+        try:
+            send_outbox.delay()
+        except Exception:
+            # The rows are stored; the beat schedule picks them up.
+            logger.exception("Could not dispatch the outbox worker")
+
+    transaction.on_commit(dispatch)
+
+
+def queue_emails(messages, purpose="", sensitive=False, priority=OutboundEmail.PRIORITY_NORMAL):
+    """
+    Queue EmailMessages (subject, body, from_email and `to` are used), one
+    row per recipient, in one INSERT. Returns the rows.
+    """
+    rows = OutboundEmail.objects.bulk_create(
+        OutboundEmail(
+            to=to,
+            from_email=message.from_email or "",
+            subject=message.subject[:255],
+            body=message.body,
+            purpose=purpose,
+            sensitive=sensitive,
+            priority=priority,
+        )
+        for message in messages
+        for to in message.to
+    )
+    if rows:
+        schedule()
+    return rows
+
+
+def queue_email(to, subject, body, from_email=None, **options):
+    """Queue one email to `to`; `options` as for `queue_emails`."""
+    return queue_emails([EmailMessage(subject, body, from_email, [to])], **options)[0]
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(
+        settings.NOTIFY_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.NOTIFY_RETRY_MAX_SECONDS
+    ))
+
+
+def release_stale():
+    """Put rows back in the queue whose worker never reported back."""
+    cutoff = timezone.now() - timedelta(seconds=settings.NOTIFY_CLAIM_TIMEOUT_SECONDS)
+    return OutboundEmail.objects.filter(status="sending", claimed_at__lt=cutoff).update(status="pending", claimed_at=None)
+
+
+def _budget(row):
+    """(budget key, limit) of the per-recipient rate limit `row` counts against."""
+    if row.priority >= OutboundEmail.PRIORITY_HIGH:
+        return (row.to, True), settings.NOTIFY_PRIORITY_RECIPIENT_LIMIT
+    return (row.to, False), settings.NOTIFY_RECIPIENT_LIMIT
+
+
+def claim(limit=None):
+    """Claim the next batch of due rows for this worker, applying the per-recipient rate limit."""
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", next_attempt_at__lte=now)
+            .order_by("-priority", "next_attempt_at", "id")[:limit or settings.NOTIFY_BATCH_SIZE]
+        )
+        if not rows:
+            return []
+
+        window = settings.NOTIFY_RECIPIENT_WINDOW_SECONDS
+        recent = {}
+        for to, priority, count in (
+            OutboundEmail.objects.filter(to__in={row.to for row in rows})
+            .filter(Q(status="sent", sent_at__gte=now - timedelta(seconds=window)) | Q(status="sending"))
+            .values("to", "priority").annotate(count=Count("id")).values_list("to", "priority", "count")
+        ):
+            key = (to, priority >= OutboundEmail.PRIORITY_HIGH)
+            recent[key] = recent.get(key, 0) + count
+        claimed, held = [], {}
+        for row in rows:
+            key, budget = _budget(row)
+            if recent.get(key, 0) >= budget:
+                held.setdefault(budget, []).append(row.pk)
+            else:
+                recent[key] = recent.get(key, 0) + 1
+                claimed.append(row)
+
+        for budget, pks in held.items():
+            # spread over the window rather than retrying every poll
+            spacing = timedelta(seconds=window / budget)
+            OutboundEmail.objects.filter(pk__in=pks).update(next_attempt_at=now + spacing)
+        OutboundEmail.objects.filter(pk__in=[row.pk for row in claimed]).update(status="sending", claimed_at=now)
+    return claimed
+
+
+def _failed(rows, error):
+    """Reschedule `rows` with backoff, or give up on those out of attempts."""
+    now = timezone.now()
+    for row in rows:
+        row.attempts += 1
+        row.last_error = str(error)[:1000]
+        row.claimed_at = None
+        if row.attempts >= settings.NOTIFY_MAX_ATTEMPTS:
+            row.status = "failed"
+            if row.sensitive:
+                row.body = ""
+            logger.error("Giving up on email %s to %s after %s attempts: %s", row.pk, row.to, row.attempts, error)
+        else:
+            row.status = "pending"
+            row.next_attempt_at = now + _backoff(row.attempts)
+    OutboundEmail.objects.bulk_update(rows, ["attempts", "last_error", "claimed_at", "status", "body", "next_attempt_at"])
+
+
+def _sent(rows):
+    ids = [row.pk for row in rows]
+    OutboundEmail.objects.filter(pk__in=ids).update(
+        status="sent", sent_at=timezone.now(), attempts=F("attempts") + 1, claimed_at=None, last_error=""
+    )
+    OutboundEmail.objects.filter(pk__in=ids, sensitive=True).update(body="")
+
+
+def send_batch(rows):
+    """Send claimed `rows` over one connection; returns how many went out."""
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning("Mail server unreachable, %s emails rescheduled: %s", len(rows), exc)
+        _failed(rows, exc)
+        return 0
+
+    sent, failed = [], []
+    try:
+        for index, row in enumerate(rows):
+            message = EmailMessage(
+                row.subject, row.body, row.from_email or settings.DEFAULT_FROM_EMAIL, [row.to], connection=connection
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as exc:
+                logger.warning("Email %s to %s failed: %s", row.pk, row.to, exc)
+                failed.append((row, exc))
+                # the server may have dropped the session; carry on over a fresh one
+                try:
+                    connection.close()
+                    connection.open()
+                except Exception as reconnect_error:
+                    failed.extend((rest, reconnect_error) for rest in rows[index + 1:])
+                    break
+            else:
+                sent.append(row)
+    finally:
+        connection.close()
+
+    if sent:
+        _sent(sent)
+    for row, exc in failed:
+        _failed([row], exc)
+    return len(sent)
+
+
+def deliver(limit=None):
+    """Send every due email, a batch at a time; returns how many were sent."""
+    release_stale()
+    total = 0
+    while True:
+        rows = claim(limit)
+        if not rows:
+            return total
+        total += send_batch(rows)
+
+
+def purge(days=None):
+    """Delete sent emails older than NOTIFY_SENT_RETENTION_DAYS."""
+    cutoff = timezone.now() - timedelta(days=days or settings.NOTIFY_SENT_RETENTION_DAYS)
+    deleted, _ = OutboundEmail.objects.filter(status="sent", sent_at__lt=cutoff).delete()
+    return deleted
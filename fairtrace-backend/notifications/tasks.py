@@ -0,0 +1,16 @@
+# notifications/tasks.py
+from celery import shared_task
+
+from . import outbox
+
+
+@shared_task
+def send_outbox():
+    """Send every due email in the outbox (notifications/outbox.py)."""
+    return outbox.deliver()
+
+
+@shared_task
+def purge_outbox():
+    """Drop sent emails older than NOTIFY_SENT_RETENTION_DAYS."""
+    return outbox.purge()
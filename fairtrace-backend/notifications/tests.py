@@ -0,0 +1,92 @@
+from datetime import timedelta
+from smtplib import SMTPRecipientsRefused
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import outbox
+from .models import OutboundEmail
+from .tasks import send_outbox
+
+
+@override_settings(
+    NOTIFY_RECIPIENT_LIMIT=2,
+    NOTIFY_PRIORITY_RECIPIENT_LIMIT=1,
+    NOTIFY_RECIPIENT_WINDOW_SECONDS=3600,
+    NOTIFY_MAX_ATTEMPTS=2,
+    NOTIFY_RETRY_BASE_SECONDS=30,
+)
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.object(send_outbox, "delay"))
+
+    def test_sends_a_batch_over_one_connection(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                outbox.queue_email(f"farmer{i}@example.com", "Approved", "Your product has been approved.")
+        send_outbox.delay.assert_called()
+
+        with mock.patch.object(EmailBackend, "open", autospec=True, side_effect=EmailBackend.open) as opened:
+            self.assertEqual(outbox.deliver(), 3)
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual([m.to for m in mail.outbox], [["farmer0@example.com"], ["farmer1@example.com"], ["farmer2@example.com"]])
+        self.assertFalse(OutboundEmail.objects.exclude(status="sent").exists())
+
+    def test_holds_back_recipients_over_the_limit(self):
+        for i in range(3):
+            outbox.queue_email("farmer@example.com", f"Update {i}", "...")
+        outbox.queue_email("other@example.com", "Update", "...")
+
+        self.assertEqual(outbox.deliver(), 3)
+        held = OutboundEmail.objects.get(status="pending")
+        self.assertEqual((held.to, held.subject), ("farmer@example.com", "Update 2"))
+        self.assertGreater(held.next_attempt_at, timezone.now() + timedelta(minutes=29))
+
+    def test_login_codes_have_their_own_budget(self):
+        for i in range(2):
+            outbox.queue_email("farmer@example.com", f"Update {i}", "...")
+        self.assertEqual(outbox.deliver(), 2)
+
+        # the recipient's normal budget is spent, the login code still goes out at once
+        otp = outbox.queue_email("farmer@example.com", "Your FairTrace OTP", "123456", sensitive=True,
+                                 priority=OutboundEmail.PRIORITY_HIGH)
+        self.assertEqual(outbox.deliver(), 1)
+        otp.refresh_from_db()
+        self.assertEqual(otp.status, "sent")
+
+        # but login codes cannot be used to flood an address either
+        again = outbox.queue_email("farmer@example.com", "Your FairTrace OTP", "654321", sensitive=True,
+                                   priority=OutboundEmail.PRIORITY_HIGH)
+        self.assertEqual(outbox.deliver(), 0)
+        again.refresh_from_db()
+        self.assertEqual(again.status, "pending")
+
+    def test_rows_being_sent_count_toward_the_limit(self):
+        for i in range(3):
+            outbox.queue_email("farmer@example.com", f"Update {i}", "...")
+        # another worker holds two of them
+        self.assertEqual(len(outbox.claim(limit=2)), 2)
+
+        self.assertEqual(outbox.claim(), [])
+        held = OutboundEmail.objects.get(status="pending")
+        self.assertGreater(held.next_attempt_at, timezone.now() + timedelta(minutes=29))
+
+    def test_retries_with_backoff_then_gives_up(self):
+        otp = outbox.queue_email("farmer@example.com", "Your FairTrace OTP", "123456", sensitive=True,
+                                 priority=OutboundEmail.PRIORITY_HIGH)
+        refused = SMTPRecipientsRefused({"farmer@example.com": (550, b"mailbox unavailable")})
+
+        with mock.patch.object(EmailBackend, "send_messages", side_effect=refused):
+            self.assertEqual(outbox.deliver(), 0)
+            otp.refresh_from_db()
+            self.assertEqual((otp.status, otp.attempts), ("pending", 1))
+            self.assertGreater(otp.next_attempt_at, timezone.now() + timedelta(seconds=25))
+
+            OutboundEmail.objects.filter(pk=otp.pk).update(next_attempt_at=timezone.now())
+            outbox.deliver()
+        otp.refresh_from_db()
+        self.assertEqual((otp.status, otp.attempts, otp.body), ("failed", 2, ""))
+        self.assertIn("mailbox unavailable", otp.last_error)
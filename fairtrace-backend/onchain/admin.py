@@ -0,0 +1,26 @@
+from django.contrib import admin
+from .models import SignerNonce, ChainTransaction, ChainEvent, IndexerCheckpoint
+
+
+@admin.register(SignerNonce)
+class SignerNonceAdmin(admin.ModelAdmin):
+    list_display = ("address", "chain_id", "next_nonce", "updated_at")
+
+
+@admin.register(ChainTransaction)
+class ChainTransactionAdmin(admin.ModelAdmin):
+    list_display = ("purpose", "sender", "nonce", "tx_hash", "status", "broadcasts", "updated_at")
+    list_filter = ("status", "chain_id")
+    search_fields = ("tx_hash", "purpose", "sender")
+
+
+@admin.register(ChainEvent)
+class ChainEventAdmin(admin.ModelAdmin):
+    list_display = ("contract", "event", "pid", "block_number", "log_index", "tx_hash")
+    list_filter = ("contract", "event", "chain_id")
+    search_fields = ("pid", "tx_hash")
+
+
+@admin.register(IndexerCheckpoint)
+class IndexerCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("chain_id", "block_number", "block_hash", "updated_at")
@@ -0,0 +1,84 @@
+# onchain/client.py
+"""
+The one place the backend talks to the chain from.
+
+Everything is built lazily and cached per process: importing this module (or
+starting Django) never opens a connection, and the first call that needs the
+node creates a single Web3 instance (one per RPC URL; WEB3_PROVIDER unless the
+contract is listed in PROVIDERS or the caller names another) on top of a pooled
+keep-alive HTTP session. ABIs are bundled in onchain/abi/ and parsed once; contract objects
+are cached by name.
+
+    from onchain.client import get_contract
+    get_contract("ProductRegistry").functions.getProduct(pid).call()
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from web3 import Web3, HTTPProvider
+
+ABI_DIR = Path(__file__).resolve().parent / "abi"
+
+# Contract name -> setting holding its deployed address
+CONTRACTS = {
+    "ProductRegistry": "PRODUCT_REGISTRY_ADDRESS",
+    "FarmerRegistry": "FARMER_REGISTRY_ADDRESS",
+    "FairTraceTransport": "FAIRTRACE_TRANSPORT_ADDRESS",
+    "SaccoPurchases": "SACCO_PURCHASES_ADDRESS",
+    "Multicall3": "MULTICALL3_ADDRESS",  # batched reads, see onchain/enumeration.py
+}
+
+# Contract name -> setting holding the RPC URL of its chain, for contracts not on WEB3_PROVIDER
+PROVIDERS = {
+    "FarmerRegistry": "SEPOLIA_RPC_URL",
+}
+
+
+@lru_cache
+def get_session():
+    """Keep-alive session shared by every RPC call in this process."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.WEB3_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_w3(provider=None):
+    """The Web3 instance for the node at `provider` (WEB3_PROVIDER by default)."""
+    return _w3(provider or settings.WEB3_PROVIDER)
+
+
+@lru_cache
+def _w3(provider):
+    return Web3(HTTPProvider(
+        provider,
+        session=get_session(),
+        request_kwargs={"timeout": settings.WEB3_REQUEST_TIMEOUT_SECONDS},
+    ))
+
+
+@lru_cache
+def load_abi(name):
+    """Parsed ABI of one of the bundled contracts."""
+    with open(ABI_DIR / f"{name}.json") as f:
+        return json.load(f)["abi"]
+
+
+@lru_cache
+def get_contract(name, address=None, provider=None):
+    """
+    Contract object for `name` (a key of CONTRACTS) at `address`, or at the
+    address configured in settings when none is given, on the node at
+    `provider` (the contract's PROVIDERS setting, else WEB3_PROVIDER).
+    """
+    address = address or getattr(settings, CONTRACTS[name])
+    if provider is None and name in PROVIDERS:
+        provider = getattr(settings, PROVIDERS[name])
+    if not address:
+        raise ValueError(f"{CONTRACTS[name]} is not set in settings or .env")
+    return get_w3(provider).eth.contract(address=Web3.to_checksum_address(address), abi=load_abi(name))
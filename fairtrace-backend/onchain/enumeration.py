@@ -0,0 +1,118 @@
+# onchain/enumeration.py
+"""
+Reading whole registries without one-shot array views.
+
+getAllProducts()/getAllFarmers() return every record in a single eth_call,
+which fails once the registry outgrows the node's gas cap or response size.
+Instead:
+
+- `all_products` / `all_farmers` read the count, then fetch pages of
+  CHAIN_PAGE_SIZE records with getProducts/getFarmers(offset, limit),
+  CHAIN_READ_WORKERS pages at a time over the pooled session of
+  onchain.client. Every page is read at the same block, so the result is a
+  consistent snapshot.
+- `multicall` runs many single-record calls (getProduct(pid), getFarmer(id))
+  through Multicall3.aggregate3, MULTICALL_BATCH_SIZE calls per eth_call.
+  Calls that revert (e.g. "Product not found") come back as None. Where
+  MULTICALL3_ADDRESS is empty or has no code (a bare Ganache), the calls are
+  made one by one, concurrently.
+
+Both read from the chain the contract itself is on (see onchain.client
+PROVIDERS), so farmer records come from the farmer registry's node.
+
+    from onchain.enumeration import all_products, multicall
+    registry = get_contract("ProductRegistry")
+    records = multicall([registry.functions.getProduct(pid) for pid in pids])
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from eth_utils.abi import get_abi_output_types
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+
+from .client import get_contract, get_w3
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _map(fn, items):
+    """`fn` over `items` on CHAIN_READ_WORKERS threads, results in order."""
+    with ThreadPoolExecutor(max_workers=settings.CHAIN_READ_WORKERS) as pool:
+        return list(pool.map(fn, items))
+
+
+def paged(contract_name, count_function, page_function, page_size=None, block=None):
+    """Every record behind a (count, page(offset, limit)) pair of view functions, read at `block`."""
+    contract = get_contract(contract_name)
+    functions = contract.functions
+    block = contract.w3.eth.block_number if block is None else block
+    size = page_size or settings.CHAIN_PAGE_SIZE
+    total = functions[count_function]().call(block_identifier=block)
+
+    def fetch(offset):
+        return functions[page_function](offset, size).call(block_identifier=block)
+
+    return [record for page in _map(fetch, range(0, total, size)) for record in page]
+
+
+def all_products(page_size=None, block=None):
+    """Every ProductRegistry record, in registration order."""
+    return paged("ProductRegistry", "productCount", "getProducts", page_size, block)
+
+
+def all_farmers(page_size=None, block=None):
+    """Every FarmerRegistry record, by farmer ID."""
+    return paged("FarmerRegistry", "farmerCount", "getFarmers", page_size, block)
+
+
+def _provider(call):
+    """RPC URL of the node a contract function `call` was built for."""
+    return call.w3.provider.endpoint_uri
+
+
+@lru_cache
+def multicall_available(provider=None):
+    """Whether MULTICALL3_ADDRESS holds a contract on the chain at `provider` (checked once per process)."""
+    if not settings.MULTICALL3_ADDRESS:
+        return False
+    return len(get_w3(provider).eth.get_code(Web3.to_checksum_address(settings.MULTICALL3_ADDRESS))) > 0
+
+
+def _decode(call, data):
+    values = call.w3.codec.decode(get_abi_output_types(call.abi), data)
+    return values[0] if len(values) == 1 else values
+
+
+def _call_or_none(call, block):
+    try:
+        return call.call(block_identifier=block)
+    except ContractLogicError:
+        return None
+
+
+def multicall(calls, block=None):
+    """
+    Results of the contract function `calls` (all on one chain), in order
+    (None where a call reverted), read at `block` in as few eth_calls as
+    possible.
+    """
+    if not calls:
+        return []
+    provider = _provider(calls[0])
+    block = get_w3(provider).eth.block_number if block is None else block
+    if not multicall_available(provider):
+        return _map(lambda call: _call_or_none(call, block), calls)
+
+    aggregate3 = get_contract("Multicall3", provider=provider).functions.aggregate3
+
+    def run(batch):
+        results = aggregate3(
+            [(call.address, True, call._encode_transaction_data()) for call in batch]
+        ).call(block_identifier=block)
+        return [_decode(call, data) if success else None for call, (success, data) in zip(batch, results)]
+
+    return [result for batch in _map(run, _chunks(calls, settings.MULTICALL_BATCH_SIZE)) for result in batch]
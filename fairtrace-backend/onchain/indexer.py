@@ -0,0 +1,197 @@
+# onchain/indexer.py
+"""
+Mirror contract events into Postgres (ChainEvent), so trace and audit pages
+read local rows instead of calling O(n) views like getAllProducts().
+
+`index` follows eth_getLogs over the contracts in CHAIN_INDEXER_CONTRACTS
+in ranges of CHAIN_INDEXER_BATCH_BLOCKS. Each range is one transaction that
+inserts its events and moves the IndexerCheckpoint forward. The checkpoint
+row is locked with SKIP LOCKED, so a second indexer (beat task, command)
+simply returns instead of queueing behind the first.
+
+Reorgs: the checkpoint keeps the hash of the last indexed block. When the
+node no longer has that block, events of the last CHAIN_INDEXER_REORG_DEPTH
+blocks are deleted and read again from the canonical chain. Deeper reorgs
+are logged and need `manage.py index_chain_events --from-block N`.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from eth_utils import event_abi_to_log_topic
+from web3 import Web3
+from web3.exceptions import BlockNotFound
+
+from .client import CONTRACTS, get_contract, get_w3
+from .models import ChainEvent, IndexerCheckpoint
+from .signals import events_indexed
+
+logger = logging.getLogger(__name__)
+
+# times in a row a range may change while it is read before `index` gives up until its next run
+RANGE_RETRIES = 3
+
+
+def watched_events():
+    """{(address, topic0): (contract name, event name, contract)} for the configured contracts."""
+    watched = {}
+    for name in settings.CHAIN_INDEXER_CONTRACTS:
+        if not getattr(settings, CONTRACTS[name]):
+            continue  # not deployed in this environment
+        contract = get_contract(name)
+        for abi in contract.abi:
+            if abi.get("type") == "event":
+                topic = Web3.to_hex(event_abi_to_log_topic(abi))
+                watched[(contract.address.lower(), topic)] = (name, abi["name"], contract)
+    return watched
+
+
+def _jsonable(value):
+    if isinstance(value, (bytes, bytearray)):
+        return Web3.to_hex(value)
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    return value
+
+
+def block_hash(w3, number):
+    """Hash of block `number` on the node's canonical chain, or None if it has no such block."""
+    if number < 0:
+        return ""
+    try:
+        return Web3.to_hex(w3.eth.get_block(number)["hash"])
+    except BlockNotFound:
+        return None
+
+
+def fetch_events(w3, chain_id, watched, from_block, to_block):
+    """Unsaved ChainEvent rows for the watched logs in [from_block, to_block]."""
+    addresses = sorted({Web3.to_checksum_address(address) for address, _ in watched})
+    logs = w3.eth.get_logs({"fromBlock": from_block, "toBlock": to_block, "address": addresses})
+    rows = []
+    for log in logs:
+        if not log["topics"]:
+            continue
+        match = watched.get((log["address"].lower(), Web3.to_hex(log["topics"][0])))
+        if match is None:
+            continue
+        contract_name, event_name, contract = match
+        args = _jsonable(dict(contract.events[event_name]().process_log(log)["args"]))
+        rows.append(ChainEvent(
+            chain_id=chain_id,
+            contract=contract_name,
+            address=Web3.to_checksum_address(log["address"]),
+            event=event_name,
+            pid=str(args.get("pid", ""))[:100],
+            args=args,
+            block_number=log["blockNumber"],
+            block_hash=Web3.to_hex(log["blockHash"]),
+            tx_hash=Web3.to_hex(log["transactionHash"]),
+            log_index=log["logIndex"],
+        ))
+    return rows
+
+
+def _rewind_after_reorg(w3, checkpoint):
+    """
+    If the checkpoint block has been reorged away, drop the events of the
+    last CHAIN_INDEXER_REORG_DEPTH blocks and move the checkpoint back.
+    Returns the pids of the dropped events.
+    """
+    if not checkpoint.block_hash or block_hash(w3, checkpoint.block_number) == checkpoint.block_hash:
+        return set()
+
+    rewind_to = max(checkpoint.block_number - settings.CHAIN_INDEXER_REORG_DEPTH, settings.CHAIN_INDEXER_START_BLOCK - 1)
+    dropped = ChainEvent.objects.filter(chain_id=checkpoint.chain_id, block_number__gt=rewind_to)
+    pids = set(dropped.exclude(pid="").values_list("pid", flat=True))
+    count, _ = dropped.delete()
+    logger.warning(
+        "Reorg at block %s on chain %s: re-reading from block %s (%s events dropped)",
+        checkpoint.block_number, checkpoint.chain_id, rewind_to + 1, count,
+    )
+
+    older = ChainEvent.objects.filter(chain_id=checkpoint.chain_id).order_by("-block_number").first()
+    if older is not None and block_hash(w3, older.block_number) != older.block_hash:
+        logger.error(
+            "Block %s of indexed events is no longer canonical: reorg deeper than CHAIN_INDEXER_REORG_DEPTH=%s; "
+            "re-index with `manage.py index_chain_events --from-block`",
+            older.block_number, settings.CHAIN_INDEXER_REORG_DEPTH,
+        )
+    checkpoint.block_number = rewind_to
+    checkpoint.block_hash = block_hash(w3, rewind_to) or ""
+    return pids
+
+
+def _notify(pids):
+    if pids:
+        transaction.on_commit(lambda: events_indexed.send(sender=ChainEvent, pids=pids))
+
+
+def index(to_block=None):
+    """
+    Index watched events up to `to_block` (the chain head by default, and
+    never past it). Returns the number of events stored, or None if another
+    indexer holds the checkpoint.
+    """
+    watched = watched_events()
+    if not watched:
+        return 0
+    w3 = get_w3()
+    chain_id = w3.eth.chain_id
+    head = w3.eth.block_number if to_block is None else min(to_block, w3.eth.block_number)
+    IndexerCheckpoint.objects.get_or_create(
+        chain_id=chain_id, defaults={"block_number": settings.CHAIN_INDEXER_START_BLOCK - 1}
+    )
+
+    stored = retries = 0
+    while True:
+        with transaction.atomic():
+            checkpoint = (
+                IndexerCheckpoint.objects.select_for_update(skip_locked=True).filter(chain_id=chain_id).first()
+            )
+            if checkpoint is None:
+                return None
+            pids = _rewind_after_reorg(w3, checkpoint)
+            start = checkpoint.block_number + 1
+            if start > head:
+                checkpoint.save()
+                _notify(pids)
+                return stored
+
+            end = min(start + settings.CHAIN_INDEXER_BATCH_BLOCKS - 1, head)
+            end_hash = block_hash(w3, end)
+            rows = fetch_events(w3, chain_id, watched, start, end)
+            if end_hash is None or block_hash(w3, end) != end_hash:
+                # the range changed under us; roll back and read it again, unless it keeps changing
+                transaction.set_rollback(True)
+                retries += 1
+                if retries > RANGE_RETRIES:
+                    logger.warning(
+                        "Blocks %s-%s on chain %s kept changing while indexed; stopping until the next run",
+                        start, end, chain_id,
+                    )
+                    return stored
+                head = min(head, w3.eth.block_number)
+                continue
+            retries = 0
+            ChainEvent.objects.bulk_create(rows, ignore_conflicts=True)
+            checkpoint.block_number = end
+            checkpoint.block_hash = end_hash
+            checkpoint.save()
+            _notify(pids | {row.pid for row in rows if row.pid})
+        stored += len(rows)
+        logger.info("Indexed blocks %s-%s on chain %s: %s events", start, end, chain_id, len(rows))
+
+
+def reset(chain_id, from_block):
+    """Forget everything indexed from `from_block` on, so the next `index` reads it again."""
+    with transaction.atomic():
+        dropped = ChainEvent.objects.filter(chain_id=chain_id, block_number__gte=from_block)
+        pids = set(dropped.exclude(pid="").values_list("pid", flat=True))
+        dropped.delete()
+        IndexerCheckpoint.objects.update_or_create(
+            chain_id=chain_id, defaults={"block_number": from_block - 1, "block_hash": ""}
+        )
+        _notify(pids)
@@ -0,0 +1,45 @@
+# onchain/management/commands/index_chain_events.py
+"""
+Mirror contract events into ChainEvent (see onchain/indexer.py).
+
+    python manage.py index_chain_events                   # catch up to the chain head
+    python manage.py index_chain_events --follow          # keep following it
+    python manage.py index_chain_events --from-block 0    # re-index from block 0
+
+Celery beat runs the catch-up every CHAIN_INDEXER_POLL_SECONDS; --follow is
+for running the indexer as its own worker instead.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from onchain import indexer
+from onchain.client import get_w3
+
+
+class Command(BaseCommand):
+    help = "Index ProductRegistry, FairTraceTransport and SaccoPurchases events into Postgres."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from-block", type=int, help="Drop what was indexed from this block on and read it again.")
+        parser.add_argument("--to-block", type=int, help="Stop at this block instead of the chain head.")
+        parser.add_argument("--follow", action="store_true", help="Keep polling for new blocks.")
+
+    def handle(self, *args, **options):
+        if not indexer.watched_events():
+            self.stderr.write("None of CHAIN_INDEXER_CONTRACTS has an address configured.")
+            return
+        if options["from_block"] is not None:
+            indexer.reset(get_w3().eth.chain_id, options["from_block"])
+            self.stdout.write(f"Re-indexing from block {options['from_block']}")
+
+        while True:
+            stored = indexer.index(options["to_block"])
+            if stored is None:
+                self.stdout.write(self.style.WARNING("Another indexer is running; nothing done."))
+            elif stored or not options["follow"]:
+                self.stdout.write(self.style.SUCCESS(f"Indexed {stored} events"))
+            if not options["follow"]:
+                return
+            time.sleep(settings.CHAIN_INDEXER_POLL_SECONDS)
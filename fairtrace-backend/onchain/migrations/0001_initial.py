@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChainTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain_id', models.PositiveBigIntegerField()),
+                ('sender', models.CharField(max_length=42)),
+                ('nonce', models.PositiveBigIntegerField()),
+                ('purpose', models.CharField(blank=True, max_length=100)),
+                ('tx_params', models.JSONField()),
+                ('gas_price', models.PositiveBigIntegerField()),
+                ('tx_hash', models.CharField(max_length=66, unique=True)),
+                ('previous_hashes', models.JSONField(blank=True, default=list)),
+                ('broadcasts', models.PositiveIntegerField(default=1)),
+                ('status', models.CharField(choices=[('submitted', 'Submitted'), ('confirmed', 'Confirmed'), ('failed', 'Failed')], default='submitted', max_length=20)),
+                ('block_number', models.BigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='onchain_cha_status_ac324f_idx')],
+                'unique_together': {('chain_id', 'sender', 'nonce')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SignerNonce',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain_id', models.PositiveBigIntegerField()),
+                ('address', models.CharField(max_length=42)),
+                ('next_nonce', models.PositiveBigIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('chain_id', 'address')},
+            },
+        ),
+    ]
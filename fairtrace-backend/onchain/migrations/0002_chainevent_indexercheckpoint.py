@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onchain', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain_id', models.PositiveBigIntegerField(unique=True)),
+                ('block_number', models.BigIntegerField()),
+                ('block_hash', models.CharField(blank=True, default='', max_length=66)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChainEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain_id', models.PositiveBigIntegerField()),
+                ('contract', models.CharField(max_length=50)),
+                ('address', models.CharField(max_length=42)),
+                ('event', models.CharField(max_length=50)),
+                ('pid', models.CharField(blank=True, default='', max_length=100)),
+                ('args', models.JSONField()),
+                ('block_number', models.BigIntegerField()),
+                ('block_hash', models.CharField(max_length=66)),
+                ('tx_hash', models.CharField(max_length=66)),
+                ('log_index', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['chain_id', 'block_number'], name='chainevent_block_idx'), models.Index(condition=models.Q(('pid', ''), _negated=True), fields=['pid', 'block_number'], name='chainevent_pid_idx'), models.Index(fields=['contract', 'event', 'block_number'], name='chainevent_contract_event_idx')],
+                'unique_together': {('chain_id', 'tx_hash', 'log_index')},
+            },
+        ),
+    ]
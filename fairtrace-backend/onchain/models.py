@@ -0,0 +1,86 @@
+from django.db import models
+
+
+class SignerNonce(models.Model):
+    """
+    Next nonce to hand out for a signing wallet on a given chain.
+    The row is locked (SELECT ... FOR UPDATE) while a nonce is reserved, so
+    concurrent senders never reuse one; see onchain/signer.py.
+    """
+    chain_id = models.PositiveBigIntegerField()
+    address = models.CharField(max_length=42)
+    next_nonce = models.PositiveBigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("chain_id", "address")
+
+    def __str__(self):
+        return f"{self.address}@{self.chain_id} -> {self.next_nonce}"
+
+
+class ChainTransaction(models.Model):
+    STATUS_CHOICES = [
+        ("submitted", "Submitted"),
+        ("confirmed", "Confirmed"),
+        ("failed", "Failed"),
+    ]
+
+    chain_id = models.PositiveBigIntegerField()
+    sender = models.CharField(max_length=42)
+    nonce = models.PositiveBigIntegerField()
+    purpose = models.CharField(max_length=100, blank=True)  # e.g. "product:42", "batch:<uid>"
+    tx_params = models.JSONField()  # to/data/value/gas, re-signed when the fee is bumped
+    gas_price = models.PositiveBigIntegerField()  # wei
+    tx_hash = models.CharField(max_length=66, unique=True)
+    previous_hashes = models.JSONField(default=list, blank=True)  # hashes replaced by fee bumps
+    broadcasts = models.PositiveIntegerField(default=1)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="submitted")
+    block_number = models.BigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # last (re)broadcast or status change
+
+    class Meta:
+        unique_together = ("chain_id", "sender", "nonce")
+        indexes = [models.Index(fields=["status", "updated_at"])]
+
+    def __str__(self):
+        return f"{self.purpose or 'tx'} #{self.nonce} {self.tx_hash} ({self.status})"
+
+
+class ChainEvent(models.Model):
+    """A contract event mirrored from the chain by onchain.indexer."""
+    chain_id = models.PositiveBigIntegerField()
+    contract = models.CharField(max_length=50)  # key of onchain.client.CONTRACTS
+    address = models.CharField(max_length=42)
+    event = models.CharField(max_length=50)
+    pid = models.CharField(max_length=100, blank=True, default="")  # args["pid"] for product events
+    args = models.JSONField()
+    block_number = models.BigIntegerField()
+    block_hash = models.CharField(max_length=66)
+    tx_hash = models.CharField(max_length=66)
+    log_index = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("chain_id", "tx_hash", "log_index")
+        indexes = [
+            models.Index(fields=["chain_id", "block_number"], name="chainevent_block_idx"),
+            models.Index(fields=["pid", "block_number"], name="chainevent_pid_idx", condition=~models.Q(pid="")),
+            models.Index(fields=["contract", "event", "block_number"], name="chainevent_contract_event_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.contract}.{self.event} @ {self.block_number}:{self.log_index}"
+
+
+class IndexerCheckpoint(models.Model):
+    """Last block onchain.indexer has mirrored, with its hash to notice reorgs."""
+    chain_id = models.PositiveBigIntegerField(unique=True)
+    block_number = models.BigIntegerField()
+    block_hash = models.CharField(max_length=66, blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"chain {self.chain_id} indexed to {self.block_number}"
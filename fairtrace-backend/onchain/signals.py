@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by onchain.indexer once a block range is committed, with the set of
+# product ids (`pids`) whose events were added or rolled back.
+events_indexed = Signal()
@@ -0,0 +1,255 @@
+# onchain/signer.py
+"""
+Shared signer for the backend's hot wallets.
+
+Every transaction the backend sends goes through `Signer.send`, which hands
+out nonces from the SignerNonce table instead of asking the node with
+`get_transaction_count` each time, so concurrent workers get consecutive
+nonces and many transactions can be in flight in the same block.
+
+A send first reserves: it locks the SignerNonce row, signs with the next
+nonce and records the ChainTransaction, in a transaction of its own on the
+"signer" database connection (settings.DATABASES). That commits before
+anything is broadcast, so the row lock is held neither across the RPC call
+nor for the rest of the caller's transaction, and a caller that rolls back
+after broadcasting does not lose the record of a nonce that is already out.
+When the broadcast fails the reservation is given back; if later nonces
+have been reserved meanwhile, the nonce is resynced from the node so the
+gap is filled by the next send.
+
+Each broadcast is recorded as a ChainTransaction. `rebroadcast_stuck` (run by
+celery beat through onchain.tasks) re-signs transactions that have not been
+mined after SIGNER_STUCK_AFTER_SECONDS with the same nonce and a higher gas
+price, so one underpriced transaction cannot hold up the whole queue.
+"""
+import logging
+from datetime import timedelta
+from functools import cached_property, lru_cache
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from eth_account import Account
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from .client import get_w3
+from .models import ChainTransaction, SignerNonce
+
+logger = logging.getLogger(__name__)
+
+SIGNER_DB = "signer"
+
+# Node error messages that mean our local nonce is out of step with the chain.
+NONCE_ERRORS = ("nonce too low", "nonce too high", "already known", "replacement transaction underpriced")
+
+
+def _is_nonce_error(exc):
+    message = str(exc).lower()
+    return any(err in message for err in NONCE_ERRORS)
+
+
+class Signer:
+    def __init__(self, private_key, w3):
+        self.account = Account.from_key(private_key)
+        self.address = self.account.address
+        self.w3 = w3
+
+    @cached_property
+    def chain_id(self):
+        return self.w3.eth.chain_id
+
+    def _sign(self, tx_params, nonce, gas_price):
+        return self.account.sign_transaction({**tx_params, "nonce": nonce, "gasPrice": gas_price})
+
+    def _broadcast(self, tx_params, nonce, gas_price):
+        signed = self._sign(tx_params, nonce, gas_price)
+        return Web3.to_hex(self.w3.eth.send_raw_transaction(signed.raw_transaction))
+
+    def _lock_nonce(self):
+        """The SignerNonce row of this wallet, locked. Call inside a transaction on SIGNER_DB."""
+        nonces = SignerNonce.objects.using(SIGNER_DB).select_for_update()
+        row = nonces.filter(chain_id=self.chain_id, address=self.address).first()
+        if row is None:
+            # First transaction from this wallet: start from the node's view,
+            # including anything already sitting in its mempool.
+            SignerNonce.objects.using(SIGNER_DB).get_or_create(
+                chain_id=self.chain_id,
+                address=self.address,
+                defaults={"next_nonce": self.w3.eth.get_transaction_count(self.address, "pending")},
+            )
+            row = nonces.get(chain_id=self.chain_id, address=self.address)
+        return row
+
+    def _reserve(self, tx_params, gas_price, purpose):
+        """
+        Take the next nonce, sign with it and record the ChainTransaction, and
+        commit. Returns the ChainTransaction and the raw signed transaction.
+        """
+        with transaction.atomic(using=SIGNER_DB):
+            row = self._lock_nonce()
+            nonce = row.next_nonce
+            # after a resync, nonces above the node's count may still belong to recorded transactions
+            taken = set(
+                ChainTransaction.objects.using(SIGNER_DB)
+                .filter(chain_id=self.chain_id, sender=self.address, nonce__gte=nonce)
+                .values_list("nonce", flat=True)
+            )
+            while nonce in taken:
+                nonce += 1
+            signed = self._sign(tx_params, nonce, gas_price)
+
+            row.next_nonce = nonce + 1
+            row.save(update_fields=["next_nonce", "updated_at"])
+            chain_tx = ChainTransaction.objects.using(SIGNER_DB).create(
+                chain_id=self.chain_id,
+                sender=self.address,
+                nonce=nonce,
+                purpose=purpose,
+                tx_params=tx_params,
+                gas_price=gas_price,
+                tx_hash=Web3.to_hex(signed.hash),
+            )
+        # the same database; later saves belong to the caller's connection and transaction
+        chain_tx._state.db = DEFAULT_DB_ALIAS
+        return chain_tx, signed.raw_transaction
+
+    def _release(self, chain_tx):
+        """
+        Forget a reservation whose broadcast failed. Returns False if later
+        nonces were reserved meanwhile, so that its nonce is now a gap.
+        """
+        with transaction.atomic(using=SIGNER_DB):
+            row = self._lock_nonce()
+            ChainTransaction.objects.using(SIGNER_DB).filter(pk=chain_tx.pk).delete()
+            if row.next_nonce != chain_tx.nonce + 1:
+                return False
+            row.next_nonce = chain_tx.nonce
+            row.save(update_fields=["next_nonce", "updated_at"])
+        return True
+
+    def _send_once(self, tx_params, gas_price, purpose):
+        chain_tx, raw_transaction = self._reserve(tx_params, gas_price, purpose)
+        try:
+            self.w3.eth.send_raw_transaction(raw_transaction)
+        except Exception:
+            if not self._release(chain_tx):
+                # the node's count does not include the gap, so the next send fills it
+                self.resync_nonce()
+            raise
+        return chain_tx
+
+    def resync_nonce(self):
+        """Reset the local nonce to the node's pending transaction count."""
+        pending = self.w3.eth.get_transaction_count(self.address, "pending")
+        SignerNonce.objects.using(SIGNER_DB).update_or_create(
+            chain_id=self.chain_id, address=self.address, defaults={"next_nonce": pending}
+        )
+        logger.warning("Resynced nonce for %s to %s", self.address, pending)
+        return pending
+
+    def send(self, call, gas, gas_price=None, purpose=""):
+        """
+        Sign and broadcast a contract call without waiting for it to be mined.
+        :param call: a bound contract function, e.g. `contract.functions.foo(1)`.
+        :param gas: gas limit for the transaction.
+        :param gas_price: gas price in wei; defaults to the node's current price.
+        :param purpose: free-form label stored on the ChainTransaction.
+        :return: the ChainTransaction that was recorded.
+        """
+        if gas_price is None:
+            gas_price = self.w3.eth.gas_price
+        tx_params = {
+            "to": call.address,
+            "data": call._encode_transaction_data(),
+            "value": 0,
+            "gas": gas,
+            "chainId": self.chain_id,
+        }
+        try:
+            return self._send_once(tx_params, gas_price, purpose)
+        except Exception as exc:
+            if not _is_nonce_error(exc):
+                raise
+            # Something else spent nonces from this wallet (or a DB row was lost).
+            logger.warning("Nonce rejected for %s (%s); resyncing and retrying once", self.address, exc)
+            self.resync_nonce()
+            return self._send_once(tx_params, gas_price, purpose)
+
+    def refresh(self, chain_tx):
+        """
+        Look for a receipt for any of the hashes broadcast for `chain_tx`.
+        Updates the row when one is found and returns the receipt, or None
+        while nothing has been mined yet.
+        """
+        for tx_hash in [chain_tx.tx_hash, *reversed(chain_tx.previous_hashes)]:
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+            chain_tx.status = "confirmed" if receipt.status == 1 else "failed"
+            chain_tx.block_number = receipt.blockNumber
+            if tx_hash != chain_tx.tx_hash:
+                # An earlier, cheaper broadcast won the race.
+                chain_tx.previous_hashes = [h for h in chain_tx.previous_hashes if h != tx_hash] + [chain_tx.tx_hash]
+                chain_tx.tx_hash = tx_hash
+            if receipt.status != 1:
+                chain_tx.error = f"Transaction reverted in block {receipt.blockNumber}"
+            chain_tx.save(update_fields=["status", "block_number", "tx_hash", "previous_hashes", "error", "updated_at"])
+            return receipt
+        return None
+
+    def bump(self, chain_tx):
+        """
+        Replace a pending transaction with the same nonce and a higher gas price.
+        Returns True if a replacement was broadcast.
+        """
+        max_price = self.w3.to_wei(settings.SIGNER_MAX_GAS_PRICE_GWEI, "gwei")
+        bumped = chain_tx.gas_price * (100 + settings.SIGNER_FEE_BUMP_PERCENT) // 100
+        new_price = min(max(bumped, self.w3.eth.gas_price), max_price)
+        if new_price <= chain_tx.gas_price:
+            logger.warning("Transaction %s is stuck at the gas price cap", chain_tx.tx_hash)
+            return False
+
+        try:
+            tx_hash = self._broadcast(chain_tx.tx_params, chain_tx.nonce, new_price)
+        except Exception as exc:
+            if _is_nonce_error(exc):
+                # The nonce was used in the meantime; refresh() will find the receipt.
+                return False
+            raise
+
+        chain_tx.previous_hashes = [*chain_tx.previous_hashes, chain_tx.tx_hash]
+        chain_tx.tx_hash = tx_hash
+        chain_tx.gas_price = new_price
+        chain_tx.broadcasts += 1
+        chain_tx.save(update_fields=["previous_hashes", "tx_hash", "gas_price", "broadcasts", "updated_at"])
+        logger.info("Replaced nonce %s of %s at %s wei: %s", chain_tx.nonce, self.address, new_price, tx_hash)
+        return True
+
+    def rebroadcast_stuck(self, older_than):
+        """
+        Bump every submitted transaction of this wallet that has not been mined
+        (or re-broadcast) for `older_than` seconds. Lowest nonce first, since
+        later transactions cannot be mined before it.
+        """
+        cutoff = timezone.now() - timedelta(seconds=older_than)
+        stuck = ChainTransaction.objects.filter(
+            chain_id=self.chain_id, sender=self.address, status="submitted", updated_at__lt=cutoff
+        ).order_by("nonce")
+
+        replaced = 0
+        for chain_tx in stuck:
+            if self.refresh(chain_tx) is None and self.bump(chain_tx):
+                replaced += 1
+        return replaced
+
+
+@lru_cache
+def get_signer(private_key=None, provider=None):
+    """
+    Signer for `private_key` (the admin wallet by default) on the shared
+    client connection to `provider` (WEB3_PROVIDER by default). Cached so
+    each process builds it once.
+    """
+    return Signer(private_key or settings.ADMIN_WALLET_PRIVATE_KEY, get_w3(provider))
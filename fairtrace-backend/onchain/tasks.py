@@ -0,0 +1,20 @@
+# onchain/tasks.py
+from celery import shared_task
+from django.conf import settings
+
+from . import indexer
+from .signer import get_signer
+
+
+@shared_task
+def rebroadcast_stuck_transactions():
+    """Fee-bump admin wallet transactions that have been pending too long."""
+    if not settings.ADMIN_WALLET_PRIVATE_KEY:
+        return 0
+    return get_signer().rebroadcast_stuck(settings.SIGNER_STUCK_AFTER_SECONDS)
+
+
+@shared_task
+def index_chain_events():
+    """Catch the ChainEvent mirror up with the chain head (onchain/indexer.py)."""
+    return indexer.index()
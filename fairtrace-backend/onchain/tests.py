@@ -0,0 +1,292 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import BlockNotFound, TransactionNotFound
+
+from blockchain.utils import get_farmers
+
+from . import enumeration, indexer
+from .client import get_contract
+from .models import ChainEvent, ChainTransaction, IndexerCheckpoint, SignerNonce
+from .signals import events_indexed
+from .signer import SIGNER_DB, Signer
+
+REGISTRY = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+REGISTERED_TOPIC = Web3.keccak(text="ProductRegistered(string,string,string,uint256,string)")
+
+
+class FakeChain:
+    """Just enough of web3's `eth` namespace for the indexer: blocks and ProductRegistered logs."""
+
+    chain_id = 1337
+
+    def __init__(self, length):
+        self.hashes = [Web3.keccak(text=f"block-{n}") for n in range(length)]
+        self.logs = []
+
+    @property
+    def block_number(self):
+        return len(self.hashes) - 1
+
+    def get_block(self, number):
+        if number >= len(self.hashes):
+            raise BlockNotFound(number)
+        return {"hash": self.hashes[number]}
+
+    def register(self, block, pid):
+        data = encode(["string", "string", "string", "uint256", "string"], [pid, "Coffee", "f@example.com", 0, "0xabc"])
+        self.logs.append(AttributeDict({
+            "address": REGISTRY,
+            "topics": [REGISTERED_TOPIC],
+            "data": HexBytes(data),
+            "blockNumber": block,
+            "blockHash": self.hashes[block],
+            "transactionHash": Web3.keccak(text=f"tx-{pid}-{self.hashes[block].hex()}"),
+            "transactionIndex": 0,
+            "logIndex": 0,
+            "removed": False,
+        }))
+
+    def reorg(self, from_block, length):
+        """Replace every block from `from_block` on, dropping their logs."""
+        self.hashes = self.hashes[:from_block] + [Web3.keccak(text=f"fork-{n}") for n in range(from_block, length)]
+        self.logs = [log for log in self.logs if log["blockNumber"] < from_block]
+
+    def get_logs(self, params):
+        return [log for log in self.logs if params["fromBlock"] <= log["blockNumber"] <= params["toBlock"]]
+
+
+@override_settings(
+    PRODUCT_REGISTRY_ADDRESS=REGISTRY,
+    CHAIN_INDEXER_CONTRACTS=["ProductRegistry"],
+    CHAIN_INDEXER_START_BLOCK=0,
+    CHAIN_INDEXER_BATCH_BLOCKS=4,
+    CHAIN_INDEXER_REORG_DEPTH=3,
+)
+class IndexerTests(TestCase):
+    def setUp(self):
+        self.chain = FakeChain(8)
+        patcher = mock.patch.object(indexer, "get_w3", return_value=SimpleNamespace(eth=self.chain))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def indexed(self):
+        return list(ChainEvent.objects.order_by("block_number").values_list("pid", "block_number", "block_hash"))
+
+    def test_follows_the_chain_in_ranges(self):
+        self.chain.register(2, "FT-1")
+        self.chain.register(6, "FT-2")
+        self.assertEqual(indexer.index(), 2)
+
+        self.assertEqual([row[:2] for row in self.indexed()], [("FT-1", 2), ("FT-2", 6)])
+        event = ChainEvent.objects.get(pid="FT-1")
+        self.assertEqual((event.contract, event.event, event.args["title"]), ("ProductRegistry", "ProductRegistered", "Coffee"))
+        checkpoint = IndexerCheckpoint.objects.get(chain_id=FakeChain.chain_id)
+        self.assertEqual((checkpoint.block_number, checkpoint.block_hash), (7, Web3.to_hex(self.chain.hashes[7])))
+        self.assertEqual(indexer.index(), 0)
+
+    def test_reorg_is_read_again(self):
+        self.chain.register(2, "FT-1")
+        self.chain.register(6, "FT-2")
+        indexer.index()
+
+        self.chain.reorg(5, 10)
+        self.chain.register(9, "FT-2")
+        received = []
+        events_indexed.connect(lambda pids, **kwargs: received.append(pids), weak=False, dispatch_uid="test")
+        self.addCleanup(events_indexed.disconnect, dispatch_uid="test")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(indexer.index(), 1)
+
+        self.assertEqual(
+            self.indexed(),
+            [("FT-1", 2, Web3.to_hex(self.chain.hashes[2])), ("FT-2", 9, Web3.to_hex(self.chain.hashes[9]))],
+        )
+        self.assertIn({"FT-2"}, received)
+
+    def test_never_reads_past_the_head(self):
+        self.chain.register(6, "FT-1")
+        self.assertEqual(indexer.index(to_block=100), 1)
+        self.assertEqual(IndexerCheckpoint.objects.get(chain_id=FakeChain.chain_id).block_number, 7)
+
+    def test_gives_up_on_a_range_that_keeps_changing(self):
+        hashes = iter(Web3.keccak(text=f"flap-{n}") for n in range(100))
+        with mock.patch.object(self.chain, "get_block", side_effect=lambda number: {"hash": next(hashes)}):
+            self.assertEqual(indexer.index(), 0)
+        self.assertEqual(IndexerCheckpoint.objects.get(chain_id=FakeChain.chain_id).block_number, -1)
+
+
+@override_settings(PRODUCT_REGISTRY_ADDRESS=REGISTRY, MULTICALL_BATCH_SIZE=2)
+class MulticallTests(TestCase):
+    def setUp(self):
+        self.w3 = mock.Mock(codec=Web3().codec)
+        self.w3.eth.block_number = 42
+        self.w3.eth.get_code.return_value = b"\x60\x80"  # Multicall3 is deployed
+        self.aggregate3 = mock.Mock()
+        self.multicall = SimpleNamespace(functions=SimpleNamespace(aggregate3=self.aggregate3))
+        self.multicall_providers = []
+        for patcher in (
+            mock.patch.object(enumeration, "get_w3", return_value=self.w3),
+            mock.patch.object(enumeration, "get_contract", self.get_contract),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for cached in (enumeration.multicall_available, get_contract):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
+
+    def get_contract(self, name, provider=None):
+        if name != "Multicall3":
+            return get_contract(name, provider=provider)
+        self.multicall_providers.append(provider)
+        return self.multicall
+
+    def test_batches_calls_and_decodes_results(self):
+        registry = get_contract("ProductRegistry")
+        record = ("FT-1", "Coffee", "f@example.com", 7, "0xabc", "")
+        found = registry.functions.getProduct("FT-1")._encode_transaction_data()
+        encoded = encode(["(string,string,string,uint256,string,string)"], [record])
+
+        def aggregate3(calls):
+            # "FT-1" exists, anything else reverts with "Product not found"
+            results = [(True, encoded) if data == found else (False, b"") for _, _, data in calls]
+            return mock.Mock(call=mock.Mock(return_value=results))
+        self.aggregate3.side_effect = aggregate3
+
+        results = enumeration.multicall([registry.functions.getProduct(pid) for pid in ("FT-1", "FT-404", "FT-1")])
+
+        self.assertEqual(results, [record, None, record])
+        self.assertEqual(self.aggregate3.call_count, 2)  # MULTICALL_BATCH_SIZE calls per eth_call
+        for call in self.aggregate3.call_args_list:
+            self.assertTrue(all(target == REGISTRY and allow_failure for target, allow_failure, _ in call.args[0]))
+
+    @override_settings(FARMER_REGISTRY_ADDRESS=REGISTRY, SEPOLIA_RPC_URL="http://farmers.test:8545")
+    def test_farmer_reads_use_the_farmer_registry_chain(self):
+        self.aggregate3.return_value.call.return_value = [(False, b"")]
+
+        self.assertEqual(get_farmers([404]), [None])
+
+        self.w3.eth.get_code.assert_called_once()
+        self.assertEqual(enumeration.get_w3.call_args_list, [mock.call("http://farmers.test:8545")] * 2)
+        self.assertEqual(self.multicall_providers, ["http://farmers.test:8545"])
+
+
+class FakeNode:
+    """web3's `eth` namespace as the signer uses it: nonces, broadcasts and receipts."""
+
+    chain_id = 1337
+    gas_price = Web3.to_wei(10, "gwei")
+
+    def __init__(self, pending=5):
+        self.pending = pending
+        self.sent = []
+        self.errors = []  # raised by the next broadcasts, in order
+        self.receipts = {}
+        self.on_broadcast = lambda: None
+
+    def get_transaction_count(self, address, block):
+        return self.pending
+
+    def send_raw_transaction(self, raw):
+        self.on_broadcast()
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(raw)
+        return Web3.keccak(raw)
+
+    def get_transaction_receipt(self, tx_hash):
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(tx_hash)
+        return self.receipts[tx_hash]
+
+
+@override_settings(SIGNER_FEE_BUMP_PERCENT=15, SIGNER_MAX_GAS_PRICE_GWEI=12)
+class SignerTests(TransactionTestCase):
+    # the signer reserves nonces on its own connection, which commits for real
+    databases = {"default", SIGNER_DB}
+
+    def setUp(self):
+        self.node = FakeNode()
+        self.signer = Signer("0x" + "11" * 32, SimpleNamespace(eth=self.node, to_wei=Web3.to_wei))
+        self.call = SimpleNamespace(address=REGISTRY, _encode_transaction_data=lambda: "0x")
+
+    def send(self):
+        return self.signer.send(self.call, gas=100_000, purpose="test")
+
+    def next_nonce(self):
+        return SignerNonce.objects.get(address=self.signer.address).next_nonce
+
+    def test_hands_out_consecutive_nonces(self):
+        with mock.patch.object(self.node, "get_transaction_count", wraps=self.node.get_transaction_count) as count:
+            sent = [self.send() for _ in range(3)]
+        count.assert_called_once()  # only the first send asks the node
+        self.assertEqual([tx.nonce for tx in sent], [5, 6, 7])
+        self.assertEqual([tx.tx_hash for tx in sent], [Web3.to_hex(Web3.keccak(raw)) for raw in self.node.sent])
+        self.assertEqual(self.next_nonce(), 8)
+
+    def test_reservation_commits_before_the_broadcast(self):
+        def on_broadcast():
+            # the nonce lock is gone and the record is visible to other sessions
+            self.assertFalse(connections[SIGNER_DB].in_atomic_block)
+            self.assertEqual(ChainTransaction.objects.using(SIGNER_DB).count(), 1)
+        self.node.on_broadcast = on_broadcast
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            chain_tx = self.send()
+            raise RuntimeError("the caller fails after the broadcast")
+
+        # the transaction is out, so its record and nonce survive the caller's rollback
+        self.assertTrue(ChainTransaction.objects.filter(tx_hash=chain_tx.tx_hash).exists())
+        self.assertEqual(self.next_nonce(), 6)
+
+    def test_resyncs_after_a_nonce_error(self):
+        self.send()
+        self.node.pending = 9  # something else spent nonces from this wallet
+        self.node.errors = [ValueError("nonce too low")]
+        chain_tx = self.send()
+        self.assertEqual(chain_tx.nonce, 9)
+        self.assertEqual(sorted(ChainTransaction.objects.values_list("nonce", flat=True)), [5, 9])
+        self.assertEqual(self.next_nonce(), 10)
+
+    def test_failed_broadcast_gives_the_nonce_back(self):
+        self.node.errors = [ValueError("insufficient funds for gas * price + value")]
+        with self.assertRaises(ValueError):
+            self.send()
+        self.assertFalse(ChainTransaction.objects.exists())
+        self.assertEqual(self.next_nonce(), 5)
+        self.assertEqual(self.send().nonce, 5)
+
+    def test_rebroadcast_stuck_bumps_the_fee_and_refresh_finds_the_winner(self):
+        chain_tx = self.send()
+        first_hash = chain_tx.tx_hash
+        self.assertEqual(self.signer.rebroadcast_stuck(older_than=60), 0)  # not stuck yet
+
+        ChainTransaction.objects.update(updated_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(self.signer.rebroadcast_stuck(older_than=60), 1)
+        chain_tx.refresh_from_db()
+        self.assertEqual((chain_tx.nonce, chain_tx.broadcasts), (5, 2))
+        self.assertEqual(chain_tx.gas_price, Web3.to_wei("11.5", "gwei"))
+        self.assertEqual(chain_tx.previous_hashes, [first_hash])
+        self.assertEqual(len(self.node.sent), 2)
+
+        # 11.5 gwei bumps to the 12 gwei cap once, then no further
+        self.assertTrue(self.signer.bump(chain_tx))
+        self.assertFalse(self.signer.bump(chain_tx))
+        self.assertEqual(chain_tx.gas_price, Web3.to_wei(12, "gwei"))
+
+        # the original, cheaper broadcast is the one that gets mined
+        self.assertIsNone(self.signer.refresh(chain_tx))
+        self.node.receipts[first_hash] = SimpleNamespace(status=1, blockNumber=12)
+        self.assertIsNotNone(self.signer.refresh(chain_tx))
+        chain_tx.refresh_from_db()
+        self.assertEqual((chain_tx.status, chain_tx.block_number, chain_tx.tx_hash), ("confirmed", 12, first_hash))
+        self.assertNotIn(first_hash, chain_tx.previous_hashes)
+        self.assertEqual(len(chain_tx.previous_hashes), 2)
@@ -7,5 +7,8 @@ class Payment(models.Model):
     status = models.CharField(max_length=20, default="pending")  # pending, success, failed
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"])]  # keyset pagination
+
     def __str__(self):
         return f"Payment {self.id} - {self.user.username} - {self.status}"
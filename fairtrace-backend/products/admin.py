@@ -1,11 +1,11 @@
 from django.contrib import admin
-from .models import Product, ProductImage, TransportLocation
+from .models import Product, ProductImage, ProductRoute, TransportLocation
 
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ("title", "farmer", "status", "price", "created_at")
-    list_filter = ("status", "created_at")
+    list_display = ("title", "farmer", "status", "anchor_status", "price", "created_at")
+    list_filter = ("status", "anchor_status", "created_at")
     search_fields = ("title", "farmer__username", "variety")
 
 
@@ -17,3 +17,9 @@ class ProductImageAdmin(admin.ModelAdmin):
 @admin.register(TransportLocation)
 class TransportLocationAdmin(admin.ModelAdmin):
     list_display = ("product", "lat", "lng", "recorded_at")
+
+
+@admin.register(ProductRoute)
+class ProductRouteAdmin(admin.ModelAdmin):
+    list_display = ("product", "point_count", "raw_point_count", "distance_m", "tolerance_m", "raw_archived_at")
+    exclude = ("polyline", "times")
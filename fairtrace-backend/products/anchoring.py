@@ -0,0 +1,89 @@
+# products/anchoring.py
+"""
+ProductRegistry calls used by the anchoring worker (products.tasks).
+
+Nothing in here waits for a transaction to be mined: `submit_registration`
+only signs and broadcasts, and `fetch_receipt` returns None until the node
+has a receipt, so the worker can poll without holding a process hostage.
+Transactions go through the shared admin signer (onchain.signer), which hands
+out nonces and replaces stuck transactions.
+"""
+from django.conf import settings
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from onchain.client import get_contract, get_w3
+from onchain.models import ChainTransaction
+from onchain.signer import get_signer
+
+from .utils import canonical_record_hash
+
+
+def get_registry():
+    return get_contract("ProductRegistry")
+
+
+def metadata_uri(product):
+    """
+    The registry stores a free-form metadata string; we put the canonical
+    record hash there so the on-chain entry can be checked against the DB row.
+    """
+    return canonical_record_hash(product)
+
+
+def _send(call, purpose):
+    return get_signer().send(
+        call,
+        gas=settings.ANCHOR_GAS_LIMIT,
+        gas_price=Web3.to_wei(settings.ANCHOR_GAS_PRICE_GWEI, "gwei"),
+        purpose=purpose,
+    )
+
+
+def submit_registration(product):
+    """
+    Sign and broadcast `registerProduct` for an approved product.
+    Returns the onchain.ChainTransaction that was recorded.
+    """
+    return _send(get_registry().functions.registerProduct(
+        product.pid,
+        product.title[:200],
+        product.farmer.email[:200],
+        metadata_uri(product),
+    ), purpose=f"product:{product.pid}")
+
+
+BATCH_RECORD_PREFIX = "BATCH-"
+
+
+def batch_record_id(batch):
+    """Registry key under which a batch root is stored."""
+    return f"{BATCH_RECORD_PREFIX}{batch.uid}"
+
+
+def submit_batch_root(batch):
+    """
+    Broadcast the Merkle root of an AnchorBatch. ProductRegistry has no
+    dedicated root method, so the root is registered as a record of its own
+    (keyed by `batch_record_id`) with the root in the metadata slot.
+    """
+    return _send(get_registry().functions.registerProduct(
+        batch_record_id(batch),
+        f"FairTrace batch of {batch.leaf_count} products",
+        "",
+        batch.root,
+    ), purpose=f"batch:{batch.uid}")
+
+
+def fetch_receipt(tx):
+    """
+    Return the receipt for `tx`, or None if it is not mined yet. `tx` is a
+    ChainTransaction (any of its fee-bumped replacements may be the one that
+    gets mined) or, for rows anchored before the signer existed, a plain hash.
+    """
+    if isinstance(tx, ChainTransaction):
+        return get_signer().refresh(tx)
+    try:
+        return get_w3().eth.get_transaction_receipt(tx)
+    except TransactionNotFound:
+        return None
@@ -0,0 +1,157 @@
+# products/decisions.py
+"""
+Bulk approve/decline for the SACCO admin review queue.
+
+`apply` takes a list of decisions and commits them in one transaction:
+the products are locked and updated with a single `bulk_update`, approved
+ones get their PIDs from one counter bump per farmer (utils.assign_pids)
+and their QR names from qr.assign_all. Everything slow is queued for after
+the commit, once for the whole batch: one QR render task, the anchoring
+hand-over (tasks.anchor.enqueue_anchors) and one `notify_decisions` task
+that puts every farmer's email in the outbox (notifications/outbox.py).
+
+The result is a BulkDecisionJob with a per-product outcome, which the
+client can re-read to see when the notifications were queued.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.utils import timezone
+
+from notifications.outbox import queue_emails
+from tasks.anchor import enqueue_anchors
+
+from . import qr, trace_cache
+from .models import BulkDecisionJob, Product
+from .utils import assign_pids
+
+logger = logging.getLogger(__name__)
+
+# request action -> Product.status
+ACTIONS = {
+    "approve": "approved",
+    "decline": "declined",
+    "reject": "declined",
+}
+
+# Product.status -> the statuses a product may be moved to from it
+REVIEWABLE = {
+    "pending": ("approved", "declined"),
+    "declined": ("approved",),  # corrected and re-approved
+}
+
+
+def apply(decisions, user=None):
+    """
+    Apply `decisions` ([{"uid", "action", "reason"}], see
+    BulkDecisionSerializer) and return the BulkDecisionJob. Unknown UIDs,
+    repeated UIDs and products already in the requested status are skipped,
+    and so are products the review queue may not move to it (REVIEWABLE),
+    which are reported as "invalid_status".
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        products = {
+            product.uid: product
+            for product in Product.objects.select_for_update()
+            .filter(uid__in=[decision["uid"] for decision in decisions])
+            .order_by("id")
+        }
+        approved, declined, results, seen = [], [], [], set()
+        for decision in decisions:
+            uid, new_status = decision["uid"], ACTIONS[decision["action"]]
+            result = {"uid": str(uid), "action": decision["action"], "result": new_status, "pid": None}
+            results.append(result)
+            product = products.get(uid)
+            if product is None:
+                result["result"] = "not_found"
+                continue
+            if uid in seen:
+                result["result"] = "duplicate"
+                continue
+            seen.add(uid)
+            if product.status == new_status:
+                result.update(result="unchanged", pid=product.pid)
+                continue
+            if new_status not in REVIEWABLE.get(product.status, ()):
+                result.update(result="invalid_status", status=product.status)
+                continue
+
+            product.status = new_status
+            product.admin_reason = decision.get("reason", "")
+            if new_status == "approved":
+                product.approved_at = now
+                approved.append(product)
+            else:
+                result["reason"] = product.admin_reason  # for the farmer's email
+                declined.append(product)
+
+        assign_pids(approved)
+        qr.assign_all(approved)
+        changed = approved + declined
+        Product.objects.bulk_update(changed, ["status", "admin_reason", "approved_at", "pid", "qr_code_path"])
+        trace_cache.invalidate(*(product.uid for product in changed))
+        enqueue_anchors([product.id for product in approved])
+
+        pids = {str(product.uid): product.pid for product in approved}
+        for result in results:
+            if result["result"] == "approved":
+                result["pid"] = pids[result["uid"]]
+
+        job = BulkDecisionJob.objects.create(
+            created_by=user,
+            total=len(decisions),
+            approved=len(approved),
+            declined=len(declined),
+            skipped=len(decisions) - len(changed),
+            results=results,
+        )
+        schedule_notifications(job)
+
+    logger.info("Decisions %s: %s approved, %s declined, %s skipped", job.uid, job.approved, job.declined, job.skipped)
+    return job
+
+
+def schedule_notifications(job):
+    from .tasks import notify_decisions
+
+    def dispatch():
+        try:
+            notify_decisions.delay(job.id)
+        except Exception:
+            logger.exception("Could not dispatch notifications for decisions %s", job.uid)
+
+    transaction.on_commit(dispatch)
+
+
+def decision_email(product, result):
+    """The farmer's email for `result`, one entry of a BulkDecisionJob's results."""
+    if result["result"] == "approved":
+        subject = "Your product has been approved ✅"
+        body = (
+            f"Dear {product.farmer.full_name},\n\n"
+            f"Your product '{product.title}' has been approved.\n\n"
+            f"PID: {result['pid']}\n\n"
+            f"Next steps: Your product is now live on FairTrace.\n"
+        )
+    else:
+        subject = "Your product was rejected ❌"
+        body = (
+            f"Dear {product.farmer.full_name},\n\n"
+            f"Unfortunately, your product '{product.title}' was rejected.\n\n"
+            f"Reason: {result.get('reason', '')}\n\n"
+            f"You may correct the issue and re-submit.\n\n"
+            f"Regards,\nFairTrace Team"
+        )
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [product.farmer.email])
+
+
+def notify(job):
+    """Queue an email to the farmer of every product `job` approved or declined; returns how many."""
+    # from the job's results, not the products' current status: a later decision may have changed it again
+    decided = {result["uid"]: result for result in job.results if result["result"] in ("approved", "declined")}
+    products = Product.objects.select_related("farmer").filter(uid__in=decided)
+    messages = [decision_email(product, decided[str(product.uid)]) for product in products]
+    return len(queue_emails(messages, purpose="product-decision"))
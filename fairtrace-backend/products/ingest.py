@@ -0,0 +1,80 @@
+# products/ingest.py
+"""
+Batched GPS ingestion for TransportLocation.
+
+Trucks report every few seconds, so fixes are written in batches instead of
+one INSERT (and one transaction) per point. Both the HTTP batch endpoint
+(`LocationBatchAPIView`) and the socket server, which buffers
+`location_update` events and posts them there, go through `store_fixes`:
+
+    store_fixes([{"pid": "PID-...", "lat": -1.28, "lng": 36.82, "recorded_at": "..."}, ...])
+
+Products are resolved in one query per batch. A fix that carries a
+"transporter_id" (every fix from a driver, whether posted with their JWT or
+relayed by the socket server on their behalf) is only stored for a product
+of that transporter that is in transit; fixes without one come from trusted
+server-side sources holding the ingest token. Rows are inserted with
+`bulk_create` in chunks of LOCATION_INGEST_CHUNK_SIZE. bulk_create does not
+send post_save, so anything that reacts to new locations must hook in here
+(as the trace cache does).
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from . import trace_cache
+from .models import Product, TransportLocation
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve_products(fixes):
+    """Map each fix's "uid"/"pid" to (product id, transporter id, status), in one query."""
+    uids = {fix["uid"] for fix in fixes if fix.get("uid")}
+    pids = {fix["pid"] for fix in fixes if fix.get("pid")}
+    rows = Product.objects.filter(Q(uid__in=uids) | Q(pid__in=pids)).values_list(
+        "id", "uid", "pid", "transporter_id", "status"
+    )
+    by_uid, by_pid = {}, {}
+    for product_id, uid, pid, transporter_id, status in rows:
+        by_uid[uid] = (product_id, transporter_id, status)
+        if pid:
+            by_pid[pid] = by_uid[uid]
+    return by_uid, by_pid
+
+
+def _allowed(fix, transporter_id, status):
+    if "transporter_id" not in fix:
+        return True  # a trusted server-side source
+    return fix["transporter_id"] is not None and fix["transporter_id"] == transporter_id and status == "in_transit"
+
+
+def store_fixes(fixes):
+    """
+    Insert validated fixes (see LocationFixSerializer) as TransportLocation rows.
+    Fixes for unknown products, and driver fixes for products that are not
+    theirs or not in transit, are skipped.
+    :return: (stored, skipped)
+    """
+    by_uid, by_pid = _resolve_products(fixes)
+    rows = []
+    for fix in fixes:
+        product = by_uid.get(fix.get("uid")) or by_pid.get(fix.get("pid"))
+        if product is None or not _allowed(fix, *product[1:]):
+            continue
+        row = TransportLocation(product_id=product[0], lat=round(fix["lat"], 6), lng=round(fix["lng"], 6))
+        if fix.get("recorded_at"):
+            row.recorded_at = fix["recorded_at"]
+        rows.append(row)
+
+    with transaction.atomic():
+        TransportLocation.objects.bulk_create(rows, batch_size=settings.LOCATION_INGEST_CHUNK_SIZE)
+        stored_ids = {row.product_id for row in rows}
+        trace_cache.invalidate(*(uid for uid, product in by_uid.items() if product[0] in stored_ids))
+
+    skipped = len(fixes) - len(rows)
+    if skipped:
+        logger.warning("Skipped %s location fixes for unknown or foreign products", skipped)
+    return len(rows), skipped
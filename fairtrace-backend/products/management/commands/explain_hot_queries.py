@@ -0,0 +1,97 @@
+# products/management/commands/explain_hot_queries.py
+"""
+EXPLAIN ANALYZE the queries behind the busiest list endpoints, once with the
+workflow indexes dropped ("before") and once with them in place ("after").
+
+    python manage.py explain_hot_queries
+    python manage.py explain_hot_queries --only after --no-seqscan
+
+The "before" pass drops the indexes inside a transaction that is rolled back,
+so nothing changes on disk, but the tables stay locked until it finishes:
+run it against a copy of production, not production itself.
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from billing.models import Tip
+from logistics.models import Transporter
+from products.models import Product, TransportLocation
+from users.models import OTPToken, User
+
+# Indexes added for these queries (see the Meta.indexes of the models above)
+WORKFLOW_INDEXES = (
+    "product_status_idx",
+    "product_transporter_status_idx",
+    "product_farmer_created_idx",
+    "product_pending_idx",
+    "transportloc_product_time_idx",
+    "otptoken_user_expires_idx",
+    "otptoken_unused_idx",
+    "tip_recipient_created_idx",
+)
+
+
+def hot_queries():
+    """(label, queryset) pairs mirroring what the views run, with sample ids from the DB."""
+    transporter_id = Transporter.objects.values_list("id", flat=True).first() or 0
+    farmer_id = Product.objects.values_list("farmer_id", flat=True).first() or 0
+    product_id = TransportLocation.objects.values_list("product_id", flat=True).first() or 0
+    user_id = OTPToken.objects.values_list("user_id", flat=True).first() or User.objects.values_list("id", flat=True).first() or 0
+    recipient_id = Tip.objects.values_list("recipient_id", flat=True).first() or 0
+    now = timezone.now()
+
+    return [
+        ("Pending products (admin approval queue)",
+         Product.objects.filter(status="pending").order_by("-created_at")[:50]),
+        ("Products by status",
+         Product.objects.filter(status="approved")[:50]),
+        ("Transporter's pending delivery requests",
+         Product.objects.filter(transporter_id=transporter_id, status="approved").order_by("-created_at")[:50]),
+        ("Farmer's products, newest first",
+         Product.objects.filter(farmer_id=farmer_id).order_by("-created_at")[:50]),
+        ("Latest locations of a product",
+         TransportLocation.objects.filter(product_id=product_id).order_by("-recorded_at")[:100]),
+        ("Live OTP tokens of a user",
+         OTPToken.objects.filter(user_id=user_id, expires_at__gte=now, used=False)),
+        ("Tips received, newest first",
+         Tip.objects.filter(recipient_id=recipient_id).order_by("-created_at")[:50]),
+    ]
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN ANALYZE the hot workflow queries without and with their indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only", choices=("before", "after"),
+            help="Show only the plans without (before) or with (after) the workflow indexes.",
+        )
+        parser.add_argument(
+            "--no-seqscan", action="store_true",
+            help="SET enable_seqscan = off, to see which index would be used on a small dev database.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stderr.write("explain_hot_queries needs PostgreSQL.")
+            return
+
+        passes = [options["only"]] if options["only"] else ["before", "after"]
+        for label in passes:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"=== {label.upper()} ==="))
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    if options["no_seqscan"]:
+                        cursor.execute("SET LOCAL enable_seqscan = off")
+                    if label == "before":
+                        for name in WORKFLOW_INDEXES:
+                            cursor.execute(f"DROP INDEX IF EXISTS {connection.ops.quote_name(name)}")
+                self.explain_all()
+                transaction.set_rollback(True)
+
+    def explain_all(self):
+        for title, queryset in hot_queries():
+            self.stdout.write(self.style.SUCCESS(title))
+            self.stdout.write(queryset.explain(analyze=True, buffers=True))
+            self.stdout.write("")
@@ -0,0 +1,63 @@
+# products/management/commands/manage_location_partitions.py
+"""
+Maintain the monthly partitions of products_transportlocation.
+
+    python manage.py manage_location_partitions                      # create upcoming months
+    python manage.py manage_location_partitions --retain-months 12   # ...and expire older ones
+    python manage.py manage_location_partitions --retain-months 12 --keep-detached --dry-run
+
+Celery beat runs the same steps daily with the LOCATION_PARTITION* settings.
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from products import partitions
+
+
+class Command(BaseCommand):
+    help = "Create upcoming TransportLocation partitions and detach/archive expired ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ahead", type=int, help="Months to create in advance (LOCATION_PARTITIONS_AHEAD).")
+        parser.add_argument(
+            "--retain-months", type=int,
+            help="Expire partitions older than this many months (LOCATION_PARTITION_RETENTION_MONTHS; 0 keeps all).",
+        )
+        parser.add_argument("--no-archive", action="store_true", help="Do not write expired months to storage.")
+        parser.add_argument(
+            "--keep-detached", action="store_true",
+            help="Detach expired partitions but leave the tables in place (e.g. for pg_dump).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only show what would be done.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stderr.write("manage_location_partitions needs PostgreSQL.")
+            return
+        with connection.cursor() as cursor:
+            if not partitions.is_partitioned(cursor):
+                self.stderr.write(f"{partitions.PARENT} is not partitioned; run migrate first.")
+                return
+
+        dry_run = options["dry_run"]
+        prefix = "Would " if dry_run else ""
+        for name in partitions.ensure_partitions(options["ahead"], dry_run=dry_run):
+            self.stdout.write(self.style.SUCCESS(f"{prefix}create {name}"))
+        expired = partitions.expire_partitions(
+            options["retain_months"],
+            archive=False if options["no_archive"] else None,
+            drop=not options["keep_detached"],
+            dry_run=dry_run,
+        )
+        for name in expired:
+            action = "detach" if options["keep_detached"] else "expire"
+            self.stdout.write(self.style.WARNING(f"{prefix}{action} {name}"))
+
+        with connection.cursor() as cursor:
+            months = partitions.monthly_partitions(cursor)
+            cursor.execute(f"SELECT count(*) FROM {partitions.DEFAULT_PARTITION}")
+            stray = cursor.fetchone()[0]
+        if months:
+            self.stdout.write(f"{len(months)} monthly partitions, {min(months):%Y-%m} to {max(months):%Y-%m}")
+        if stray:
+            self.stdout.write(self.style.WARNING(f"{stray} rows in {partitions.DEFAULT_PARTITION} (outside every month)"))
@@ -0,0 +1,62 @@
+# products/merkle.py
+"""
+Minimal Merkle tree over `canonical_record_hash` values.
+
+Pairs are sorted before hashing (sha256(min || max)), so a proof is just the
+list of sibling hashes from leaf to root and needs no left/right flags. An
+odd node at the end of a level is carried up unchanged.
+"""
+import hashlib
+
+SCHEME = "sha256-sorted-pairs"
+
+
+def _to_bytes(h):
+    return bytes.fromhex(h[2:] if h.startswith("0x") else h)
+
+
+def _to_hex(b):
+    return "0x" + b.hex()
+
+
+def _hash_pair(a, b):
+    if b < a:
+        a, b = b, a
+    return hashlib.sha256(a + b).digest()
+
+
+def build_levels(leaves):
+    """Return every level of the tree, leaves first and the root level last."""
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    level = [_to_bytes(leaf) for leaf in leaves]
+    levels = [level]
+    while len(level) > 1:
+        level = [
+            _hash_pair(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+        levels.append(level)
+    return levels
+
+
+def merkle_root(levels):
+    return _to_hex(levels[-1][0])
+
+
+def merkle_proof(levels, index):
+    """Sibling hashes needed to walk leaf `index` up to the root."""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(_to_hex(level[sibling]))
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf, proof, root):
+    node = _to_bytes(leaf)
+    for sibling in proof:
+        node = _hash_pair(node, _to_bytes(sibling))
+    return _to_hex(node) == root.lower()
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onchain', '0001_initial'),
+        ('products', '0006_anchorbatch_product_anchor_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='anchorbatch',
+            name='chain_tx',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='onchain.chaintransaction'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='anchor_tx',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='onchain.chaintransaction'),
+        ),
+    ]
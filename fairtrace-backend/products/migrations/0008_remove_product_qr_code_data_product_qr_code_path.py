@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:47
+
+import hashlib
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def point_existing_qr_codes(apps, schema_editor):
+    """
+    Products that had an inline data URL get the storage name of the same QR
+    code (see products/qr.py); the image itself is rendered on first request.
+    """
+    Product = apps.get_model('products', 'Product')
+    fmt = settings.QR_FORMAT
+    products = list(Product.objects.exclude(qr_code_data__isnull=True).exclude(qr_code_data=''))
+    for product in products:
+        key = f"1|{fmt}|10|4|{settings.FRONTEND_URL}/trace/{product.uid}"
+        product.qr_code_path = f"qr/{hashlib.sha256(key.encode()).hexdigest()}.{fmt}"
+    Product.objects.bulk_update(products, ['qr_code_path'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_anchorbatch_chain_tx_product_anchor_tx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='qr_code_path',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.RunPython(point_existing_qr_codes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='product',
+            name='qr_code_data',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistics', '0004_delivery_logistics_d_created_99eab6_idx_and_more'),
+        ('onchain', '0001_initial'),
+        ('products', '0008_remove_product_qr_code_data_product_qr_code_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['created_at', 'id'], name='products_pr_created_3be21c_idx'),
+        ),
+    ]
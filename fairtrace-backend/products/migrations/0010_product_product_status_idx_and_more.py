@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistics', '0004_delivery_logistics_d_created_99eab6_idx_and_more'),
+        ('onchain', '0001_initial'),
+        ('products', '0009_product_products_pr_created_3be21c_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status'], name='product_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['transporter', 'status'], name='product_transporter_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['farmer', '-created_at'], name='product_farmer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['-created_at'], name='product_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transportlocation',
+            index=models.Index(fields=['product', 'recorded_at'], name='transportloc_product_time_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_product_status_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transportlocation',
+            name='recorded_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_alter_transportlocation_recorded_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductRoute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('polyline', models.TextField(blank=True, default='')),
+                ('times', models.JSONField(blank=True, default=list)),
+                ('tolerance_m', models.FloatField()),
+                ('point_count', models.PositiveIntegerField(default=0)),
+                ('raw_point_count', models.PositiveIntegerField(default=0)),
+                ('distance_m', models.FloatField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('raw_archived_at', models.DateTimeField(blank=True, null=True)),
+                ('raw_archive_path', models.CharField(blank=True, default='', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='route', to='products.product')),
+            ],
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Rebuilds products_transportlocation as a table partitioned by month on
+# recorded_at (see products/partitions.py). PostgreSQL only; the model state
+# does not change.
+
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+TABLE = 'products_transportlocation'
+COLUMNS = 'id, lat, lng, recorded_at, product_id'
+MONTHS_AHEAD = 3
+
+
+def _add_months(year, month, n):
+    index = year * 12 + month - 1 + n
+    return index // 12, index % 12 + 1
+
+
+def _saved_definitions(cursor, table):
+    """Index and foreign key DDL of `table`, to recreate them under the same names."""
+    cursor.execute(
+        "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i WHERE i.indrelid = %s::regclass AND NOT i.indisprimary",
+        [table],
+    )
+    # partitioned parents report their indexes as "ON ONLY <table>"
+    statements = [row[0].replace(" ON ONLY ", " ON ") for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    statements += [f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}' for name, definition in cursor.fetchall()]
+    return statements
+
+
+def _rebuild_sequence(cursor, table):
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+    next_id = cursor.fetchone()[0]
+    cursor.execute(f"CREATE SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')")
+    cursor.execute(f"SELECT setval('{table}_id_seq', %s, false)", [next_id])
+
+
+def partition(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        definitions = _saved_definitions(cursor, TABLE)
+        cursor.execute(
+            f"CREATE TABLE {TABLE}_new (id bigint NOT NULL, lat numeric(9, 6) NOT NULL, lng numeric(9, 6) NOT NULL, "
+            f"recorded_at timestamp with time zone NOT NULL, product_id bigint NOT NULL) PARTITION BY RANGE (recorded_at)"
+        )
+
+        # One partition per month from the oldest fix up to MONTHS_AHEAD from now
+        cursor.execute(f"SELECT MIN(recorded_at) FROM {TABLE}")
+        oldest = cursor.fetchone()[0]
+        now = datetime.now(timezone.utc)
+        year, month = (oldest.year, oldest.month) if oldest else (now.year, now.month)
+        last = _add_months(now.year, now.month, MONTHS_AHEAD)
+        while (year, month) <= last:
+            next_year, next_month = _add_months(year, month, 1)
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_y{year}m{month:02d} PARTITION OF {TABLE}_new FOR VALUES FROM (%s) TO (%s)",
+                [datetime(year, month, 1, tzinfo=timezone.utc), datetime(next_year, next_month, 1, tzinfo=timezone.utc)],
+            )
+            year, month = next_year, next_month
+        cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE}_new DEFAULT")
+
+        cursor.execute(f"INSERT INTO {TABLE}_new ({COLUMNS}) SELECT {COLUMNS} FROM {TABLE}")
+        cursor.execute(f"DROP TABLE {TABLE}")
+        cursor.execute(f"ALTER TABLE {TABLE}_new RENAME TO {TABLE}")
+        _rebuild_sequence(cursor, TABLE)
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, recorded_at)")
+        for statement in definitions:
+            cursor.execute(statement)
+
+
+def unpartition(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        definitions = _saved_definitions(cursor, TABLE)
+        cursor.execute(f"CREATE TABLE {TABLE}_new (LIKE {TABLE})")
+        cursor.execute(f"INSERT INTO {TABLE}_new ({COLUMNS}) SELECT {COLUMNS} FROM {TABLE}")
+        cursor.execute(f"DROP TABLE {TABLE} CASCADE")
+        cursor.execute(f"ALTER TABLE {TABLE}_new RENAME TO {TABLE}")
+        _rebuild_sequence(cursor, TABLE)
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)")
+        for statement in definitions:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_productroute'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
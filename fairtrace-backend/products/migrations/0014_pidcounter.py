@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:29
+
+import re
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+PID_PATTERN = re.compile(r'^FT-(\d{4})-(\d+)-(\d+)$')
+
+
+def seed_counters(apps, schema_editor):
+    """Start every farmer's counter after the highest FT-<year>-<farmer>-<seq> PID already issued."""
+    Product = apps.get_model('products', 'Product')
+    PidCounter = apps.get_model('products', 'PidCounter')
+    last = {}
+    for farmer_id, pid in Product.objects.filter(pid__startswith='FT-').values_list('farmer_id', 'pid').iterator():
+        match = PID_PATTERN.match(pid)
+        if match and int(match.group(2)) == farmer_id:
+            key = (farmer_id, int(match.group(1)))
+            last[key] = max(last.get(key, 0), int(match.group(3)))
+    PidCounter.objects.bulk_create(
+        PidCounter(farmer_id=farmer_id, year=year, last_seq=seq) for (farmer_id, year), seq in last.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_partition_transportlocation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PidCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('last_seq', models.PositiveIntegerField(default=0)),
+                ('farmer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pid_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('farmer', 'year'), name='pidcounter_farmer_year_uniq')],
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,34 @@
 # products/models.py
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 import uuid
 
 User = settings.AUTH_USER_MODEL
 
 
+class ProductQuerySet(models.QuerySet):
+    """Query shapes matching the serializers in products/serializers.py."""
+
+    def for_summary(self):
+        """Rows for ProductSummarySerializer / AdminProductSerializer (farmer joined in)."""
+        return self.select_related("farmer")
+
+    def for_detail(self, locations_limit=None):
+        """
+        Rows for the full serializers: farmer, images and only the latest
+        `locations_limit` transport locations (PRODUCT_LOCATIONS_LIMIT by
+        default), in three queries however many products there are.
+        """
+        limit = locations_limit or settings.PRODUCT_LOCATIONS_LIMIT
+        latest = TransportLocation.objects.order_by("-recorded_at", "-id")[:limit]
+        return self.for_summary().select_related("route").prefetch_related(
+            "images",
+            # sliced prefetches need to_attr; read them through Product.latest_locations
+            models.Prefetch("locations", queryset=latest, to_attr="prefetched_locations"),
+        )
+
+
 class Product(models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending"),
@@ -16,6 +39,14 @@ class Product(models.Model):
         ("delivered", "Delivered"),
     ]
 
+    # Lifecycle of the on-chain registration handled by products.tasks
+    ANCHOR_STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("submitted", "Submitted"),
+        ("confirmed", "Confirmed"),
+        ("failed", "Failed"),
+    ]
+
     uid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     pid = models.CharField(max_length=64, null=True, blank=True, unique=True)  # generated on approval
     farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name="products")
@@ -43,13 +74,104 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     approved_at = models.DateTimeField(null=True, blank=True)
     tx_hash = models.CharField(max_length=128, blank=True, null=True)  # blockchain transaction hash
-    qr_code_data = models.TextField(blank=True, null=True)  # base64 or data URL for QR code
+    anchor_status = models.CharField(max_length=20, choices=ANCHOR_STATUS_CHOICES, blank=True, default="")
+    anchor_attempts = models.PositiveIntegerField(default=0)
+    anchor_error = models.TextField(blank=True, null=True)
+    anchor_block = models.BigIntegerField(null=True, blank=True)  # block the registration was mined in
+    anchor_updated_at = models.DateTimeField(null=True, blank=True)
+    anchor_batch = models.ForeignKey(
+        'AnchorBatch',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="products"
+    )  # set when the product is anchored as part of a Merkle root (ANCHOR_MODE=merkle)
+    anchor_tx = models.ForeignKey(
+        'onchain.ChainTransaction',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )  # the registerProduct transaction sent through onchain.signer (ANCHOR_MODE=single)
+    qr_code_path = models.CharField(max_length=100, blank=True, default="")  # storage name, see products/qr.py
     proof = models.TextField(blank=True, null=True)
     public_signals = models.JSONField(blank=True, null=True)
 
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"]),  # keyset pagination
+            models.Index(fields=["status"], name="product_status_idx"),
+            models.Index(fields=["transporter", "status"], name="product_transporter_status_idx"),
+            models.Index(fields=["farmer", "-created_at"], name="product_farmer_created_idx"),
+            # the SACCO admin approval queue
+            models.Index(fields=["-created_at"], condition=models.Q(status="pending"), name="product_pending_idx"),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.status}"
 
+    @property
+    def latest_locations(self):
+        """The newest PRODUCT_LOCATIONS_LIMIT transport locations, newest first."""
+        if hasattr(self, "prefetched_locations"):
+            return self.prefetched_locations
+        return self.locations.order_by("-recorded_at", "-id")[:settings.PRODUCT_LOCATIONS_LIMIT]
+
+
+class AnchorBatch(models.Model):
+    """A Merkle root over a window of approved products, sent in one transaction."""
+    uid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    root = models.CharField(max_length=66)
+    leaf_count = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=Product.ANCHOR_STATUS_CHOICES, default="pending")
+    tx_hash = models.CharField(max_length=128, blank=True, null=True)
+    chain_tx = models.ForeignKey('onchain.ChainTransaction', on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    block_number = models.BigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Batch {self.uid} ({self.leaf_count} products) - {self.status}"
+
+
+class BulkDecisionJob(models.Model):
+    """A batch of review-queue decisions applied in one transaction (products/decisions.py)."""
+    STATUS_CHOICES = [
+        ("applied", "Applied"),  # statuses committed, notifications queued
+        ("completed", "Completed"),  # notifications queued in the outbox
+    ]
+
+    uid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="applied")
+    total = models.PositiveIntegerField(default=0)
+    approved = models.PositiveIntegerField(default=0)
+    declined = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)  # not found, duplicated, already in that status or not reviewable
+    notified = models.PositiveIntegerField(default=0)
+    results = models.JSONField(default=list, blank=True)  # [{"uid", "action", "result", "pid", ...}] in request order
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Decisions {self.uid}: {self.approved} approved, {self.declined} declined - {self.status}"
+
+
+class PidCounter(models.Model):
+    """Last PID sequence number handed out per farmer and year (products.utils.allocate_pids)."""
+    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name="pid_counters")
+    year = models.PositiveSmallIntegerField()
+    last_seq = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["farmer", "year"], name="pidcounter_farmer_year_uniq")]
+
+    def __str__(self):
+        return f"PIDs {self.year} for farmer {self.farmer_id}: {self.last_seq}"
+
 
 class Stage(models.Model):
     uid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -79,12 +201,40 @@ class TransportLocation(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="locations")
     lat = models.DecimalField(max_digits=9, decimal_places=6)
     lng = models.DecimalField(max_digits=9, decimal_places=6)
-    recorded_at = models.DateTimeField(auto_now_add=True)
+    recorded_at = models.DateTimeField(default=timezone.now)  # device time when the fix carries one
+
+    class Meta:
+        indexes = [models.Index(fields=["product", "recorded_at"], name="transportloc_product_time_idx")]
 
     def __str__(self):
         return f"{self.product.title} @ ({self.lat}, {self.lng})"
 
 
+class ProductRoute(models.Model):
+    """Simplified, polyline-encoded track of a delivery, built by products/routes.py."""
+    TRACK_FIELDS = (
+        "polyline", "times", "tolerance_m", "point_count", "raw_point_count",
+        "distance_m", "started_at", "ended_at",
+    )
+
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name="route")
+    polyline = models.TextField(blank=True, default="")
+    times = models.JSONField(default=list, blank=True)  # seconds since started_at, one per point
+    tolerance_m = models.FloatField()
+    point_count = models.PositiveIntegerField(default=0)
+    raw_point_count = models.PositiveIntegerField(default=0)
+    distance_m = models.FloatField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    ended_at = models.DateTimeField(null=True, blank=True)
+    raw_archived_at = models.DateTimeField(null=True, blank=True)  # raw fixes deleted (ROUTE_RAW_RETENTION_DAYS)
+    raw_archive_path = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Route for {self.product.title} ({self.point_count}/{self.raw_point_count} points)"
+
+
 class Delivery(models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending"),
@@ -0,0 +1,160 @@
+# products/partitions.py
+"""
+Monthly range partitions of products_transportlocation on recorded_at.
+
+The table is partitioned by migration 0013. Rows land in
+`products_transportlocation_y<YYYY>m<MM>`; anything outside the existing
+months goes to `products_transportlocation_default`, which should stay empty.
+The primary key is (id, recorded_at) in the database, since Postgres needs
+the partition key in it, while Django keeps treating `id` as the key.
+
+`ensure_partitions` creates the coming months, moving any rows the default
+partition already holds for them. `expire_partitions` detaches months older
+than the retention window, archives them as gzipped CSV on the default storage
+and drops them. Both run from `manage.py manage_location_partitions` and the
+`manage_location_partitions` beat task.
+"""
+import gzip
+import logging
+import re
+import tempfile
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PARENT = "products_transportlocation"
+DEFAULT_PARTITION = f"{PARENT}_default"
+COLUMNS = "id, lat, lng, recorded_at, product_id"
+NAME_RE = re.compile(rf"^{PARENT}_y(\d{{4}})m(\d{{2}})$")
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARENT}_y{month.year}m{month.month:02d}"
+
+
+def bounds(month):
+    """UTC timestamps [start, end) covered by the partition for `month`."""
+    start = datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+    end_month = add_months(month, 1)
+    return start, datetime(end_month.year, end_month.month, 1, tzinfo=dt_timezone.utc)
+
+
+def is_partitioned(cursor):
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [PARENT])
+    row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def monthly_partitions(cursor):
+    """{month: table name} for the monthly partitions currently attached."""
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(%s)",
+        [PARENT],
+    )
+    months = {}
+    for (name,) in cursor.fetchall():
+        match = NAME_RE.match(name)
+        if match:
+            months[date(int(match[1]), int(match[2]), 1)] = name
+    return months
+
+
+def create_partition(cursor, month):
+    """
+    Create and attach the partition for `month`. Rows the default partition
+    holds for that month are moved into it first, and a CHECK constraint
+    matching the bounds lets ATTACH skip scanning the new table.
+    """
+    name = partition_name(month)
+    start, end = bounds(month)
+    cursor.execute(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)")
+    cursor.execute(
+        f"ALTER TABLE {name} ADD CONSTRAINT {name}_bounds CHECK (recorded_at >= %s AND recorded_at < %s)",
+        [start, end],
+    )
+    cursor.execute("SELECT to_regclass(%s)", [DEFAULT_PARTITION])
+    if cursor.fetchone()[0]:
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE recorded_at >= %s AND recorded_at < %s "
+            f"RETURNING {COLUMNS}) INSERT INTO {name} ({COLUMNS}) SELECT {COLUMNS} FROM moved",
+            [start, end],
+        )
+    cursor.execute(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", [start, end])
+    cursor.execute(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bounds")
+    return name
+
+
+def ensure_partitions(ahead=None, dry_run=False):
+    """Make sure this month and the next `ahead` months have partitions. Returns the names created."""
+    ahead = settings.LOCATION_PARTITIONS_AHEAD if ahead is None else ahead
+    this_month = month_start(timezone.now())
+    created = []
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return created
+        existing = monthly_partitions(cursor)
+        for n in range(ahead + 1):
+            month = add_months(this_month, n)
+            if month in existing:
+                continue
+            if not dry_run:
+                with transaction.atomic():
+                    create_partition(cursor, month)
+            created.append(partition_name(month))
+    return created
+
+
+def _archive(cursor, name):
+    """COPY a detached partition into a gzipped CSV on the default storage; returns the stored name."""
+    with tempfile.TemporaryFile() as tmp:
+        with gzip.GzipFile(fileobj=tmp, mode="wb") as gz:
+            cursor.copy_expert(f"COPY (SELECT {COLUMNS} FROM {name} ORDER BY recorded_at, id) TO STDOUT WITH CSV HEADER", gz)
+        tmp.seek(0)
+        return default_storage.save(f"locations/partitions/{name}.csv.gz", File(tmp))
+
+
+def expire_partitions(retain_months=None, archive=None, drop=True, dry_run=False):
+    """
+    Detach monthly partitions that end before the retention window, archive
+    them (LOCATION_PARTITION_ARCHIVE) and drop them, unless `drop` is False.
+    Returns the names handled.
+    """
+    retain_months = settings.LOCATION_PARTITION_RETENTION_MONTHS if retain_months is None else retain_months
+    archive = settings.LOCATION_PARTITION_ARCHIVE if archive is None else archive
+    if retain_months <= 0:
+        return []
+    cutoff = add_months(month_start(timezone.now()), -retain_months)
+    expired = []
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return expired
+        for month, name in sorted(monthly_partitions(cursor).items()):
+            if month >= cutoff:
+                continue
+            expired.append(name)
+            if dry_run:
+                continue
+            with transaction.atomic():
+                cursor.execute(f"ALTER TABLE {PARENT} DETACH PARTITION {name}")
+                if archive:
+                    stored = _archive(cursor, name)
+                    logger.info("Archived %s to %s", name, stored)
+                if drop:
+                    cursor.execute(f"DROP TABLE {name}")
+    return expired
@@ -0,0 +1,13 @@
+import hmac
+
+from django.conf import settings
+from rest_framework import permissions
+
+
+class HasIngestToken(permissions.BasePermission):
+    """Service-to-service calls (the socket server) carrying LOCATION_INGEST_TOKEN."""
+
+    def has_permission(self, request, view):
+        expected = settings.LOCATION_INGEST_TOKEN
+        given = request.headers.get("X-Ingest-Token", "")
+        return bool(expected) and hmac.compare_digest(given, expected)
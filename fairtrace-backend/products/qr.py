@@ -0,0 +1,114 @@
+# products/qr.py
+"""
+QR codes for approved products.
+
+Images live on the default storage backend under `qr/<digest>.<format>`,
+where the digest is a sha256 over everything that determines the image (the
+encoded trace URL, format and render settings). The name is therefore known
+before anything is rendered: approval only stores the name on the product and
+queues `products.tasks.render_product_qr`, and `qr_image` renders on a miss
+if it is asked for an image the worker has not produced yet. Since a name
+always maps to the same bytes, responses are cached as immutable.
+"""
+import hashlib
+import io
+import logging
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+# Bump when rendering changes in a way that should produce new URLs.
+RENDER_VERSION = 1
+BOX_SIZE = 10
+BORDER = 4
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+def trace_url(product):
+    """What the QR code encodes: the public trace page for the product."""
+    return f"{settings.FRONTEND_URL}/trace/{product.uid}"
+
+
+def storage_name(data, fmt):
+    key = f"{RENDER_VERSION}|{fmt}|{BOX_SIZE}|{BORDER}|{data}"
+    return f"qr/{hashlib.sha256(key.encode()).hexdigest()}.{fmt}"
+
+
+def render(data, fmt):
+    """Render `data` as a QR image and return the file bytes."""
+    factory = qrcode.image.svg.SvgPathImage if fmt == "svg" else None
+    img = qrcode.make(data, box_size=BOX_SIZE, border=BORDER, image_factory=factory)
+    buf = io.BytesIO()
+    if fmt == "svg":
+        img.save(buf)
+    else:
+        img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def ensure_stored(name, data):
+    """Render and store `name` unless the storage already has it."""
+    if default_storage.exists(name):
+        return
+    fmt = name.rsplit(".", 1)[1]
+    saved = default_storage.save(name, ContentFile(render(data, fmt)))
+    if saved != name:
+        # Another worker stored the same image first; ours got a suffixed name.
+        default_storage.delete(saved)
+
+
+def assign(product):
+    """
+    Point `product` at its QR image (in QR_FORMAT) and queue the render once
+    the surrounding transaction commits. The caller saves the product.
+    """
+    from .tasks import render_product_qr
+
+    product.qr_code_path = storage_name(trace_url(product), settings.QR_FORMAT)
+
+    def dispatch():
+        try:
+            render_product_qr.delay(product.id)
+        except Exception:
+            # qr_image renders on a miss, so a lost task only costs one slow request.
+            logger.exception("Could not dispatch QR render for product %s", product.id)
+
+    transaction.on_commit(dispatch)
+    return product.qr_code_path
+
+
+def assign_all(products):
+    """`assign` for many products, with one render task for all of them. The caller saves the products."""
+    from .tasks import render_product_qrs
+
+    for product in products:
+        product.qr_code_path = storage_name(trace_url(product), settings.QR_FORMAT)
+    product_ids = [product.id for product in products]
+
+    def dispatch():
+        try:
+            render_product_qrs.delay(product_ids)
+        except Exception:
+            logger.exception("Could not dispatch QR render for %s products", len(product_ids))
+
+    if product_ids:
+        transaction.on_commit(dispatch)
+
+
+def qr_url(product, request=None):
+    """Public URL of the product's QR image, or None if it has none."""
+    if not product.qr_code_path:
+        return None
+    url = reverse("product-qr", kwargs={"filename": product.qr_code_path.split("/", 1)[1]})
+    return request.build_absolute_uri(url) if request is not None else url
@@ -0,0 +1,256 @@
+# products/routes.py
+"""
+Compact delivery tracks.
+
+When a delivery completes, `products.tasks.build_product_route` runs the raw
+TransportLocation fixes through Douglas-Peucker (ROUTE_SIMPLIFY_TOLERANCE_M)
+and stores the result on ProductRoute as an encoded polyline (Google's format,
+5 decimals) plus per-point time offsets. Raw fixes are kept for
+ROUTE_RAW_RETENTION_DAYS after that, then archived to the default storage as
+gzipped CSV (ROUTE_ARCHIVE_RAW) and deleted by `archive_raw_locations`.
+
+`route_payload` serves the stored track, simplified further when a coarser
+tolerance is asked for; the stored resolution is the finest it serves, so a
+public request never reloads a whole delivery's raw fixes. Products still in
+transit get a track computed on the fly from their latest
+ROUTE_LIVE_MAX_POINTS raw fixes.
+"""
+import csv
+import gzip
+import io
+import logging
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ProductRoute, TransportLocation
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371008.8
+POLYLINE_PRECISION = 5
+
+
+# --- geometry ------------------------------------------------------------
+
+def _project(points):
+    """Equirectangular projection to metres around the first point; fine at route scale."""
+    lat0 = math.radians(points[0][0])
+    kx = EARTH_RADIUS_M * math.cos(lat0) * math.pi / 180
+    ky = EARTH_RADIUS_M * math.pi / 180
+    return [(lng * kx, lat * ky) for lat, lng in points]
+
+
+def simplify(points, tolerance_m):
+    """
+    Douglas-Peucker over [(lat, lng), ...].
+    Returns the indices of the points to keep (always the first and last).
+    """
+    n = len(points)
+    if n < 3:
+        return list(range(n))
+    xy = _project(points)
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    tolerance2 = tolerance_m * tolerance_m
+
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = xy[first]
+        dx, dy = xy[last][0] - ax, xy[last][1] - ay
+        length2 = dx * dx + dy * dy
+        max_d2, index = 0.0, None
+        for i in range(first + 1, last):
+            px, py = xy[i][0] - ax, xy[i][1] - ay
+            t = 0.0 if length2 == 0 else max(0.0, min(1.0, (px * dx + py * dy) / length2))
+            ex, ey = px - t * dx, py - t * dy
+            d2 = ex * ex + ey * ey
+            if d2 > max_d2:
+                max_d2, index = d2, i
+        if index is not None and max_d2 > tolerance2:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [i for i in range(n) if keep[i]]
+
+
+def distance_m(points):
+    """Haversine length of the path through `points`."""
+    total = 0.0
+    for (lat1, lng1), (lat2, lng2) in zip(points, points[1:]):
+        p1, p2 = math.radians(lat1), math.radians(lat2)
+        dp, dl = p2 - p1, math.radians(lng2 - lng1)
+        a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+        total += 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+    return total
+
+
+# --- encoded polylines ---------------------------------------------------
+
+def _encode_value(value):
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+
+def encode_polyline(points, precision=POLYLINE_PRECISION):
+    factor = 10 ** precision
+    out, prev_lat, prev_lng = [], 0, 0
+    for lat, lng in points:
+        lat_i, lng_i = round(lat * factor), round(lng * factor)
+        out.append(_encode_value(lat_i - prev_lat))
+        out.append(_encode_value(lng_i - prev_lng))
+        prev_lat, prev_lng = lat_i, lng_i
+    return "".join(out)
+
+
+def decode_polyline(encoded, precision=POLYLINE_PRECISION):
+    factor = 10 ** precision
+    points, index, lat, lng = [], 0, 0, 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        points.append((lat / factor, lng / factor))
+    return points
+
+
+# --- routes --------------------------------------------------------------
+
+def raw_track(product_id, limit=None):
+    """
+    [(lat, lng)], [recorded_at] of a product's raw fixes (the latest `limit`
+    of them if given), oldest first, repeats dropped.
+    """
+    points, times = [], []
+    fixes = TransportLocation.objects.filter(product_id=product_id)
+    if limit:
+        rows = reversed(fixes.order_by("-recorded_at", "-id").values_list("lat", "lng", "recorded_at")[:limit])
+    else:
+        rows = fixes.order_by("recorded_at", "id").values_list("lat", "lng", "recorded_at").iterator(chunk_size=5000)
+    for lat, lng, recorded_at in rows:
+        point = (float(lat), float(lng))
+        if points and points[-1] == point:
+            continue
+        points.append(point)
+        times.append(recorded_at)
+    return points, times
+
+
+def _track(points, times, tolerance_m):
+    kept = simplify(points, tolerance_m)
+    started = times[0] if times else None
+    return {
+        "polyline": encode_polyline([points[i] for i in kept]),
+        "times": [round((times[i] - started).total_seconds()) for i in kept] if started else [],
+        "tolerance_m": tolerance_m,
+        "point_count": len(kept),
+        "raw_point_count": len(points),
+        "distance_m": round(distance_m(points), 1),
+        "started_at": started,
+        "ended_at": times[-1] if times else None,
+    }
+
+
+def build_route(product):
+    """Simplify the product's raw fixes into its ProductRoute (created or replaced)."""
+    points, times = raw_track(product.id)
+    track = _track(points, times, settings.ROUTE_SIMPLIFY_TOLERANCE_M)
+    route, _ = ProductRoute.objects.update_or_create(product=product, defaults=track)
+    return route
+
+
+def schedule_build(product):
+    """Queue `build_product_route` for `product` once the surrounding transaction commits."""
+    from .tasks import build_product_route
+
+    def dispatch():
+        try:
+            build_product_route.delay(product.id)
+        except Exception:
+            # the raw fixes are still there; the route can be rebuilt later
+            logger.exception("Could not dispatch route build for product %s", product.id)
+
+    transaction.on_commit(dispatch)
+
+
+def route_payload(product, tolerance_m=None):
+    """
+    The product's track at `tolerance_m` metres (the stored resolution by
+    default), or None if it has no fixes. Coarser tolerances simplify the
+    stored polyline; finer ones get the stored track (rebuild the route with a
+    lower ROUTE_SIMPLIFY_TOLERANCE_M for more detail). A product without a
+    stored route yet shows its latest ROUTE_LIVE_MAX_POINTS fixes.
+    """
+    route = getattr(product, "route", None)
+    if route is None:
+        points, times = raw_track(product.id, limit=settings.ROUTE_LIVE_MAX_POINTS)
+        if not points:
+            return None
+        track = _track(points, times, tolerance_m or settings.ROUTE_SIMPLIFY_TOLERANCE_M)
+    elif tolerance_m is None or tolerance_m <= route.tolerance_m:
+        track = {f: getattr(route, f) for f in ProductRoute.TRACK_FIELDS}
+    else:
+        points = decode_polyline(route.polyline)
+        kept = simplify(points, tolerance_m)
+        track = {f: getattr(route, f) for f in ProductRoute.TRACK_FIELDS}
+        track.update(
+            polyline=encode_polyline([points[i] for i in kept]),
+            times=[route.times[i] for i in kept] if route.times else [],
+            tolerance_m=tolerance_m,
+            point_count=len(kept),
+        )
+    track["raw_available"] = route is None or route.raw_archived_at is None
+    return track
+
+
+# --- retention -----------------------------------------------------------
+
+def archive_raw(route):
+    """Optionally archive, then delete, the raw fixes behind `route`."""
+    with transaction.atomic():
+        route = ProductRoute.objects.select_for_update().select_related("product").get(pk=route.pk)
+        if route.raw_archived_at:
+            return
+        fixes = TransportLocation.objects.filter(product_id=route.product_id)
+        if settings.ROUTE_ARCHIVE_RAW:
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(["lat", "lng", "recorded_at"])
+            for lat, lng, recorded_at in fixes.order_by("recorded_at", "id").values_list("lat", "lng", "recorded_at").iterator(chunk_size=5000):
+                writer.writerow([lat, lng, recorded_at.isoformat()])
+            name = default_storage.save(
+                f"routes/raw/{route.product.uid}.csv.gz", ContentFile(gzip.compress(buf.getvalue().encode()))
+            )
+            route.raw_archive_path = name
+        fixes.delete()
+        route.raw_archived_at = timezone.now()
+        route.save(update_fields=["raw_archive_path", "raw_archived_at", "updated_at"])
+
+
+def routes_due_for_archiving():
+    days = settings.ROUTE_RAW_RETENTION_DAYS
+    if days <= 0:
+        return ProductRoute.objects.none()
+    cutoff = timezone.now() - timedelta(days=days)
+    return ProductRoute.objects.filter(raw_archived_at__isnull=True, created_at__lt=cutoff)
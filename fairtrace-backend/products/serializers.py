@@ -1,5 +1,11 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Product, ProductImage, TransportLocation
+from fairtrace_backend.serializers import FieldSelectionMixin
+from .models import BulkDecisionJob, Product, ProductImage, TransportLocation
+from . import decisions, qr, routes
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
@@ -14,9 +20,38 @@ class TransportLocationSerializer(serializers.ModelSerializer):
         fields = ("id", "lat", "lng", "recorded_at")
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class LocationFixSerializer(serializers.Serializer):
+    """One GPS fix posted to the batch ingestion endpoint (products/ingest.py)."""
+    uid = serializers.UUIDField(required=False)
+    pid = serializers.CharField(required=False, max_length=64)
+    # devices send more precision than the columns keep; store_fixes rounds
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    recorded_at = serializers.DateTimeField(required=False)
+    # the driver a relayed fix came from; set by the socket server, overwritten for JWT callers
+    transporter_id = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate_recorded_at(self, value):
+        # device clocks drift and replayed buffers can be stale; such rows would
+        # sort wrongly on the route or land in an expired partition
+        now = timezone.now()
+        if value > now + timedelta(seconds=settings.LOCATION_FIX_MAX_FUTURE_SECONDS):
+            raise serializers.ValidationError("recorded_at is in the future.")
+        if value < now - timedelta(hours=settings.LOCATION_FIX_MAX_AGE_HOURS):
+            raise serializers.ValidationError("recorded_at is too old.")
+        return value
+
+    def validate(self, data):
+        if not data.get("uid") and not data.get("pid"):
+            raise serializers.ValidationError("Provide uid or pid.")
+        return data
+
+
+class ProductSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, read_only=True)
-    locations = TransportLocationSerializer(many=True, read_only=True)
+    locations = TransportLocationSerializer(many=True, read_only=True, source="latest_locations")
+    route = serializers.SerializerMethodField()
+    qr_code_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
@@ -38,9 +73,11 @@ class ProductSerializer(serializers.ModelSerializer):
             "created_at",
             "approved_at",
             "tx_hash",
-            "qr_code_data",
+            "anchor_status",
+            "qr_code_url",
             "images",
             "locations",
+            "route",
             "farmer",
         )
         read_only_fields = (
@@ -51,11 +88,14 @@ class ProductSerializer(serializers.ModelSerializer):
             "created_at",
             "approved_at",
             "tx_hash",
-            "qr_code_data",
+            "anchor_status",
+            "qr_code_url",
             "images",
             "locations",
+            "route",
             "farmer",
         )
+        expandable_fields = ("images", "locations")  # only with ?expand=
         
         def get_farmer(self, obj):
          return {
@@ -66,10 +106,19 @@ class ProductSerializer(serializers.ModelSerializer):
             "location": getattr(obj.farmer, "location", ""),          # if you have a custom field
         }
 
-class AdminProductSerializer(serializers.ModelSerializer):
+    def get_qr_code_url(self, obj):
+        return qr.qr_url(obj, self.context.get("request"))
+
+    def get_route(self, obj):
+        # the compressed track, stored once the delivery completes
+        return routes.route_payload(obj) if hasattr(obj, "route") else None
+
+class AdminProductSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, read_only=True)
-    locations = TransportLocationSerializer(many=True, read_only=True)
+    locations = TransportLocationSerializer(many=True, read_only=True, source="latest_locations")
+    route = serializers.SerializerMethodField()
     farmer = serializers.SerializerMethodField()
+    qr_code_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
@@ -90,12 +139,15 @@ class AdminProductSerializer(serializers.ModelSerializer):
             "created_at",
             "approved_at",
             "tx_hash",
-            "qr_code_data",
+            "anchor_status",
+            "qr_code_url",
             "images",
             "locations",
+            "route",
             "farmer",
         )
         read_only_fields = fields  # admin should not modify via serializer directly
+        expandable_fields = ("images", "locations")  # only with ?expand=
 
     def get_farmer(self, obj):
    
@@ -110,10 +162,82 @@ class AdminProductSerializer(serializers.ModelSerializer):
         }
      return None
 
+    def get_qr_code_url(self, obj):
+        return qr.qr_url(obj, self.context.get("request"))
+
+    def get_route(self, obj):
+        # the compressed track, stored once the delivery completes
+        return routes.route_payload(obj) if hasattr(obj, "route") else None
+
+
+class ProductSummarySerializer(FieldSelectionMixin, serializers.ModelSerializer):
+    """
+    Lightweight representation for list endpoints: no images, no location
+    history. Use ?fields= to trim further; detail endpoints use the full
+    serializers above.
+    """
+    farmer = serializers.SerializerMethodField()
+    qr_code_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = (
+            "uid",
+            "pid",
+            "title",
+            "variety",
+            "acres",
+            "quantity",
+            "price",
+            "description",
+            "status",
+            "transporter_note",
+            "created_at",
+            "approved_at",
+            "anchor_status",
+            "qr_code_url",
+            "farmer",
+        )
+        read_only_fields = fields
+
+    def get_farmer(self, obj):
+        user = obj.farmer
+        return {
+            "id": user.id,
+            "first_name": user.first_name,
+            "email": user.email,
+            "phone_number": getattr(user, "phone_number", ""),
+            "location": getattr(user, "location", ""),
+        }
+
+    def get_qr_code_url(self, obj):
+        return qr.qr_url(obj, self.context.get("request"))
+
 from rest_framework import serializers
 from .models import Stage
 
 class StageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Stage
-        fields = "__all__"   # or explicitly list the fields if you want more control
\ No newline at end of file
+        fields = "__all__"   # or explicitly list the fields if you want more control
+
+
+class DecisionSerializer(serializers.Serializer):
+    uid = serializers.UUIDField()
+    action = serializers.ChoiceField(choices=list(decisions.ACTIONS))
+    reason = serializers.CharField(required=False, allow_blank=True, default="")
+
+
+class BulkDecisionSerializer(serializers.Serializer):
+    decisions = DecisionSerializer(many=True, allow_empty=False)
+
+    def validate_decisions(self, value):
+        if len(value) > settings.BULK_DECISION_MAX_ITEMS:
+            raise serializers.ValidationError(f"At most {settings.BULK_DECISION_MAX_ITEMS} decisions per request.")
+        return value
+
+
+class BulkDecisionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BulkDecisionJob
+        fields = ["uid", "status", "total", "approved", "declined", "skipped", "notified", "results", "created_at", "finished_at"]
@@ -0,0 +1,42 @@
+import uuid
+
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from onchain.signals import events_indexed
+
+from . import trace_cache
+from .anchoring import BATCH_RECORD_PREFIX
+from .models import Product, ProductRoute, Stage, TransportLocation
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_trace(sender, instance, **kwargs):
+    trace_cache.invalidate(instance.uid)
+
+
+# post_save only: a post_delete receiver would stop Django from fast-deleting
+# these rows, e.g. every TransportLocation of a product when it is deleted.
+@receiver(post_save, sender=Stage)
+@receiver(post_save, sender=TransportLocation)
+@receiver(post_save, sender=ProductRoute)
+def invalidate_related_trace(sender, instance, **kwargs):
+    if instance.product_id is None:
+        return
+    if sender.product.is_cached(instance):
+        trace_cache.invalidate(instance.product.uid)
+    else:
+        trace_cache.invalidate_products([instance.product_id])
+
+
+@receiver(events_indexed)
+def invalidate_indexed_trace(sender, pids, **kwargs):
+    batch_uids = []
+    for pid in pids:
+        if pid.startswith(BATCH_RECORD_PREFIX):
+            try:
+                batch_uids.append(uuid.UUID(pid[len(BATCH_RECORD_PREFIX):]))
+            except ValueError:
+                pass
+    trace_cache.invalidate_products(Product.objects.filter(Q(pid__in=pids) | Q(anchor_batch__uid__in=batch_uids)))
@@ -0,0 +1,291 @@
+# products/tasks.py
+"""
+Celery tasks that anchor approved products on ProductRegistry.
+
+The Product row is the durable record of where each product is in the
+pipeline (`anchor_status`); the broker only carries wake-ups. If a message is
+lost, `requeue_stale_anchors` (run by celery beat) finds the row again.
+
+With ANCHOR_MODE=single every product gets its own registerProduct
+transaction. With ANCHOR_MODE=merkle pending products wait for
+`anchor_pending_batch`, which runs once per ANCHOR_BATCH_WINDOW_SECONDS and
+anchors a single Merkle root for all of them.
+
+Transactions are sent through onchain.signer, so several anchors can be in
+flight at once and a stuck one is fee-bumped by onchain.tasks; the confirm
+tasks follow whichever replacement ends up mined.
+"""
+import json
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from web3 import Web3
+
+from . import anchoring, decisions, merkle, partitions, qr, routes, trace_cache
+from .models import AnchorBatch, BulkDecisionJob, Product
+from .utils import canonical_record_hash
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, acks_late=True, max_retries=None)
+def anchor_product(self, product_id):
+    """Send the registerProduct transaction for one pending product."""
+    with transaction.atomic():
+        product = (
+            Product.objects.select_for_update()
+            .select_related("farmer")
+            .filter(pk=product_id, anchor_status="pending")
+            .first()
+        )
+        if product is None:
+            return
+
+        try:
+            chain_tx = anchoring.submit_registration(product)
+        except Exception as exc:
+            product.anchor_attempts += 1
+            product.anchor_error = str(exc)
+            product.anchor_updated_at = timezone.now()
+            if product.anchor_attempts >= settings.ANCHOR_MAX_ATTEMPTS:
+                product.anchor_status = "failed"
+            product.save(update_fields=["anchor_attempts", "anchor_error", "anchor_status", "anchor_updated_at"])
+            logger.warning("Anchoring %s failed (attempt %s): %s", product.uid, product.anchor_attempts, exc)
+            if product.anchor_status == "failed":
+                return
+            countdown = settings.ANCHOR_RETRY_DELAY_SECONDS * product.anchor_attempts
+            transaction.on_commit(lambda: anchor_product.apply_async((product_id,), countdown=countdown))
+            return
+
+        product.tx_hash = chain_tx.tx_hash
+        product.anchor_tx = chain_tx
+        product.anchor_status = "submitted"
+        product.anchor_attempts += 1
+        product.anchor_error = None
+        product.anchor_updated_at = timezone.now()
+        product.save(update_fields=[
+            "tx_hash", "anchor_tx", "anchor_status", "anchor_attempts", "anchor_error", "anchor_updated_at",
+        ])
+
+    logger.info("Anchor tx for %s sent: %s (nonce %s)", product.uid, chain_tx.tx_hash, chain_tx.nonce)
+    confirm_anchor.apply_async((product_id,), countdown=settings.ANCHOR_RECEIPT_POLL_SECONDS)
+
+
+@shared_task(bind=True, acks_late=True, max_retries=None)
+def confirm_anchor(self, product_id):
+    """Poll for the receipt of a submitted anchor transaction."""
+    product = Product.objects.select_related("anchor_tx").filter(pk=product_id, anchor_status="submitted").first()
+    if product is None:
+        return
+
+    chain_tx = product.anchor_tx
+    receipt = anchoring.fetch_receipt(chain_tx or product.tx_hash)
+    if receipt is None:
+        # A fee bump restarts the clock: the replacement gets the full timeout.
+        last_sent = max(product.anchor_updated_at, chain_tx.updated_at) if chain_tx else product.anchor_updated_at
+        waited = timezone.now() - last_sent
+        if waited > timedelta(seconds=settings.ANCHOR_RECEIPT_TIMEOUT_SECONDS):
+            Product.objects.filter(pk=product_id, anchor_status="submitted").update(
+                anchor_status="failed",
+                anchor_error=f"No receipt for {product.tx_hash} after {waited}",
+                anchor_updated_at=timezone.now(),
+            )
+            trace_cache.invalidate(product.uid)
+            return
+        raise self.retry(countdown=settings.ANCHOR_RECEIPT_POLL_SECONDS)
+
+    if receipt.status == 1:
+        updates = {"anchor_status": "confirmed", "anchor_error": None}
+    else:
+        updates = {"anchor_status": "failed", "anchor_error": f"Transaction reverted in block {receipt.blockNumber}"}
+    Product.objects.filter(pk=product_id, anchor_status="submitted").update(
+        tx_hash=Web3.to_hex(receipt.transactionHash),
+        anchor_block=receipt.blockNumber,
+        anchor_updated_at=timezone.now(),
+        **updates,
+    )
+    trace_cache.invalidate(product.uid)
+    logger.info("Anchor tx for %s %s in block %s", product.uid, updates["anchor_status"], receipt.blockNumber)
+
+
+@shared_task(acks_late=True)
+def anchor_pending_batch():
+    """Build a Merkle tree over every pending product and anchor its root."""
+    if settings.ANCHOR_MODE != "merkle":
+        return
+
+    with transaction.atomic():
+        products = list(
+            Product.objects.select_for_update(skip_locked=True)
+            .filter(anchor_status="pending", pid__isnull=False)
+            .order_by("id")[:settings.ANCHOR_BATCH_MAX_SIZE]
+        )
+        if not products:
+            return
+
+        leaves = [canonical_record_hash(p) for p in products]
+        levels = merkle.build_levels(leaves)
+        batch = AnchorBatch.objects.create(root=merkle.merkle_root(levels), leaf_count=len(products))
+
+        try:
+            chain_tx = anchoring.submit_batch_root(batch)
+        except Exception as exc:
+            # Nothing was written yet; the products stay pending for the next window.
+            logger.warning("Anchoring batch of %s products failed: %s", len(products), exc)
+            transaction.set_rollback(True)
+            return
+
+        now = timezone.now()
+        tx_hash = chain_tx.tx_hash
+        batch.tx_hash = tx_hash
+        batch.chain_tx = chain_tx
+        batch.status = "submitted"
+        batch.save(update_fields=["tx_hash", "chain_tx", "status", "updated_at"])
+
+        for index, (product, leaf) in enumerate(zip(products, leaves)):
+            product.anchor_batch = batch
+            product.proof = json.dumps(merkle.merkle_proof(levels, index))
+            product.public_signals = {
+                "scheme": merkle.SCHEME,
+                "leaf": leaf,
+                "root": batch.root,
+                "batch": str(batch.uid),
+                "index": index,
+            }
+            product.tx_hash = tx_hash
+            product.anchor_status = "submitted"
+            product.anchor_attempts += 1
+            product.anchor_error = None
+            product.anchor_updated_at = now
+        Product.objects.bulk_update(products, [
+            "anchor_batch", "proof", "public_signals", "tx_hash",
+            "anchor_status", "anchor_attempts", "anchor_error", "anchor_updated_at",
+        ])
+        trace_cache.invalidate(*(p.uid for p in products))
+
+    logger.info("Anchored batch %s (%s products): %s", batch.uid, batch.leaf_count, tx_hash)
+    confirm_batch.apply_async((batch.id,), countdown=settings.ANCHOR_RECEIPT_POLL_SECONDS)
+
+
+@shared_task(bind=True, acks_late=True, max_retries=None)
+def confirm_batch(self, batch_id):
+    """Poll for the receipt of a batch root and settle all of its products."""
+    batch = AnchorBatch.objects.select_related("chain_tx").filter(pk=batch_id, status="submitted").first()
+    if batch is None:
+        return
+
+    chain_tx = batch.chain_tx
+    receipt = anchoring.fetch_receipt(chain_tx or batch.tx_hash)
+    if receipt is None:
+        last_sent = max(batch.updated_at, chain_tx.updated_at) if chain_tx else batch.updated_at
+        waited = timezone.now() - last_sent
+        if waited > timedelta(seconds=settings.ANCHOR_RECEIPT_TIMEOUT_SECONDS):
+            error = f"No receipt for {batch.tx_hash} after {waited}"
+            AnchorBatch.objects.filter(pk=batch_id).update(status="failed", error=error, updated_at=timezone.now())
+            batch.products.filter(anchor_status="submitted").update(
+                anchor_status="failed", anchor_error=error, anchor_updated_at=timezone.now()
+            )
+            trace_cache.invalidate_products(batch.products.all())
+            return
+        raise self.retry(countdown=settings.ANCHOR_RECEIPT_POLL_SECONDS)
+
+    if receipt.status == 1:
+        new_status, error = "confirmed", None
+    else:
+        new_status, error = "failed", f"Transaction reverted in block {receipt.blockNumber}"
+    tx_hash = Web3.to_hex(receipt.transactionHash)
+    with transaction.atomic():
+        AnchorBatch.objects.filter(pk=batch_id).update(
+            status=new_status, error=error, tx_hash=tx_hash, block_number=receipt.blockNumber, updated_at=timezone.now()
+        )
+        batch.products.filter(anchor_status="submitted").update(
+            tx_hash=tx_hash,
+            anchor_status=new_status,
+            anchor_error=error,
+            anchor_block=receipt.blockNumber,
+            anchor_updated_at=timezone.now(),
+        )
+        trace_cache.invalidate_products(batch.products.all())
+    logger.info("Batch %s %s in block %s", batch.uid, new_status, receipt.blockNumber)
+
+
+@shared_task
+def requeue_stale_anchors():
+    """
+    Re-dispatch products whose queue message went missing (worker crash,
+    broker restart). Anything that has not moved for a while gets a new task.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.ANCHOR_STALE_AFTER_SECONDS)
+
+    # In merkle mode pending rows are simply waiting for the next batch window.
+    if settings.ANCHOR_MODE == "single":
+        pending = Product.objects.filter(anchor_status="pending", anchor_updated_at__lt=cutoff)
+        for product_id in pending.values_list("id", flat=True):
+            anchor_product.delay(product_id)
+
+    submitted = Product.objects.filter(
+        anchor_status="submitted", anchor_batch__isnull=True, anchor_updated_at__lt=cutoff
+    )
+    for product_id in submitted.values_list("id", flat=True):
+        confirm_anchor.delay(product_id)
+
+    batches = AnchorBatch.objects.filter(status="submitted", updated_at__lt=cutoff)
+    for batch_id in batches.values_list("id", flat=True):
+        confirm_batch.delay(batch_id)
+
+
+@shared_task(acks_late=True)
+def render_product_qr(product_id):
+    """Render and store the QR image a product points at (see products/qr.py)."""
+    product = Product.objects.filter(pk=product_id).exclude(qr_code_path="").first()
+    if product is None:
+        return
+    qr.ensure_stored(product.qr_code_path, qr.trace_url(product))
+
+
+@shared_task(acks_late=True)
+def render_product_qrs(product_ids):
+    """`render_product_qr` for a batch of products (see qr.assign_all)."""
+    for product in Product.objects.filter(pk__in=product_ids).exclude(qr_code_path=""):
+        qr.ensure_stored(product.qr_code_path, qr.trace_url(product))
+
+
+@shared_task(acks_late=True)
+def notify_decisions(job_id):
+    """Queue the emails to the farmers of a BulkDecisionJob (see products/decisions.py)."""
+    job = BulkDecisionJob.objects.filter(pk=job_id, status="applied").first()
+    if job is None:
+        return
+    sent = decisions.notify(job)
+    BulkDecisionJob.objects.filter(pk=job_id).update(status="completed", notified=sent, finished_at=timezone.now())
+    logger.info("Decisions %s: %s of %s farmer emails queued", job.uid, sent, job.approved + job.declined)
+
+
+@shared_task(acks_late=True)
+def build_product_route(product_id):
+    """Simplify a delivered product's GPS fixes into its ProductRoute (see products/routes.py)."""
+    product = Product.objects.filter(pk=product_id).first()
+    if product is None:
+        return
+    route = routes.build_route(product)
+    logger.info("Route for product %s: %s of %s points kept", product.uid, route.point_count, route.raw_point_count)
+
+
+@shared_task
+def archive_raw_locations():
+    """Archive and delete raw fixes of routes older than ROUTE_RAW_RETENTION_DAYS."""
+    for route in routes.routes_due_for_archiving().iterator():
+        routes.archive_raw(route)
+
+
+@shared_task
+def manage_location_partitions():
+    """Create upcoming TransportLocation partitions and expire old ones (see products/partitions.py)."""
+    created = partitions.ensure_partitions()
+    expired = partitions.expire_partitions()
+    if created or expired:
+        logger.info("Location partitions created: %s; expired: %s", created, expired)
@@ -1,3 +1,501 @@
-from django.test import TestCase
+import gzip
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import uuid
+
+from django.core import mail
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from logistics.models import Transporter
+from notifications import outbox
+from notifications.models import OutboundEmail
+from notifications.tasks import send_outbox
+from users.models import User
+from . import decisions, partitions, routes, tasks, trace_cache, verification
+from .models import BulkDecisionJob, PidCounter, Product, ProductImage, Stage, TransportLocation
+from .utils import allocate_pids, assign_pids
+
+
+class ListQueryCountTests(TestCase):
+    """
+    List and detail endpoints must run a fixed number of queries whatever the
+    number of rows, i.e. nothing a serializer touches per row may hit the DB.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_user("admin@example.com", "pw", is_staff=True, is_sacco_admin=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_products(self, count, farmer=None, locations=3):
+        for i in range(count):
+            owner = farmer or User.objects.create_user(f"farmer{User.objects.count()}@example.com", "pw")
+            product = Product.objects.create(farmer=owner, title=f"Coffee {i}", quantity=Decimal("10"))
+            ProductImage.objects.create(product=product, image="product_images/p.jpg")
+            TransportLocation.objects.bulk_create(
+                TransportLocation(product=product, lat=Decimal("-1.28"), lng=Decimal("36.82")) for _ in range(locations)
+            )
+        return product
+
+    def assertConstantQueries(self, url, expected, grow):
+        """`expected` queries for `url` both before and after `grow()` adds rows."""
+        for _ in range(2):
+            with self.assertNumQueries(expected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.data)
+            grow()
+        return response
+
+    def test_sacco_admin_products(self):
+        self.add_products(2)
+        self.assertConstantQueries("/api/sacco_admin/products/", 1, lambda: self.add_products(5))
+
+    def test_farmer_products(self):
+        farmer = User.objects.create_user("farmer@example.com", "pw")
+        self.client.force_authenticate(farmer)
+        self.add_products(2, farmer=farmer)
+        self.assertConstantQueries("/api/products/", 1, lambda: self.add_products(5, farmer=farmer))
+
+    @override_settings(PRODUCT_LOCATIONS_LIMIT=2)
+    def test_product_detail_prefetches_latest_locations(self):
+        product = self.add_products(1, locations=5)
+        response = self.assertConstantQueries(
+            f"/api/sacco_admin/products/{product.uid}/?expand=locations", 3, lambda: self.add_products(1, locations=5)
+        )
+        latest = product.locations.order_by("-recorded_at", "-id").values_list("id", flat=True)[:2]
+        self.assertEqual([loc["id"] for loc in response.data["locations"]], list(latest))
+        self.assertEqual(len(response.data["images"]), 1)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TraceCacheTests(TestCase):
+    """The public trace endpoint is served from the cache until the product changes."""
+
+    def setUp(self):
+        cache.clear()
+        farmer = User.objects.create_user("farmer@example.com", "pw")
+        self.product = Product.objects.create(farmer=farmer, title="Coffee", status="in_transit")
+        self.url = f"/api/trace/{self.product.uid}/"
+
+    def get(self, **headers):
+        return self.client.get(self.url, HTTP_HOST="localhost", **headers)
+
+    def test_repeat_scans_skip_the_database(self):
+        first = self.get()
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first["ETag"] and first["Last-Modified"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().status_code, 200)
+            self.assertEqual(self.get(HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+            self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code, 304)
+
+    def test_changes_invalidate(self):
+        etag = self.get()["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Stage.objects.create(product=self.product, name="Packed")
+        with self.assertNumQueries(2):  # rebuilt: the product and its raw fixes for the route
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)  # same content, same ETag
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TransportLocation.objects.create(product=self.product, lat=Decimal("-1.28"), lng=Decimal("36.82"))
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["route"]["raw_point_count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.product.pk).update(status="pending")
+            trace_cache.invalidate(self.product.uid)
+        self.assertEqual(self.get().status_code, 404)
+
+    def test_verify_reads_the_chain_once_per_block(self):
+        Product.objects.filter(pk=self.product.pk).update(pid="FT-1", anchor_status="confirmed")
+        self.product.refresh_from_db()
+        record = ["FT-1", "Coffee", "", 0, verification.canonical_record_hash(self.product), ""]
+        w3 = mock.Mock()
+        w3.eth.block_number = 7
+        with mock.patch.object(verification, "get_w3", return_value=w3), \
+                mock.patch.object(verification, "get_contract") as get_contract:
+            get_product = get_contract.return_value.functions.getProduct
+            get_product.return_value.call.return_value = record
+            for _ in range(3):
+                response = self.client.get(self.url, {"verify": "1"}, HTTP_HOST="localhost")
+                self.assertEqual(response.json()["verification"]["verified"], True)
+                self.assertEqual(response.json()["verification"]["block_number"], 7)
+            get_product.assert_called_once_with("FT-1")
+            get_product.return_value.call.assert_called_once_with(block_identifier=7)
+
+            record[4] = "0xtampered"
+            cache.delete(verification.BLOCK_KEY)
+            w3.eth.block_number = 8
+            response = self.client.get(self.url, {"verify": "1"}, HTTP_HOST="localhost")
+        self.assertEqual(response.json()["verification"]["verified"], False)
+        self.assertEqual(response.json()["verification"]["block_number"], 8)
+
+
+@override_settings(LOCATION_INGEST_TOKEN="ingest-secret", LOCATION_FIX_MAX_FUTURE_SECONDS=300, LOCATION_FIX_MAX_AGE_HOURS=72)
+class LocationBatchTests(TestCase):
+    def setUp(self):
+        self.driver = User.objects.create_user("driver@example.com", "pw")
+        self.transporter = transporter = Transporter.objects.create(user=self.driver, phone="0711", vehicle="Truck", license_plate="KAA 1")
+        other = Transporter.objects.create(
+            user=User.objects.create_user("other@example.com", "pw"), phone="0722", vehicle="Van", license_plate="KBB 2"
+        )
+        farmer = User.objects.create_user("farmer@example.com", "pw")
+        self.mine, self.theirs, self.waiting = (
+            Product.objects.create(farmer=farmer, title=title, quantity=Decimal("10"), transporter=owner, status=status)
+            for title, owner, status in (
+                ("Coffee", transporter, "in_transit"), ("Tea", other, "in_transit"), ("Maize", transporter, "approved")
+            )
+        )
+        self.client = APIClient()
+
+    def post(self, *fixes, **headers):
+        return self.client.post("/api/locations/batch/", list(fixes), format="json", headers=headers)
+
+    def fix(self, product, **fields):
+        return {"uid": str(product.uid), "lat": -1.28, "lng": 36.82, **fields}
+
+    def test_driver_reports_only_their_own_products_in_transit(self):
+        self.client.force_authenticate(self.driver)
+        # a transporter_id in the body cannot widen the caller's scope
+        response = self.post(
+            self.fix(self.mine), self.fix(self.theirs, transporter_id=self.theirs.transporter_id), self.fix(self.waiting)
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["stored"], response.data["skipped"]), (1, 2))
+        self.assertEqual(list(TransportLocation.objects.values_list("product", flat=True)), [self.mine.id])
+
+    def test_only_transporters_report_with_a_jwt(self):
+        self.client.force_authenticate(User.objects.create_user("someone@example.com", "pw"))
+        self.assertEqual(self.post(self.fix(self.mine)).status_code, 403)
+
+    def test_relayed_driver_fixes_are_scoped_like_jwt_ones(self):
+        response = self.post(
+            self.fix(self.mine, transporter_id=self.transporter.id),
+            self.fix(self.theirs, transporter_id=self.transporter.id),
+            self.fix(self.mine, transporter_id=None),
+            X_Ingest_Token="ingest-secret",
+        )
+        self.assertEqual((response.data["stored"], response.data["skipped"]), (1, 2))
+
+    def test_trusted_sources_report_any_product(self):
+        response = self.post(self.fix(self.mine), self.fix(self.waiting), X_Ingest_Token="ingest-secret")
+        self.assertEqual((response.data["stored"], response.data["skipped"]), (2, 0))
+
+    def test_rejects_fixes_recorded_in_the_future_or_long_ago(self):
+        self.client.force_authenticate(self.driver)
+        now = timezone.now()
+        response = self.post(
+            self.fix(self.mine, recorded_at=(now - timedelta(hours=1)).isoformat()),
+            self.fix(self.mine, recorded_at=(now + timedelta(hours=1)).isoformat()),
+            self.fix(self.mine, recorded_at=(now - timedelta(days=30)).isoformat()),
+        )
+        self.assertEqual((response.data["stored"], response.data["invalid"]), (1, 2))
+
+
+class PolylineTests(SimpleTestCase):
+    def test_round_trips_googles_example(self):
+        points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+        encoded = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+        self.assertEqual(routes.encode_polyline(points), encoded)
+        self.assertEqual(routes.decode_polyline(encoded), points)
+
+    def test_simplify_keeps_the_ends_and_drops_collinear_points(self):
+        line = [(-1.28 + i * 0.001, 36.82) for i in range(5)]
+        self.assertEqual(routes.simplify(line, 1), [0, 4])
+        detour = line[:2] + [(-1.278, 36.83)] + line[3:]  # about 1.1 km east
+        self.assertEqual(routes.simplify(detour, 200), [0, 2, 4])
+        self.assertEqual(routes.simplify(line[:2], 1), [0, 1])
+
+
+@override_settings(ROUTE_SIMPLIFY_TOLERANCE_M=10.0, ROUTE_MAX_TOLERANCE_M=500.0, ROUTE_ARCHIVE_RAW=True)
+class ProductRouteTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        farmer = User.objects.create_user("farmer@example.com", "pw")
+        self.product = Product.objects.create(farmer=farmer, title="Coffee", quantity=Decimal("10"), status="approved")
+        self.started = timezone.now() - timedelta(hours=1)
+        # 21 fixes a minute apart heading north, bending ~55 m east and back, with a ~5 m zigzag
+        TransportLocation.objects.bulk_create(
+            TransportLocation(
+                product=self.product,
+                lat=Decimal(f"{-1.28 + i * 0.001:.6f}"),
+                lng=Decimal(f"{36.82 + 0.0005 * (10 - abs(10 - i)) / 10 + (0.00005 if i % 2 else 0):.6f}"),
+                recorded_at=self.started + timedelta(minutes=i),
+            )
+            for i in range(21)
+        )
+        self.client = APIClient()
+
+    def get(self, **params):
+        return self.client.get(f"/api/trace/{self.product.uid}/route/", params)
+
+    def test_in_transit_route_reads_only_the_latest_fixes(self):
+        with override_settings(ROUTE_LIVE_MAX_POINTS=5):
+            data = self.get().data
+        self.assertEqual((data["raw_point_count"], data["point_count"], data["times"]), (5, 2, [0, 240]))
+        self.assertEqual(data["started_at"], self.started + timedelta(minutes=16))
+        self.assertTrue(data["raw_available"])
+
+    def test_tolerances_of_a_built_route(self):
+        routes.build_route(self.product)
+        stored = self.get().data
+        self.assertEqual((stored["tolerance_m"], stored["point_count"], stored["raw_point_count"]), (10.0, 4, 21))
+        self.assertEqual(stored["times"], [0, 540, 660, 1200])
+        self.assertEqual(self.get(tolerance="10").data["polyline"], stored["polyline"])
+
+        coarser = self.get(tolerance="100").data  # from the stored polyline
+        self.assertEqual((coarser["tolerance_m"], coarser["point_count"], coarser["times"]), (100.0, 2, [0, 1200]))
+
+        # finer tolerances get the stored track instead of re-reading every raw fix
+        with self.assertNumQueries(1):
+            finer = self.get(tolerance="1").data
+        self.assertEqual((finer["tolerance_m"], finer["polyline"]), (10.0, stored["polyline"]))
+        self.assertTrue(finer["raw_available"])
+
+    def test_archiving_deletes_raw_fixes(self):
+        route = routes.build_route(self.product)
+        routes.archive_raw(route)
+        route.refresh_from_db()
+        self.assertIsNotNone(route.raw_archived_at)
+        self.assertFalse(TransportLocation.objects.filter(product=self.product).exists())
+        with default_storage.open(route.raw_archive_path) as archive:
+            rows = gzip.decompress(archive.read()).decode().splitlines()
+        self.assertEqual((rows[0], len(rows)), ("lat,lng,recorded_at", 22))
+
+        finer = self.get(tolerance="1").data
+        self.assertEqual((finer["tolerance_m"], finer["point_count"], finer["raw_available"]), (10.0, 4, False))
+        self.assertEqual(self.get(tolerance="100").data["point_count"], 2)
+
+    def test_tolerance_is_parsed_and_clamped(self):
+        self.assertEqual(self.get(tolerance="far").status_code, 400)
+        self.assertEqual(self.get(tolerance="0").data["tolerance_m"], 1.0)
+        self.assertEqual(self.get(tolerance="1e9").data["tolerance_m"], 500.0)
+
+    def test_missing_routes_are_404(self):
+        TransportLocation.objects.all().delete()
+        self.assertEqual(self.get().status_code, 404)
+        Product.objects.filter(pk=self.product.pk).update(status="pending")
+        self.assertEqual(self.get().status_code, 404)
+        self.assertEqual(self.client.get(f"/api/trace/{uuid.uuid4()}/route/").status_code, 404)
+
+
+@skipUnless(connection.vendor == "postgresql", "TransportLocation is only partitioned on PostgreSQL")
+class LocationPartitionTests(TestCase):
+    """Runs against the partitioned table migration 0013 built in the test database."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(override_settings(MEDIA_ROOT=media, LOCATION_PARTITION_ARCHIVE=True))
+        farmer = User.objects.create_user("farmer@example.com", "pw")
+        self.product = Product.objects.create(farmer=farmer, title="Coffee", quantity=Decimal("10"))
+        self.this_month = partitions.month_start(timezone.now())
+
+    def fix_in(self, month):
+        start, _ = partitions.bounds(month)
+        TransportLocation.objects.create(
+            product=self.product, lat=Decimal("-1.28"), lng=Decimal("36.82"), recorded_at=start + timedelta(days=1)
+        )
+        # fire the deferred FK check now, as a commit would; a table with pending checks cannot be dropped
+        connection.check_constraints()
+
+    def count(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {table}")
+            return cursor.fetchone()[0]
+
+    def table_exists(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [name])
+            return cursor.fetchone()[0] is not None
+
+    def attached(self):
+        with connection.cursor() as cursor:
+            return partitions.monthly_partitions(cursor)
+
+    def test_ensure_creates_coming_months_and_empties_the_default_partition(self):
+        later = partitions.add_months(self.this_month, 5)  # past the months the migration created
+        self.fix_in(later)
+        self.assertEqual(self.count(partitions.DEFAULT_PARTITION), 1)
+
+        created = partitions.ensure_partitions(ahead=6)
+        self.assertEqual(created, [partitions.partition_name(partitions.add_months(self.this_month, n)) for n in (4, 5, 6)])
+        self.assertEqual(self.count(partitions.DEFAULT_PARTITION), 0)
+        self.assertEqual(self.count(partitions.partition_name(later)), 1)
+        self.assertEqual(TransportLocation.objects.count(), 1)  # still reachable through the parent
+        self.assertEqual(partitions.ensure_partitions(ahead=6), [])
+
+    def test_expire_detaches_archives_and_drops_old_months(self):
+        old, older = (partitions.add_months(self.this_month, n) for n in (-3, -4))
+        with connection.cursor() as cursor, transaction.atomic():
+            for month in (old, older):
+                partitions.create_partition(cursor, month)
+        self.fix_in(old)
+        self.fix_in(self.this_month)
+
+        self.assertEqual(partitions.expire_partitions(retain_months=3, dry_run=True), [partitions.partition_name(older)])
+        self.assertTrue(self.table_exists(partitions.partition_name(older)))
+
+        self.assertEqual(partitions.expire_partitions(retain_months=3, drop=False), [partitions.partition_name(older)])
+        self.assertTrue(self.table_exists(partitions.partition_name(older)))  # detached, kept
+        self.assertNotIn(older, self.attached())
+
+        self.assertEqual(partitions.expire_partitions(retain_months=2), [partitions.partition_name(old)])
+        self.assertFalse(self.table_exists(partitions.partition_name(old)))
+        self.assertEqual(TransportLocation.objects.count(), 1)
+        with default_storage.open(f"locations/partitions/{partitions.partition_name(old)}.csv.gz") as archive:
+            rows = gzip.decompress(archive.read()).decode().splitlines()
+        self.assertEqual((rows[0], len(rows)), (partitions.COLUMNS.replace(" ", ""), 2))
+
+    def test_command(self):
+        out = StringIO()
+        call_command("manage_location_partitions", "--ahead", "4", "--dry-run", stdout=out)
+        name = partitions.partition_name(partitions.add_months(self.this_month, 4))
+        self.assertIn(f"Would create {name}", out.getvalue())
+        self.assertNotIn(partitions.add_months(self.this_month, 4), self.attached())
+
+        call_command("manage_location_partitions", "--ahead", "4", stdout=StringIO())
+        self.assertIn(partitions.add_months(self.this_month, 4), self.attached())
+
+
+class PidAllocationTests(TestCase):
+    def setUp(self):
+        self.farmer = User.objects.create_user("farmer@example.com", "pw")
+        self.other = User.objects.create_user("other@example.com", "pw")
+
+    def test_counts_per_farmer_and_year(self):
+        self.assertEqual(allocate_pids(self.farmer.id, year=2025), [f"FT-2025-{self.farmer.id}-0001"])
+        with self.assertNumQueries(4):  # savepoint, UPDATE, SELECT, release; however many are reserved
+            pids = allocate_pids(self.farmer.id, 3, year=2025)
+        self.assertEqual(pids, [f"FT-2025-{self.farmer.id}-{seq:04d}" for seq in (2, 3, 4)])
+        self.assertEqual(allocate_pids(self.other.id, year=2025), [f"FT-2025-{self.other.id}-0001"])
+        self.assertEqual(allocate_pids(self.farmer.id, year=2026), [f"FT-2026-{self.farmer.id}-0001"])
+
+    def test_assign_pids_skips_products_that_have_one(self):
+        PidCounter.objects.create(farmer=self.farmer, year=2025, last_seq=41)
+        products = [
+            Product.objects.create(farmer=farmer, title="Coffee", quantity=Decimal("1"), pid=pid)
+            for farmer, pid in ((self.farmer, None), (self.other, None), (self.farmer, "FT-2024-1-0001"), (self.farmer, None))
+        ]
+        assign_pids(products, year=2025)
+        self.assertEqual([p.pid for p in products], [
+            f"FT-2025-{self.farmer.id}-0042", f"FT-2025-{self.other.id}-0001", "FT-2024-1-0001", f"FT-2025-{self.farmer.id}-0043",
+        ])
+
+
+@override_settings(ANCHOR_MODE="single")
+class BulkDecisionTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user("admin@example.com", "pw", is_sacco_admin=True)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+        self.farmers = [User.objects.create_user(f"farmer{i}@example.com", "pw") for i in range(2)]
+        for name, fake in (("notify_decisions", tasks.notify_decisions), ("render_product_qrs", None), ("anchor_product", None)):
+            patcher = mock.patch.object(getattr(tasks, name), "delay", side_effect=fake)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+        self.send_outbox = self.enterContext(mock.patch.object(send_outbox, "delay"))
+
+    def pending(self, count):
+        return [
+            Product.objects.create(farmer=self.farmers[i % 2], title=f"Coffee {i}", quantity=Decimal("10"))
+            for i in range(count)
+        ]
+
+    def decide(self, decisions):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/sacco_admin/products/decisions/", {"decisions": decisions}, format="json")
+        self.assertEqual(response.status_code, 202, response.data)
+        return response
+
+    def test_applies_every_decision_in_one_batch(self):
+        products = self.pending(4)
+        missing = str(uuid.uuid4())
+        response = self.decide([
+            {"uid": str(products[0].uid), "action": "approve"},
+            {"uid": str(products[1].uid), "action": "approve"},
+            {"uid": str(products[2].uid), "action": "approve"},
+            {"uid": str(products[3].uid), "action": "decline", "reason": "Moisture too high"},
+            {"uid": str(products[0].uid), "action": "decline"},
+            {"uid": missing, "action": "approve"},
+        ])
+
+        self.assertEqual([r["result"] for r in response.data["results"]],
+                         ["approved", "approved", "approved", "declined", "duplicate", "not_found"])
+        for product in products:
+            product.refresh_from_db()
+        self.assertEqual([p.status for p in products], ["approved", "approved", "approved", "declined"])
+        self.assertEqual(products[3].admin_reason, "Moisture too high")
+        self.assertEqual(
+            [p.pid for p in products[:3]],
+            [r["pid"] for r in response.data["results"][:3]],
+        )
+        self.assertEqual(len({p.pid for p in products[:3]}), 3)
+        self.assertTrue(all(p.qr_code_path and p.anchor_status == "pending" for p in products[:3]))
+
+        self.render_product_qrs.assert_called_once_with([p.id for p in products[:3]])
+        self.assertEqual(self.anchor_product.call_count, 3)
+        job = BulkDecisionJob.objects.get(uid=response.data["uid"])
+        self.assertEqual((job.status, job.approved, job.declined, job.skipped, job.notified), ("completed", 3, 1, 2, 4))
+        self.send_outbox.assert_called_once_with()
+        self.assertEqual(outbox.deliver(), 4)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["farmer0@example.com"] * 2 + ["farmer1@example.com"] * 2)
+
+    def test_only_pending_and_declined_products_are_reviewed(self):
+        pending, declined, approved, delivered = self.pending(4)
+        Product.objects.filter(pk=declined.pk).update(status="declined")
+        Product.objects.filter(pk=approved.pk).update(status="approved")
+        Product.objects.filter(pk=delivered.pk).update(status="delivered")
+        response = self.decide([
+            {"uid": str(pending.uid), "action": "decline", "reason": "Wrong variety"},
+            {"uid": str(declined.uid), "action": "approve"},
+            {"uid": str(approved.uid), "action": "decline"},
+            {"uid": str(delivered.uid), "action": "approve"},
+        ])
+        self.assertEqual(
+            [(r["result"], r.get("status")) for r in response.data["results"]],
+            [("declined", None), ("approved", None), ("invalid_status", "approved"), ("invalid_status", "delivered")],
+        )
+        self.assertEqual(
+            list(Product.objects.order_by("id").values_list("status", flat=True)),
+            ["declined", "approved", "approved", "delivered"],
+        )
+        self.assertEqual((response.data["approved"], response.data["declined"], response.data["skipped"]), (1, 1, 2))
+
+    def test_emails_report_the_jobs_decision(self):
+        product = self.pending(1)[0]
+        job = BulkDecisionJob.objects.get(uid=self.decide(
+            [{"uid": str(product.uid), "action": "decline", "reason": "Moisture too high"}]
+        ).data["uid"])
+        OutboundEmail.objects.all().delete()
+        Product.objects.filter(pk=product.pk).update(status="approved", admin_reason="")  # decided again since
+
+        self.assertEqual(decisions.notify(job), 1)
+        email = OutboundEmail.objects.get()
+        self.assertIn("rejected", email.subject)
+        self.assertIn("Reason: Moisture too high", email.body)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        for farmer in self.farmers:
+            PidCounter.objects.create(farmer=farmer, year=timezone.now().year)
+        for size in (2, 8):
+            products = self.pending(size)
+            with self.assertNumQueries(19):  # 4 per farmer for PIDs, none per product
+                self.decide([{"uid": str(p.uid), "action": "approve"} for p in products])
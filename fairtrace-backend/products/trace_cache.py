@@ -0,0 +1,88 @@
+# products/trace_cache.py
+"""
+Cache for the public trace endpoint (`TraceProductAPIView`), which every
+consumer QR scan hits.
+
+The whole trace payload of a product is kept under `trace:<uid>` together
+with its ETag (a hash of the payload), the time it was built, which is
+served as Last-Modified, and the registry record that should vouch for it
+(products/verification.py). A scan is then one cache read and no queries,
+and a repeat scan from the same phone is a 304.
+
+Entries are dropped when something the payload is built from changes:
+products/signals.py handles `post_save` of Product, Stage, TransportLocation
+and ProductRoute, and the bulk paths that send no signals (`bulk_create` in
+products/ingest.py, `update()`/`bulk_update` in products/tasks.py) call
+`invalidate_products` themselves. Deletion happens once the surrounding
+transaction commits, so a scan cannot cache a state that is rolled back.
+TRACE_CACHE_TIMEOUT bounds anything else, e.g. a farmer renaming
+themselves.
+
+Cache errors are logged and the endpoint falls back to the database, so a
+Redis outage slows scans down instead of breaking them.
+"""
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(uid):
+    return f"trace:{uid}"
+
+
+def get(uid):
+    """The cached entry for `uid` ({"data", "etag", "last_modified", "anchor"}), or None."""
+    try:
+        return cache.get(cache_key(uid))
+    except Exception:
+        logger.warning("Trace cache read failed for %s", uid, exc_info=True)
+        return None
+
+
+def store(uid, data, anchor=None):
+    """
+    Cache `data` as the trace payload of `uid`, with `anchor` from
+    `verification.anchor_reference`, and return the new entry.
+    """
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()
+    entry = {
+        "data": data,
+        "etag": f'"{hashlib.sha1(body).hexdigest()}"',
+        "last_modified": int(time.time()),
+        "anchor": anchor,
+    }
+    try:
+        cache.set(cache_key(uid), entry, settings.TRACE_CACHE_TIMEOUT)
+    except Exception:
+        logger.warning("Trace cache write failed for %s", uid, exc_info=True)
+    return entry
+
+
+def _delete(keys):
+    try:
+        cache.delete_many(keys)
+    except Exception:
+        # the entries expire after TRACE_CACHE_TIMEOUT at the latest
+        logger.warning("Trace cache invalidation failed for %s", keys, exc_info=True)
+
+
+def invalidate(*uids):
+    """Drop the entries of `uids` once the current transaction commits."""
+    keys = [cache_key(uid) for uid in uids]
+    if keys:
+        transaction.on_commit(lambda: _delete(keys))
+
+
+def invalidate_products(product_ids):
+    """`invalidate` for product ids (or a queryset of products), in one query."""
+    invalidate(*Product.objects.filter(pk__in=product_ids).values_list("uid", flat=True))
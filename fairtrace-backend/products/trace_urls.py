@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import TraceProductAPIView
+from .views import TraceProductAPIView, ProductRouteAPIView
 
 urlpatterns = [
     path('<uuid:uid>/', TraceProductAPIView.as_view(), name='trace-product'),
+    path('<uuid:uid>/route/', ProductRouteAPIView.as_view(), name='product-route'),
 ]
@@ -69,6 +69,7 @@ urlpatterns = [
    # products/urls.py
 from django.urls import path
 from .views import sacco_admin_products, sacco_admin_product_detail, ProductDecisionAPIView
+from .views import BulkDecisionAPIView, BulkDecisionJobAPIView
 
 urlpatterns = [
     # List all products
@@ -79,6 +80,12 @@ urlpatterns = [
 
     # Approve/reject product
     path('sacco_admin/products/<uuid:uid>/decision/', ProductDecisionAPIView.as_view(), name='product-decision'),
+    path('sacco_admin/products/decisions/', BulkDecisionAPIView.as_view(), name='bulk-decision'),
+    path('sacco_admin/decisions/<uuid:uid>/', BulkDecisionJobAPIView.as_view(), name='bulk-decision-job'),
     path('products/<uuid:uid>/update_status/', views.update_status, name='update_status'),
     path('products/<uuid:uid>/allocate/', ProductAllocateAPIView.as_view(), name='product-allocate'),
+
+    # GPS fixes: one at a time, or batched (drivers' apps and the socket server)
+    path('products/<uuid:uid>/locations/', PostLocationAPIView.as_view(), name='post-location'),
+    path('locations/batch/', views.LocationBatchAPIView.as_view(), name='location-batch'),
 ]
@@ -1,12 +1,55 @@
-import datetime, json, hashlib, qrcode, io, base64
-from django.core.files.base import ContentFile
-from .models import Product
+import json, hashlib
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PidCounter, Product
+from . import merkle
+
+
+def allocate_pids(farmer_id, count=1, year=None):
+    """
+    Reserve `count` consecutive PIDs (FT-<year>-<farmer id>-<seq>) for one farmer.
+
+    The farmer's PidCounter row is bumped with an F() increment, which locks
+    it until the surrounding transaction ends: concurrent approvals for the
+    same farmer queue on that row instead of computing the same number, and
+    other farmers are not held up. Two queries, whatever `count` is.
+    """
+    year = year or timezone.now().year
+    counters = PidCounter.objects.filter(farmer_id=farmer_id, year=year)
+    with transaction.atomic():
+        if not counters.update(last_seq=F("last_seq") + count):
+            try:
+                with transaction.atomic():
+                    PidCounter.objects.create(farmer_id=farmer_id, year=year, last_seq=count)
+            except IntegrityError:
+                # a concurrent first allocation for this farmer and year created the row
+                counters.update(last_seq=F("last_seq") + count)
+        last = counters.values_list("last_seq", flat=True).get()
+    return [f"FT-{year}-{farmer_id}-{seq:04d}" for seq in range(last - count + 1, last + 1)]
+
+
+def assign_pids(products, year=None):
+    """
+    Set a new PID on every product in `products` that has none, with one
+    `allocate_pids` call per farmer. Farmers are taken in id order, so
+    concurrent batches lock their counters in the same order.
+    """
+    by_farmer = defaultdict(list)
+    for product in products:
+        if not product.pid:
+            by_farmer[product.farmer_id].append(product)
+    for farmer_id in sorted(by_farmer):
+        for product, pid in zip(by_farmer[farmer_id], allocate_pids(farmer_id, len(by_farmer[farmer_id]), year)):
+            product.pid = pid
+
 
 def generate_pid(product: Product):
-    year = datetime.datetime.now().year
-    seq = Product.objects.filter(farmer=product.farmer, pid__isnull=False).count() + 1
-    pid = f"FT-{year}-{product.farmer.id}-{seq:04d}"
-    return pid
+    """A new PID for `product`, see `allocate_pids`."""
+    return allocate_pids(product.farmer_id)[0]
 
 def canonical_record_hash(product: Product):
     payload = {
@@ -19,26 +62,20 @@ def canonical_record_hash(product: Product):
     s = json.dumps(payload, sort_keys=True).encode()
     return "0x" + hashlib.sha256(s).hexdigest()
 
-def create_qr_data_url(pid: str, base_url="http://localhost:3000/record"):
-    url = f"{base_url}/{pid}"
-    img = qrcode.make(url)
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    b64 = base64.b64encode(buf.getvalue()).decode()
-    return f"data:image/png;base64,{b64}"
-
-
-import json
-import os
-
-def load_abi():
+def merkle_inclusion(product: Product):
     """
-    Load the smart contract ABI from a JSON file.
-    Assumes the ABI is stored in `products/abi/ProductRegistry.json`.
+    Check, without touching the chain, that the product's stored Merkle proof
+    leads from its current record hash to the root of its anchor batch.
+    Returns None for products that were not anchored in a batch.
     """
-    abi_path = os.path.join(os.path.dirname(__file__), 'abi', 'ProductRegistry.json')
-    if not os.path.exists(abi_path):
-        raise FileNotFoundError(f"ABI file not found at {abi_path}")
-    with open(abi_path, 'r') as f:
-        abi = json.load(f)
-    return abi
+    batch = product.anchor_batch
+    if batch is None:
+        return None
+    proof = json.loads(product.proof or "[]")
+    return {
+        "root": batch.root,
+        "included": merkle.verify_proof(canonical_record_hash(product), proof, batch.root),
+        "anchored": batch.status == "confirmed",
+        "batch_tx": batch.tx_hash,
+        "block_number": batch.block_number,
+    }
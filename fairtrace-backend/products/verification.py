@@ -0,0 +1,125 @@
+# products/verification.py
+"""
+Cross-check a product's trace record against ProductRegistry.
+
+A product anchored on its own (ANCHOR_MODE=single) is registered under its
+pid with `canonical_record_hash` as metadataURI. A product anchored in a
+Merkle batch is covered by the batch record (`anchoring.batch_record_id`),
+whose metadataURI is the batch root, plus its stored inclusion proof. See
+products/anchoring.py.
+
+`anchor_reference` captures what the chain should hold while the product row
+is at hand; it is kept in the trace cache entry, so `?verify=1` scans do not
+touch the database either. `verify` reads the record with
+`getProduct(...).call(block_identifier=block)`:
+
+- the current block number is cached for TRACE_VERIFY_BLOCK_TTL seconds;
+- the record read is cached per (record id, block), so a product is read
+  from the node at most once per new block however often it is scanned.
+
+`chain_history` lists the product's contract events from the local mirror
+kept by onchain.indexer, without any RPC.
+"""
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from web3.exceptions import ContractLogicError
+
+from onchain.client import get_contract, get_w3
+from onchain.models import ChainEvent
+
+from . import merkle
+from .anchoring import batch_record_id
+from .utils import canonical_record_hash
+
+logger = logging.getLogger(__name__)
+
+BLOCK_KEY = "chain:block_number"
+NOT_REGISTERED = ""  # cached metadataURI for records the registry does not have
+PRIVATE_EVENT_ARGS = ("farmerEmail",)  # on-chain, but not repeated on the public trace page
+
+
+def anchor_reference(product):
+    """
+    {"record_id", "expected", "included"} describing the registry record that
+    should vouch for `product`, or None if it was never sent to the chain.
+    """
+    batch = product.anchor_batch
+    if batch is not None:
+        return {
+            "record_id": batch_record_id(batch),
+            "expected": batch.root,
+            "included": merkle.verify_proof(canonical_record_hash(product), json.loads(product.proof or "[]"), batch.root),
+        }
+    if product.pid and product.anchor_status in ("submitted", "confirmed"):
+        return {"record_id": product.pid, "expected": canonical_record_hash(product), "included": True}
+    return None
+
+
+def current_block():
+    block = cache.get(BLOCK_KEY)
+    if block is None:
+        block = get_w3().eth.block_number
+        cache.set(BLOCK_KEY, block, settings.TRACE_VERIFY_BLOCK_TTL)
+    return block
+
+
+def onchain_metadata(record_id, block):
+    """metadataURI of `record_id` as of `block` ("" if it is not registered)."""
+    key = f"chain:record:{record_id}:{block}"
+    value = cache.get(key)
+    if value is None:
+        try:
+            record = get_contract("ProductRegistry").functions.getProduct(record_id).call(block_identifier=block)
+            value = record[4]  # ProductRecord.metadataURI
+        except ContractLogicError:
+            value = NOT_REGISTERED  # "Product not found"
+        cache.set(key, value, settings.TRACE_VERIFY_CACHE_TIMEOUT)
+    return value
+
+
+def verify(reference):
+    """
+    Compare `reference` (see `anchor_reference`) with the chain.
+    Returns {"verified", "block_number", "detail"}.
+    """
+    if reference is None:
+        return {"verified": False, "block_number": None, "detail": "Product has not been anchored on-chain"}
+    try:
+        block = current_block()
+        onchain = onchain_metadata(reference["record_id"], block)
+    except Exception:
+        logger.warning("Chain verification failed for %s", reference["record_id"], exc_info=True)
+        return {"verified": False, "block_number": None, "detail": "Chain node unavailable"}
+
+    if onchain == NOT_REGISTERED:
+        detail = f"{reference['record_id']} is not registered on-chain"
+    elif onchain.lower() != reference["expected"].lower():
+        detail = "On-chain record does not match the product record"
+    elif not reference["included"]:
+        detail = "Product is not included in its anchored batch"
+    else:
+        detail = None
+    return {"verified": detail is None, "block_number": block, "detail": detail or "Record matches the chain"}
+
+
+def chain_history(product):
+    """The indexed events of `product` (and of its anchor batch), oldest first."""
+    record_ids = [product.pid] if product.pid else []
+    if product.anchor_batch is not None:
+        record_ids.append(batch_record_id(product.anchor_batch))
+    if not record_ids:
+        return []
+    events = ChainEvent.objects.filter(pid__in=record_ids).order_by("block_number", "log_index")
+    return [
+        {
+            "contract": event.contract,
+            "event": event.event,
+            "block_number": event.block_number,
+            "tx_hash": event.tx_hash,
+            "args": {k: v for k, v in event.args.items() if k not in PRIVATE_EVENT_ARGS},
+        }
+        for event in events
+    ]
@@ -4,11 +4,20 @@ from rest_framework.response import Response
 from rest_framework import viewsets
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from .models import Product, ProductImage, TransportLocation, Stage
-from .serializers import ProductImageSerializer, TransportLocationSerializer, StageSerializer
-from products.serializers import ProductSerializer
-from .utils import generate_pid, create_qr_data_url
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.urls import reverse
+from .models import BulkDecisionJob, Product, ProductImage, TransportLocation, Stage
+from .serializers import ProductImageSerializer, TransportLocationSerializer, StageSerializer, LocationFixSerializer
+from .serializers import BulkDecisionSerializer, BulkDecisionJobSerializer
+from .permissions import HasIngestToken
+from . import decisions, ingest, routes, trace_cache, verification
+from products.serializers import ProductSerializer, ProductSummarySerializer
+from .utils import generate_pid, merkle_inclusion
+from . import qr
 from tasks.anchor import enqueue_anchor  # we'll create a simple task enqueuer
+from fairtrace_backend.pagination import paginated_response
+from users.authentication import transporter_id
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 import logging
 
@@ -17,18 +26,28 @@ class FarmerProductListCreateAPIView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = ProductSerializer
 
+    def get_serializer_class(self):
+        if self.request.method == "GET":
+            return ProductSummarySerializer
+        return ProductSerializer
+
     def get_queryset(self):
-        return Product.objects.filter(farmer=self.request.user).order_by("-created_at")
+        return Product.objects.for_summary().filter(farmer=self.request.user).order_by("-created_at")
 
     def perform_create(self, serializer):
         serializer.save(farmer=self.request.user)
 
 class ProductDetailAPIView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Product.objects.all()
+    queryset = Product.objects.for_detail()
     serializer_class = ProductSerializer
     lookup_field = "uid"
 
+    def get_serializer(self, *args, **kwargs):
+        # Detail page: images by default; the track is served as `route`, raw fixes only with ?expand=locations
+        kwargs.setdefault("expand", ("images",))
+        return super().get_serializer(*args, **kwargs)
+
 class UploadProductImageAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     def post(self, request, uid):
@@ -42,10 +61,10 @@ class UploadProductImageAPIView(APIView):
 # Admin views
 class PendingProductsAPIView(generics.ListAPIView):
     permission_classes = [permissions.IsAdminUser]
-    serializer_class = ProductSerializer
-    queryset = Product.objects.filter(status="pending").order_by("-created_at")
+    serializer_class = ProductSummarySerializer
+    queryset = Product.objects.for_summary().filter(status="pending").order_by("-created_at")
 
-from django.core.mail import send_mail
+from notifications.outbox import queue_email
 from django.conf import settings
 
 class ApproveProductAPIView(APIView):
@@ -60,8 +79,8 @@ class ApproveProductAPIView(APIView):
             # ✅ Update product
             product.status = "approved"
             product.approved_at = timezone.now()
-            product.pid = generate_pid(product)
-            product.qr_code_data = create_qr_data_url(product.pid)  # data:image/png;base64,...
+            product.pid = product.pid or generate_pid(product)
+            qr.assign(product)  # rendered by products.tasks.render_product_qr
             product.admin_reason = reason
             product.save()
 
@@ -69,28 +88,25 @@ class ApproveProductAPIView(APIView):
             enqueue_anchor(product.id)
 
             # ✅ Send approval email
-            try:
-                send_mail(
-                    subject="Your product has been approved ✅",
-                    message=(
-                        f"Dear {product.farmer.full_name},\n\n"
-                        f"Your product '{product.title}' has been approved.\n\n"
-                        f"PID: {product.pid}\n\n"
-                        f"Next steps: Your product is now live on FairTrace.\n"
-                    ),
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[product.farmer.email],
-                    fail_silently=True,
-                )
-            except Exception as e:
-                print("Email error:", e)
+            queue_email(
+                product.farmer.email,
+                "Your product has been approved ✅",
+                (
+                    f"Dear {product.farmer.full_name},\n\n"
+                    f"Your product '{product.title}' has been approved.\n\n"
+                    f"PID: {product.pid}\n\n"
+                    f"Next steps: Your product is now live on FairTrace.\n"
+                ),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                purpose="product-approved",
+            )
 
             # ✅ Response payload
             return Response({
                 "uid": str(product.uid),
                 "status": product.status,
                 "pid": product.pid,
-                "qr_code_data": product.qr_code_data,
+                "qr_code_url": qr.qr_url(product, request),
                 "admin_reason": product.admin_reason,
                 "message": f"Product approved successfully. PID: {product.pid}"
             }, status=200)
@@ -102,22 +118,19 @@ class ApproveProductAPIView(APIView):
             product.save()
 
             # ❌ Send rejection email
-            try:
-                send_mail(
-                    subject="Your product was rejected ❌",
-                    message=(
-                        f"Dear {product.farmer.full_name},\n\n"
-                        f"Unfortunately, your product '{product.title}' was rejected.\n\n"
-                        f"Reason: {reason}\n\n"
-                        f"You may correct the issue and re-submit.\n\n"
-                        f"Regards,\nFairTrace Team"
-                    ),
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[product.farmer.email],
-                    fail_silently=True,
-                )
-            except Exception as e:
-                print("Email error:", e)
+            queue_email(
+                product.farmer.email,
+                "Your product was rejected ❌",
+                (
+                    f"Dear {product.farmer.full_name},\n\n"
+                    f"Unfortunately, your product '{product.title}' was rejected.\n\n"
+                    f"Reason: {reason}\n\n"
+                    f"You may correct the issue and re-submit.\n\n"
+                    f"Regards,\nFairTrace Team"
+                ),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                purpose="product-declined",
+            )
 
             return Response({
                 "uid": str(product.uid),
@@ -138,6 +151,48 @@ class PostLocationAPIView(APIView):
         tl = TransportLocation.objects.create(product=product, lat=lat, lng=lng)
         # optional: notify via socket.io (we will)
         return Response(TransportLocationSerializer(tl).data, status=201)
+
+
+class LocationBatchAPIView(APIView):
+    """
+    POST many GPS fixes at once, as a list or {"fixes": [...]}:
+    [{"pid" or "uid": ..., "lat": ..., "lng": ..., "recorded_at": optional ISO time}, ...]
+    Used by drivers' apps (with their JWT) and by the socket server (with
+    X-Ingest-Token), which relays drivers' fixes with their "transporter_id".
+    Either way a driver's fix is only stored for a product assigned to them
+    and in transit; only trusted server-side sources may post fixes without
+    a transporter_id. Invalid fixes (including recorded_at in the future or
+    older than LOCATION_FIX_MAX_AGE_HOURS) are dropped rather than failing
+    the whole batch.
+    """
+    permission_classes = [HasIngestToken | permissions.IsAuthenticated]
+
+    def post(self, request):
+        fixes = request.data.get("fixes") if isinstance(request.data, dict) else request.data
+        if not isinstance(fixes, list) or not fixes:
+            return Response({"detail": "A non-empty list of fixes is required."}, status=400)
+        if len(fixes) > settings.LOCATION_INGEST_MAX_BATCH:
+            return Response(
+                {"detail": f"At most {settings.LOCATION_INGEST_MAX_BATCH} fixes per request."}, status=400
+            )
+        driver = None
+        if not HasIngestToken().has_permission(request, self):
+            driver = transporter_id(request.user)
+            if driver is None:
+                return Response({"detail": "Only transporters can report locations."}, status=403)
+
+        valid = []
+        for fix in fixes:
+            serializer = LocationFixSerializer(data=fix)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+                if driver is not None:
+                    valid[-1]["transporter_id"] = driver
+        stored, skipped = ingest.store_fixes(valid)
+        return Response(
+            {"stored": stored, "skipped": skipped, "invalid": len(fixes) - len(valid)},
+            status=status.HTTP_201_CREATED,
+        )
     
     
 # views.py
@@ -146,10 +201,6 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .models import Product
 from .serializers import AdminProductSerializer
-import uuid
-import qrcode
-import io
-from base64 import b64encode
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -158,17 +209,11 @@ def approve_product(request, product_uid):
         product = Product.objects.get(uid=product_uid)
         if request.data.get("action") == "approve":
             # Generate PID
-            product.pid = str(uuid.uuid4())
+            product.pid = product.pid or generate_pid(product)
             product.status = "Approved"
             
-            # Generate QR code with PID
-            qr = qrcode.QRCode(version=1, box_size=10, border=4)
-            qr.add_data(product.pid)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = io.BytesIO()
-            img.save(buffer, format="PNG")
-            product.qr_code_data = "data:image/png;base64," + b64encode(buffer.getvalue()).decode()
+            # QR code pointing at the trace page (rendered off the request path)
+            qr.assign(product)
             
             # TODO: Store approved product info on blockchain
             # store_on_blockchain(product)
@@ -190,23 +235,20 @@ def approve_product(request, product_uid):
 def all_products(request):
     if not request.user.is_sacco_admin:
         return Response({"detail": "Not authorized"}, status=403)
-    products = Product.objects.all()
-    serializer = AdminProductSerializer(products, many=True)
-    return Response(serializer.data)
+    products = Product.objects.for_summary()
+    return paginated_response(request, products, ProductSummarySerializer)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def sacco_admin_products(request):
-    products = Product.objects.all().order_by('-created_at')
-    serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data)
+    products = Product.objects.for_summary()
+    return paginated_response(request, products, ProductSummarySerializer)
 
 class SaccoAdminProductsView(APIView):
      def get(self, request):
-        products = Product.objects.all()
-        serializer = AdminProductSerializer(products, many=True)
-        return Response(serializer.data)
+        products = Product.objects.for_summary()
+        return paginated_response(request, products, ProductSummarySerializer)
 
 class StageViewSet(viewsets.ModelViewSet):
     queryset = Stage.objects.all()
@@ -214,45 +256,16 @@ class StageViewSet(viewsets.ModelViewSet):
     lookup_field = "uid"   # 👈 this tells DRF to use the uuid field
 
 # products/views.py (append or create ApproveProductAPIView)
-import os
 import json
-import base64
-import qrcode
-import io
 from django.conf import settings
 from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from web3 import Web3, HTTPProvider
-from django.core.mail import send_mail
 from django.conf import settings
 from .models import Product
 
-# helper to load abi
-import os
-import json
-from pathlib import Path
-
-def load_contract_abi():
-    abi_path = os.environ.get("CONTRACT_ABI_PATH")
-    if not abi_path:
-        raise ValueError("❌ CONTRACT_ABI_PATH is not set in .env")
-
-    # If path is relative, resolve it relative to project root
-    if not os.path.isabs(abi_path):
-        base_dir = Path(__file__).resolve().parent.parent  # backend root
-        abi_path = base_dir / abi_path
-
-    if not os.path.exists(abi_path):
-        raise FileNotFoundError(f"❌ ABI file not found at: {abi_path}")
-
-    with open(abi_path, "r") as f:
-        contract_json = json.load(f)
-
-    return contract_json["abi"]
-
 class ApproveProductAPIView(APIView):
     permission_classes = [IsAuthenticated]  # optionally restrict to sacco admins
 
@@ -280,20 +293,17 @@ class ApproveProductAPIView(APIView):
             product.save()
 
             # send rejection email
-            try:
-                send_mail(
-                    subject="Your product has been rejected",
-                    message=(
-                        f"Dear {product.farmer.full_name},\n\n"
-                        f"Your product '{product.title}' was rejected by the SACCO admin.\n\n"
-                        f"Reason: {review}\n\nPlease correct and re-submit.\n\nRegards,\nFairTrace"
-                    ),
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[product.farmer.email],
-                    fail_silently=True
-                )
-            except Exception as e:
-                print("Email error:", e)
+            queue_email(
+                product.farmer.email,
+                "Your product has been rejected",
+                (
+                    f"Dear {product.farmer.full_name},\n\n"
+                    f"Your product '{product.title}' was rejected by the SACCO admin.\n\n"
+                    f"Reason: {review}\n\nPlease correct and re-submit.\n\nRegards,\nFairTrace"
+                ),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                purpose="product-declined",
+            )
 
             serializer_data = {
                 "uid": str(product.uid),
@@ -303,115 +313,48 @@ class ApproveProductAPIView(APIView):
             return Response(serializer_data, status=status.HTTP_200_OK)
 
         elif action == "approve":
-            # generate PID (simple, you can adapt to your scheme)
-            pid = f"PID-{timezone.now().strftime('%Y%m%d')}-{str(product.id).zfill(6)}"
+            # PID from the per-farmer counter (products.utils.allocate_pids)
+            pid = product.pid or generate_pid(product)
             product.pid = pid
 
-            # Optionally create metadata URI (IPFS, S3 etc). We'll include basic metadata string
-            metadata_uri = f"FairTrace: product {pid} by {product.farmer.email}"
-
-            # --- Call smart contract ---
-            web3_provider = os.environ.get("WEB3_PROVIDER") or settings.WEB3_PROVIDER
-            w3 = Web3(HTTPProvider(web3_provider))
-
-            contract_address = Web3.to_checksum_address(settings.PRODUCT_REGISTRY_ADDRESS)
-
-            abi = load_contract_abi()
-            contract = w3.eth.contract(address=contract_address, abi=abi)
-
-            admin_priv = os.environ.get("ADMIN_WALLET_PRIVATE_KEY")
-            admin_addr = Web3.to_checksum_address(os.environ.get("ADMIN_WALLET_ADDRESS"))
-
-
-            # Build transaction
-            try:
-                nonce = w3.eth.get_transaction_count(admin_addr)
-                tx = contract.functions.registerProduct(
-                    pid,
-                    product.title[:200],
-                    product.farmer.email[:200],
-                    metadata_uri[:200]
-                ).build_transaction({
-                    "from": admin_addr,
-                    "nonce": nonce,
-                    "gas": 500000,
-                    "gasPrice": w3.to_wei('2', 'gwei')
-                })
-
-                signed = w3.eth.account.sign_transaction(tx, private_key=admin_priv)
-                tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)  # ✅ correct
-
-                tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-
-                tx_hex = tx_hash.hex()
-                product.tx_hash = tx_hex
-            except Exception as e:
-                import traceback
-                print("❌ Blockchain registration failed:", str(e))
-                traceback.print_exc()  # full stack trace in Django console
-                return Response(
-                    {"detail": "Blockchain registration failed", "error": str(e)},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-
-
-            # --- generate QR code (Data URI) ---
-            try:
-                frontend_base_url = os.environ.get( "FRONTEND_URL", "http://localhost:3000")
-                trace_url = f"{frontend_base_url}/trace/{product.uid}"
-                qr_img = qrcode.make(trace_url)
-                buffered = io.BytesIO()
-                qr_img.save(buffered, format="PNG")
-                img_bytes = buffered.getvalue()
-                data_uri = "data:image/png;base64," + base64.b64encode(img_bytes).decode()
-                product.qr_code_data = data_uri
-
-            except Exception as e:
-                print("QR error:", e)
+            # --- QR code: name assigned now, image rendered by products.tasks ---
+            qr.assign(product)
 
             product.status = "approved"
             product.admin_reason = review
             product.approved_at = timezone.now()
             product.save()
 
+            # --- hand over to the anchoring worker (products.tasks) ---
+            anchor_status = enqueue_anchor(product.id)
+
             # --- send approval email ---
-            try:
-                send_mail(
-                    subject="Your product has been approved",
-                    message=(
-                        f"Dear {product.farmer.full_name},\n\n"
-                        f"Your product '{product.title}' has been approved.\n\n"
-                        f"PID: {pid}\n"
-                        f"Blockchain tx: {product.tx_hash}\n\n"
-                        f"Next steps: your product is live on the system.\n"
-                    ),
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[product.farmer.email],
-                    fail_silently=True
-                )
-            except Exception as e:
-                print("Email error:", e)
+            queue_email(
+                product.farmer.email,
+                "Your product has been approved",
+                (
+                    f"Dear {product.farmer.full_name},\n\n"
+                    f"Your product '{product.title}' has been approved.\n\n"
+                    f"PID: {pid}\n"
+                    f"Blockchain registration: {anchor_status}\n\n"
+                    f"Next steps: your product is live on the system.\n"
+                ),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                purpose="product-approved",
+            )
 
             return Response({
                 "uid": str(product.uid),
                 "status": product.status,
                 "pid": product.pid,
-                "qr_code_data": product.qr_code_data,
-                "tx_hash": product.tx_hash,
+                "qr_code_url": qr.qr_url(product, request),
+                "tx_hash": None,
+                "anchor_status": anchor_status,
                 "admin_reason": product.admin_reason,
-            }, status=status.HTTP_200_OK)
+            }, status=status.HTTP_202_ACCEPTED)
         else:
             return Response({"detail": "action must be approve or reject"}, status=status.HTTP_400_BAD_REQUEST)
 
-from web3 import Web3
-from django.conf import settings
-
-raw_address = settings.PRODUCT_REGISTRY_ADDRESS
-if not raw_address:
-    raise ValueError("PRODUCT_REGISTRY_ADDRESS is not set in settings or .env")
-
-contract_address = Web3.to_checksum_address(raw_address)
-
 class ProductTraceAPIView(APIView):
     permission_classes = [permissions.AllowAny]
 
@@ -423,7 +366,7 @@ class ProductTraceAPIView(APIView):
             "status": product.status,
             "pid": product.pid,
             "tx_hash": product.tx_hash,
-            "qr_code_data": product.qr_code_data,
+            "qr_code_url": qr.qr_url(product, request),
             "approved_at": product.approved_at,
         })
 
@@ -468,35 +411,101 @@ from rest_framework import status, permissions
 from .models import Product
 
 class TraceProductAPIView(APIView):
+    """
+    Public trace record behind the product QR code. Served from
+    products/trace_cache.py with ETag/Last-Modified, so scans rarely reach
+    the database and repeat scans get a 304.
+
+    ?verify=1 adds "verification": whether ProductRegistry holds a record
+    matching the product, and the block it was checked at
+    (products/verification.py).
+    """
     authentication_classes = []
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, uid):
-        try:
-            # ✅ Get product that is NOT pending
-            product = Product.objects.exclude(status="pending").get(uid=uid)
-        except Product.DoesNotExist:
-            print(f"❌ Product not found or still pending: {uid}")
-            return Response(
-                {"detail": "Product not found or still pending"},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        entry = trace_cache.get(uid)
+        if entry is None:
+            try:
+                # ✅ Get product that is NOT pending
+                product = (
+                    Product.objects.select_related("farmer", "anchor_batch", "route")
+                    .exclude(status="pending")
+                    .get(uid=uid)
+                )
+            except Product.DoesNotExist:
+                print(f"❌ Product not found or still pending: {uid}")
+                return Response(
+                    {"detail": "Product not found or still pending"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
 
-        print(f"✅ Product found for trace: {product.uid} — {product.status}")
+            print(f"✅ Product found for trace: {product.uid} — {product.status}")
+            entry = trace_cache.store(uid, {
+                "uid": str(product.uid),
+                "pid": product.pid,
+                "title": product.title,
+                "status": product.status,
+                "qr_code_url": qr.qr_url(product),  # made absolute per request below
+                "farmer": {
+                    "name": product.farmer.first_name,
+                    "location": getattr(product.farmer, "location", ""),
+                },
+                "tx_hash": product.tx_hash,
+                "anchor_status": product.anchor_status,
+                "merkle": merkle_inclusion(product),
+                "route": routes.route_payload(product),
+                "chain_events": verification.chain_history(product),
+            }, anchor=verification.anchor_reference(product))
+
+        if request.query_params.get("verify") in ("1", "true"):
+            # depends on the chain head, so not conditional on the cached entry
+            data = dict(entry["data"], verification=verification.verify(entry["anchor"]))
+            if data["qr_code_url"]:
+                data["qr_code_url"] = request.build_absolute_uri(data["qr_code_url"])
+            response = Response(data, status=200)
+            response["Cache-Control"] = "no-store"
+            return response
+
+        response = get_conditional_response(
+            request, etag=entry["etag"], last_modified=entry["last_modified"]
+        )
+        if response is None:
+            data = dict(entry["data"])
+            if data["qr_code_url"]:
+                data["qr_code_url"] = request.build_absolute_uri(data["qr_code_url"])
+            response = Response(data, status=200)
+        response["ETag"] = entry["etag"]
+        response["Last-Modified"] = http_date(entry["last_modified"])
+        # let phones keep the record but check back on every scan
+        response["Cache-Control"] = "public, no-cache"
+        return response
+
+
+class ProductRouteAPIView(APIView):
+    """
+    The delivery track as an encoded polyline. ?tolerance=<metres> picks the
+    resolution (default ROUTE_SIMPLIFY_TOLERANCE_M); larger is coarser.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
 
-        data = {
-            "uid": str(product.uid),
-            "pid": product.pid,
-            "title": product.title,
-            "status": product.status,
-            "qr_code_data": product.qr_code_data,
-            "farmer": {
-                "name": product.farmer.first_name,
-                "location": getattr(product.farmer, "location", ""),
-            },
-            "tx_hash": product.tx_hash,
-        }
-        return Response(data, status=200)
+    def get(self, request, uid):
+        product = get_object_or_404(
+            Product.objects.select_related("route").exclude(status="pending"), uid=uid
+        )
+        tolerance = request.query_params.get("tolerance")
+        if tolerance is not None:
+            try:
+                tolerance = float(tolerance)
+            except ValueError:
+                return Response({"detail": "tolerance must be a number of metres"}, status=400)
+            tolerance = min(max(tolerance, 1.0), settings.ROUTE_MAX_TOLERANCE_M)
+
+        track = routes.route_payload(product, tolerance)
+        if track is None:
+            return Response({"detail": "No locations recorded for this product"}, status=404)
+        return Response(track)
 
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -689,14 +698,6 @@ def allocate_product(request, uid):
     }, status=status.HTTP_200_OK)
 
 
-# helper function, not a view
-def load_abi():
-    path = os.getenv("CONTRACT_ABI_PATH")
-    if not path:
-        raise ValueError("CONTRACT_ABI_PATH not set")
-    with open(path, 'r') as f:
-        return json.load(f)["abi"]
-
 # === SETUP LOGGER ===
 logger = logging.getLogger('product_decision')
 if not logger.handlers:
@@ -744,84 +745,13 @@ class ProductDecisionAPIView(APIView):
 
         # === APPROVE FLOW ===
         logger.info(f"APPROVING PRODUCT: {uid}")
-        pid = f"FAIR-{product.uid.hex[:12].upper()}"
-        trace_url = f"{os.getenv('FRONTEND_URL', 'http://localhost:3000')}/trace/{uid}"
+        pid = product.pid or generate_pid(product)
 
         logger.debug(f"Generated PID: {pid}")
-        logger.debug(f"Trace URL: {trace_url}")
-
-        try:
-            # === WEB3 CONNECTION ===
-            logger.debug("Connecting to Web3...")
-            w3 = Web3(Web3.HTTPProvider(os.getenv('WEB3_PROVIDER')))
-            if not w3.is_connected():
-                raise Exception("Failed to connect to blockchain node")
-
-            logger.info("Web3 connected")
-
-            # === CONTRACT ===
-            contract_addr = Web3.to_checksum_address(os.getenv('PRODUCT_REGISTRY_ADDRESS'))
-            logger.debug(f"Contract Address: {contract_addr}")
-
-            contract = w3.eth.contract(address=contract_addr, abi=load_abi())
-            admin_addr = Web3.to_checksum_address(os.getenv('ADMIN_WALLET_ADDRESS'))
-            logger.debug(f"Admin Wallet: {admin_addr}")
-
-            # === NONCE & TX BUILD ===
-            nonce = w3.eth.get_transaction_count(admin_addr)
-            logger.debug(f"Nonce: {nonce}")
-
-            tx = contract.functions.registerProduct(
-                pid, product.title, product.farmer.email, trace_url
-            ).build_transaction({
-                'chainId': 1337,
-                'gas': 300000,
-                'gasPrice': w3.to_wei('2', 'gwei'),
-                'nonce': nonce,
-            })
-
-            logger.debug("Transaction built")
 
-            # === SIGN & SEND ===
-            signed = w3.eth.account.sign_transaction(tx, os.getenv('ADMIN_WALLET_PRIVATE_KEY'))
-            tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-            tx_hash_hex = tx_hash.hex()
-
-            logger.info(f"TX SENT: {tx_hash_hex}")
-            print(f"TX SENT: {tx_hash_hex}")  # Also print to raw console
-
-            # === WAIT FOR RECEIPT ===
-            logger.debug("Waiting for receipt...")
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash_hex, timeout=120)
-
-            if receipt.status != 1:
-                raise Exception(f"Transaction failed. Status: {receipt.status}")
-
-            logger.info(f"TX CONFIRMED: Block #{receipt.blockNumber}")
-            product.tx_hash = tx_hash_hex
-
-        except Exception as e:
-            logger.error("BLOCKCHAIN ERROR")
-            logger.error(f"Error: {str(e)}")
-            traceback.print_exc()
-            return Response({
-                "detail": "Blockchain registration failed",
-                "error": str(e)
-            }, status=500)
-
-        # === QR CODE GENERATION ===
-        try:
-            logger.debug("Generating QR code...")
-            qr = qrcode.make(trace_url)
-            buffer = io.BytesIO()
-            qr.save(buffer, format='PNG')
-            qr_base64 = base64.b64encode(buffer.getvalue()).decode()
-            product.qr_code_data = f"data:image/png;base64,{qr_base64}"
-            logger.info("QR code generated")
-        except Exception as e:
-            logger.error("QR GENERATION FAILED")
-            logger.error(str(e))
-            traceback.print_exc()
+        # === QR CODE (rendered by products.tasks.render_product_qr) ===
+        qr.assign(product)
+        logger.debug(f"QR image: {product.qr_code_path}")
 
         # === FINAL SAVE ===
         product.pid = pid
@@ -830,15 +760,50 @@ class ProductDecisionAPIView(APIView):
         product.approved_at = timezone.now()
         product.save()
 
-        logger.info(f"APPROVED: PID={pid} | TX={product.tx_hash}")
+        # === ANCHOR (async, see products/tasks.py) ===
+        anchor_status = enqueue_anchor(product.id)
+
+        logger.info(f"APPROVED: PID={pid} | ANCHOR={anchor_status}")
 
         return Response({
             "status": "approved",
             "pid": pid,
-            "qr_code_data": product.qr_code_data,
-            "tx_hash": product.tx_hash,
+            "qr_code_url": qr.qr_url(product, request),
+            "tx_hash": None,
+            "anchor_status": anchor_status,
             "admin_reason": review
-        })
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class BulkDecisionAPIView(APIView):
+    """
+    POST /api/sacco_admin/products/decisions/
+        {"decisions": [{"uid": ..., "action": "approve" | "decline", "reason": ""}, ...]}
+    Applies every decision in one transaction (products/decisions.py) and
+    returns the job with a per-product result; farmer emails are queued in
+    the background, see GET /api/sacco_admin/decisions/<uid>/.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not getattr(request.user, 'is_sacco_admin', False):
+            return Response({"detail": "SACCO Admin only"}, status=403)
+        serializer = BulkDecisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = decisions.apply(serializer.validated_data["decisions"], user=request.user)
+        response = Response(BulkDecisionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        response["Location"] = request.build_absolute_uri(reverse("bulk-decision-job", kwargs={"uid": job.uid}))
+        return response
+
+
+class BulkDecisionJobAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, uid):
+        if not getattr(request.user, 'is_sacco_admin', False):
+            return Response({"detail": "SACCO Admin only"}, status=403)
+        job = get_object_or_404(BulkDecisionJob, uid=uid)
+        return Response(BulkDecisionJobSerializer(job).data)
         
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
@@ -854,11 +819,11 @@ def sacco_admin_product_detail(request, uid):
     Get a single product detail for SACCO admin.
     """
     try:
-        product = Product.objects.get(uid=uid)
+        product = Product.objects.for_detail().get(uid=uid)
     except Product.DoesNotExist:
         return Response({"detail": "Product not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    serializer = AdminProductSerializer(product)
+    serializer = AdminProductSerializer(product, expand=("images",), context={"request": request})
     return Response(serializer.data)
 
 from rest_framework.views import APIView
@@ -890,9 +855,8 @@ class ProductListAPIView(APIView):
     logger = logging.getLogger(__name__)
 
     def get(self, request):
-        products = Product.objects.all().order_by('-created_at')
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        products = Product.objects.for_summary()
+        return paginated_response(request, products, ProductSummarySerializer)
 
     def post(self, request):
         self.logger.debug(f"🟡 Incoming product data: {request.data}")
@@ -929,3 +893,38 @@ class SaccoAdminDecisionAPIView(APIView):
 
         return Response({"detail": f"Product {decision} successfully."})
 
+
+
+import re
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+
+QR_FILENAME = re.compile(r"^[0-9a-f]{64}\.(png|svg)$")
+
+
+def qr_image(request, filename):
+    """
+    GET /api/qr/<sha256>.<png|svg> → QR image from storage.
+    Names are content-addressed, so the response never changes and can be
+    cached by browsers and CDNs indefinitely.
+    """
+    match = QR_FILENAME.match(filename)
+    if not match:
+        raise Http404
+
+    etag = f'"{filename.split(".")[0]}"'
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+    else:
+        name = f"qr/{filename}"
+        if not default_storage.exists(name):
+            # Worker has not caught up yet: render now for the product that owns it.
+            product = Product.objects.filter(qr_code_path=name).first()
+            if product is None:
+                raise Http404
+            qr.ensure_stored(name, qr.trace_url(product))
+        response = FileResponse(default_storage.open(name), content_type=qr.CONTENT_TYPES[match.group(1)])
+
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
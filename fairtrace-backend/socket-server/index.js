@@ -5,10 +5,80 @@ import cors from "cors";
 import dotenv from "dotenv";
 dotenv.config();
 
+// comma-separated list of allowed browser origins; "*" only for local development
+const ORIGINS = (process.env.SOCKET_ALLOWED_ORIGINS || "*").split(",").map((o) => o.trim());
+const origin = ORIGINS.includes("*") ? "*" : ORIGINS;
+
 const app = express();
-app.use(cors());
+app.use(cors({ origin }));
 const server = http.createServer(app);
-const io = new Server(server, { cors: { origin: "*" } });
+const io = new Server(server, { cors: { origin } });
+
+// Location fixes are persisted through the backend's batch endpoint
+// (POST /api/locations/batch/, see products/ingest.py): buffered here and
+// flushed every LOCATION_FLUSH_MS or once LOCATION_BATCH_SIZE fixes are waiting.
+const API_URL = process.env.API_URL || "http://127.0.0.1:8000/api";
+const INGEST_TOKEN = process.env.LOCATION_INGEST_TOKEN || "";
+const FLUSH_MS = Number(process.env.LOCATION_FLUSH_MS || 1000);
+const BATCH_SIZE = Number(process.env.LOCATION_BATCH_SIZE || 500);
+const MAX_BUFFERED = Number(process.env.LOCATION_MAX_BUFFERED || 50000); // drop oldest beyond this while the API is down
+
+let buffer = [];
+let flushing = false;
+
+// Drivers authenticate the handshake with their access token:
+//   io(URL, { auth: { token: "<JWT>" } })
+// The backend resolves it to their logistics transporter, whose id goes with
+// every fix they send, so the batch endpoint only stores fixes for that
+// transporter's products in transit. Sockets without a token may only
+// subscribe to updates.
+async function transporterFor(token) {
+  const res = await fetch(`${API_URL}/logistics/transporters/me/`, {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  if (!res.ok) return null;
+  const data = await res.json();
+  return data.id ?? null;
+}
+
+io.use(async (socket, next) => {
+  const token = socket.handshake.auth?.token;
+  if (!token) return next();
+  try {
+    const transporterId = await transporterFor(token);
+    if (transporterId === null) return next(new Error("invalid token"));
+    socket.data.transporterId = transporterId;
+    next();
+  } catch (err) {
+    console.error("socket auth failed:", err.message);
+    next(new Error("authentication unavailable"));
+  }
+});
+
+async function flushLocations() {
+  if (flushing || buffer.length === 0 || !INGEST_TOKEN) return;
+  flushing = true;
+  const batch = buffer.splice(0, BATCH_SIZE);
+  try {
+    const res = await fetch(`${API_URL}/locations/batch/`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json", "X-Ingest-Token": INGEST_TOKEN },
+      body: JSON.stringify({ fixes: batch }),
+    });
+    if (res.status >= 500) throw new Error(`ingest returned ${res.status}`);
+    if (!res.ok) console.error("location batch rejected", res.status, await res.text());
+  } catch (err) {
+    // keep the fixes for the next flush
+    console.error("location flush failed:", err.message);
+    buffer = batch.concat(buffer).slice(-MAX_BUFFERED);
+  } finally {
+    flushing = false;
+  }
+  if (buffer.length >= BATCH_SIZE) flushLocations();
+}
+
+setInterval(flushLocations, FLUSH_MS);
+if (!INGEST_TOKEN) console.warn("LOCATION_INGEST_TOKEN not set; location updates will not be stored");
 
 io.on("connection", (socket) => {
   console.log("sock connected", socket.id);
@@ -20,13 +90,26 @@ io.on("connection", (socket) => {
 
   socket.on("unsubscribe", room => socket.leave(room));
 
-  // driver client can emit location updates:
+  // authenticated drivers can emit location updates:
   socket.on("location_update", (payload) => {
     // payload: { pid, lat, lng }
-    if (!payload || !payload.pid) return;
+    const transporterId = socket.data.transporterId;
+    if (transporterId === undefined || !payload || !payload.pid) return;
     const room = `product_${payload.pid}`;
     // broadcast to farmer clients viewing that product
     io.to(room).emit("location_update", payload);
+
+    if (INGEST_TOKEN) {
+      buffer.push({
+        pid: payload.pid,
+        lat: payload.lat,
+        lng: payload.lng,
+        recorded_at: payload.recorded_at || new Date().toISOString(),
+        transporter_id: transporterId,
+      });
+      if (buffer.length > MAX_BUFFERED) buffer.shift();
+      if (buffer.length >= BATCH_SIZE) flushLocations();
+    }
   });
 });
 
@@ -1,26 +1,64 @@
 # tasks/anchor.py
 
 """
-This module provides a simple task enqueuer for anchoring.
-Later, you can replace the print statement with a Celery task
-or background worker if you want async processing.
+Entry point the approval views use to hand a product over to the anchoring
+worker. The product is marked `pending` in the database and, in single
+anchoring mode, a Celery task is dispatched once the surrounding transaction
+commits. In merkle mode the next `anchor_pending_batch` run picks it up.
+See products/tasks.py for the worker itself.
 """
 
 import logging
 
+from django.db import transaction
+from django.utils import timezone
+
 logger = logging.getLogger(__name__)
 
-def enqueue_anchor(data=None):
+
+def enqueue_anchor(product_id):
+    """
+    Queue an approved product for on-chain registration.
+    :param product_id: primary key of the approved Product.
+    :return: the product's anchor status ("pending").
+    """
+    return enqueue_anchors([product_id])
+
+
+def enqueue_anchors(product_ids):
     """
-    Enqueue an anchor task.
-    :param data: Optional payload for the task.
-    :return: Confirmation message (string).
+    `enqueue_anchor` for many products at once: one UPDATE, and in single
+    mode one post-commit callback dispatching a task per product.
+    :param product_ids: primary keys of approved Products.
+    :return: their anchor status ("pending").
     """
-    if data is None:
-        data = {}
+    from django.conf import settings
+    from products import trace_cache
+    from products.models import Product
+    from products.tasks import anchor_product
+
+    product_ids = list(product_ids)
+    if not product_ids:
+        return "pending"
+    Product.objects.filter(pk__in=product_ids).update(
+        anchor_status="pending",
+        anchor_attempts=0,
+        anchor_error=None,
+        anchor_updated_at=timezone.now(),
+    )
+    trace_cache.invalidate_products(product_ids)
+    if settings.ANCHOR_MODE != "single":
+        return "pending"
+
+    def dispatch():
+        for product_id in product_ids:
+            try:
+                anchor_product.delay(product_id)
+            except Exception:
+                # The row is already pending; requeue_stale_anchors picks it up.
+                logger.exception("Could not dispatch anchor task for product %s", product_id)
 
-    # For now, just log/print the task. Replace with Celery, RQ, etc. later.
-    logger.info("Enqueuing anchor task with data: %s", data)
-    print("✅ Anchor task enqueued with data:", data)
+    transaction.on_commit(dispatch)
 
-    return "Anchor task enqueued"
+    logger.info("Anchor queued for %s product(s)", len(product_ids))
+    return "pending"
@@ -0,0 +1,115 @@
+# users/authentication.py
+"""
+JWT authentication that also tells views which profiles the user has.
+
+The logistics endpoints need the caller's logistics.Transporter (and the
+farmer endpoints their Farmer) on every request, only to filter by its id.
+Instead of a `Transporter.objects.get(user=...)` per request, the ids are
+written into the token at login (`add_profile_claims`) and
+ProfileJWTAuthentication puts them on `request.user.profiles`:
+
+    from users.authentication import transporter_id
+    products = Product.objects.filter(transporter_id=transporter_id(request.user))
+
+Tokens issued before the claims existed, and users authenticated some
+other way (e.g. `force_authenticate` in tests), are resolved with one query
+that is kept in a per-process cache for PROFILE_CACHE_TTL_SECONDS. A
+profile created after login is not in the token yet, so `transporter_id`
+and `farmer_id` look a missing id up again (through the same cache, which
+post_save of the profile clears in this process) before giving up.
+
+There is no SACCO profile model linked to users; SACCO admins are known by
+the `is_sacco_admin` flag, which is carried along for completeness.
+"""
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+TRANSPORTER_CLAIM = "logistics_transporter_id"
+FARMER_CLAIM = "farmer_id"
+
+
+class Profiles(NamedTuple):
+    transporter_id: Optional[int]
+    farmer_id: Optional[int]
+    is_sacco_admin: bool
+
+
+_cache = {}  # user id -> (expires at, Profiles)
+_lock = threading.Lock()
+
+
+def lookup(user_id):
+    """Profiles of `user_id` from the database, in one query."""
+    row = (
+        get_user_model().objects.filter(pk=user_id)
+        .values_list("logistics_transporter_profile__id", "farmer_profile__id", "is_sacco_admin")
+        .first()
+    )
+    return Profiles(*row) if row else Profiles(None, None, False)
+
+
+def cached(user_id):
+    """Profiles of `user_id` through the per-process cache."""
+    now = time.monotonic()
+    entry = _cache.get(user_id)
+    if entry and entry[0] > now:
+        return entry[1]
+    profiles = lookup(user_id)
+    with _lock:
+        if len(_cache) >= settings.PROFILE_CACHE_MAX_ENTRIES:
+            for key in [key for key, (expires, _) in _cache.items() if expires <= now]:
+                del _cache[key]
+            while len(_cache) >= settings.PROFILE_CACHE_MAX_ENTRIES:
+                del _cache[next(iter(_cache))]  # oldest first
+        _cache[user_id] = (now + settings.PROFILE_CACHE_TTL_SECONDS, profiles)
+    return profiles
+
+
+def forget(user_id):
+    _cache.pop(user_id, None)
+
+
+def add_profile_claims(token, user):
+    profiles = lookup(user.pk)
+    token[TRANSPORTER_CLAIM] = profiles.transporter_id
+    token[FARMER_CLAIM] = profiles.farmer_id
+    return token
+
+
+def get_profiles(user):
+    profiles = getattr(user, "profiles", None)
+    if profiles is None:
+        profiles = user.profiles = cached(user.pk)
+    return profiles
+
+
+def transporter_id(user):
+    """The id of `user`'s logistics.Transporter, or None."""
+    profiles = get_profiles(user)
+    if profiles.transporter_id is None:
+        # the profile may be newer than the token
+        profiles = user.profiles = cached(user.pk)
+    return profiles.transporter_id
+
+
+def farmer_id(user):
+    """The id of `user`'s Farmer, or None."""
+    profiles = get_profiles(user)
+    if profiles.farmer_id is None:
+        profiles = user.profiles = cached(user.pk)
+    return profiles.farmer_id
+
+
+class ProfileJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if TRANSPORTER_CLAIM in validated_token and FARMER_CLAIM in validated_token:
+            user.profiles = Profiles(
+                validated_token[TRANSPORTER_CLAIM], validated_token[FARMER_CLAIM], user.is_sacco_admin
+            )
+        return user
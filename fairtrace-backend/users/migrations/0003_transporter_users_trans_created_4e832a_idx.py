@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_is_transporter_transporter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transporter',
+            index=models.Index(fields=['created_at', 'id'], name='users_trans_created_4e832a_idx'),
+        ),
+    ]
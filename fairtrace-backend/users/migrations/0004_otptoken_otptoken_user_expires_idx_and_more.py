@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_transporter_users_trans_created_4e832a_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otptoken',
+            index=models.Index(fields=['user', 'expires_at'], name='otptoken_user_expires_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otptoken',
+            index=models.Index(condition=models.Q(('used', False)), fields=['user', 'expires_at'], name='otptoken_unused_idx'),
+        ),
+    ]
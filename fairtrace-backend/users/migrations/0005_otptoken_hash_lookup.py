@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_otptoken_otptoken_user_expires_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='otptoken',
+            name='otptoken_user_expires_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='otptoken',
+            name='otptoken_unused_idx',
+        ),
+        migrations.AddIndex(
+            model_name='otptoken',
+            index=models.Index(condition=models.Q(('used', False)), fields=['user', 'otp_hash'], name='otptoken_user_hash_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otptoken',
+            index=models.Index(fields=['expires_at'], name='otptoken_expires_idx'),
+        ),
+    ]
@@ -79,6 +79,7 @@ class Transporter(models.Model):
     class Meta:
         verbose_name = "Transporter"
         verbose_name_plural = "Transporters"
+        indexes = [models.Index(fields=["created_at", "id"])]  # keyset pagination
 
 
 # ================================
@@ -107,6 +108,14 @@ class OTPToken(models.Model):
     expires_at = models.DateTimeField()
     used = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # VerifyOTPAPIView: one conditional UPDATE per code (users/otp.py)
+            models.Index(fields=["user", "otp_hash"], condition=models.Q(used=False), name="otptoken_user_hash_idx"),
+            # purge_otps
+            models.Index(fields=["expires_at"], name="otptoken_expires_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.email} - {self.otp_hash}"
 
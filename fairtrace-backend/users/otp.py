@@ -0,0 +1,123 @@
+# users/otp.py
+"""
+Login codes (OTPToken) for the two-step login: LoginAPIView checks the
+password and `issue`s a code, VerifyOTPAPIView `consume`s it and hands out
+the JWT.
+
+Only the SHA-256 of a code is stored. Verifying is one conditional UPDATE
+on the (user, otp_hash) index that flips `used` only if the token is still
+unused and unexpired, so a code works once even when two requests race.
+
+Wrong codes are counted per user in the cache with a sliding-window
+counter (this window's count plus the previous window's, weighted by how
+much of it still overlaps): after OTP_VERIFY_MAX_ATTEMPTS failures within
+OTP_VERIFY_WINDOW_SECONDS the user gets a 429 until the window has slid
+past them, which keeps a 6-digit code out of brute-force reach. If the
+cache is down the limiter is skipped and logged rather than locking
+everyone out.
+
+Expired tokens, and the legacy OTP rows, are deleted by the `purge_otps`
+task in batches of OTP_PURGE_BATCH_SIZE.
+"""
+import hashlib
+import logging
+import math
+import secrets
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import OTP, OTPToken
+
+logger = logging.getLogger(__name__)
+
+
+def hash_code(code):
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+def issue(user):
+    """Store a new code for `user`; returns (code, OTPToken)."""
+    code = f"{secrets.randbelow(10**6):06d}"
+    expires_at = timezone.now() + timedelta(minutes=settings.OTP_TTL_MINUTES)
+    return code, OTPToken.objects.create(user=user, otp_hash=hash_code(code), expires_at=expires_at)
+
+
+def consume(user, code):
+    """Mark the token for `code` used if it is valid; returns whether it was."""
+    return bool(
+        OTPToken.objects.filter(
+            user=user, otp_hash=hash_code(code), used=False, expires_at__gte=timezone.now()
+        ).update(used=True)
+    )
+
+
+def _windows(user_id):
+    window = settings.OTP_VERIFY_WINDOW_SECONDS
+    now = time.time()
+    index = int(now // window)
+    return f"otp-fail:{user_id}:{index}", f"otp-fail:{user_id}:{index - 1}", now % window
+
+
+def retry_after(user_id):
+    """Seconds until `user_id` may try another code; 0 if they may now."""
+    window, limit = settings.OTP_VERIFY_WINDOW_SECONDS, settings.OTP_VERIFY_MAX_ATTEMPTS
+    current_key, previous_key, elapsed = _windows(user_id)
+    try:
+        counts = cache.get_many([current_key, previous_key])
+    except Exception:
+        logger.warning("OTP attempt counter unavailable for user %s", user_id, exc_info=True)
+        return 0
+    current, previous = counts.get(current_key, 0), counts.get(previous_key, 0)
+    if previous * (1 - elapsed / window) + current < limit:
+        return 0
+    if current >= limit:
+        # wait for the next window, then for this one to weigh less than the limit
+        return math.ceil(window - elapsed + window * (1 - limit / current))
+    # wait for enough of the previous window to slide out
+    return max(1, math.ceil(window * (1 - (limit - current) / previous) - elapsed))
+
+
+def record_failure(user_id):
+    current_key, _, _ = _windows(user_id)
+    try:
+        # kept for two windows: this one, then as the previous one
+        cache.add(current_key, 0, 2 * settings.OTP_VERIFY_WINDOW_SECONDS)
+        cache.incr(current_key)
+    except Exception:
+        logger.warning("Could not count failed OTP for user %s", user_id, exc_info=True)
+
+
+def reset_failures(user_id):
+    current_key, previous_key, _ = _windows(user_id)
+    try:
+        cache.delete_many([current_key, previous_key])
+    except Exception:
+        logger.warning("Could not reset OTP attempts for user %s", user_id, exc_info=True)
+
+
+def _delete_in_batches(queryset, batch_size):
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        count, _ = queryset.model.objects.filter(pk__in=ids).delete()
+        deleted += count
+        if len(ids) < batch_size:
+            return deleted
+
+
+def purge(batch_size=None):
+    """Delete expired codes in batches; returns how many rows went."""
+    batch_size = batch_size or settings.OTP_PURGE_BATCH_SIZE
+    now = timezone.now()
+    deleted = _delete_in_batches(OTPToken.objects.filter(expires_at__lt=now), batch_size)
+    # the legacy OTP model is valid for five minutes (OTP.is_valid)
+    deleted += _delete_in_batches(OTP.objects.filter(created_at__lt=now - timedelta(minutes=5)), batch_size)
+    if deleted:
+        logger.info("Purged %s expired OTPs", deleted)
+    return deleted
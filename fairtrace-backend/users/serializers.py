@@ -1,13 +1,15 @@
 from rest_framework import serializers
 from django.contrib.auth.hashers import check_password
 from django.utils import timezone
-from django.core.mail import send_mail
-from datetime import timedelta
-import secrets
+from notifications.models import OutboundEmail
+from notifications.outbox import queue_email
+from django.conf import settings
 
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
-from .models import User, OTPToken, ProductStage
+from . import otp
+from .authentication import add_profile_claims
+from .models import User, ProductStage
 from users.models import Transporter
 from farmers.models import Farmer
 from farmers.utils import canonical_farmer_string, sha256_hex
@@ -66,12 +68,12 @@ class RegisterSerializer(serializers.Serializer):
         farmer.save()
 
         # --- 4. Send confirmation email ---
-        send_mail(
-            subject="FairTrace Registration Successful",
-            message=f"Dear {farmer.full_name},\n\nYour registration is successful.\nFarmer ID: {farmer.uid}\nSACCO Membership: {getattr(farmer, 'sacco_membership', '')}\n\nThank you for registering with FairTrace.",
+        queue_email(
+            farmer.email,
+            "FairTrace Registration Successful",
+            f"Dear {farmer.full_name},\n\nYour registration is successful.\nFarmer ID: {farmer.uid}\nSACCO Membership: {getattr(farmer, 'sacco_membership', '')}\n\nThank you for registering with FairTrace.",
             from_email="no-reply@fairtrace.com",
-            recipient_list=[farmer.email],
-            fail_silently=True
+            purpose="registration",
         )
 
         return farmer
@@ -97,27 +99,17 @@ class OTPCreateSerializer(serializers.Serializer):
         except User.DoesNotExist:
             raise serializers.ValidationError("Invalid email.")
 
-        # Generate 6-digit OTP
-        otp_plain = f"{secrets.randbelow(999999):06d}"
-        otp_hash = sha256_hex(otp_plain)
-
-        expires_at = timezone.now() + timedelta(minutes=10)
-
-        otp_obj = OTPToken.objects.create(
-            user=user,
-            otp_hash=otp_hash,
-            created_at=timezone.now(),
-            expires_at=expires_at,
-            used=False
-        )
+        otp_plain, otp_obj = otp.issue(user)
 
         # Send OTP via email
-        send_mail(
-            subject="Your FairTrace OTP",
-            message=f"Your OTP is: {otp_plain}\nValid for 10 minutes.\nExpires at: {expires_at.astimezone().strftime('%Y-%m-%d %H:%M:%S %Z')}",
+        queue_email(
+            user.email,
+            "Your FairTrace OTP",
+            f"Your OTP is: {otp_plain}\nValid for {settings.OTP_TTL_MINUTES} minutes.\nExpires at: {otp_obj.expires_at.astimezone().strftime('%Y-%m-%d %H:%M:%S %Z')}",
             from_email="no-reply@fairtrace.com",
-            recipient_list=[user.email],
-            fail_silently=True
+            purpose="otp",
+            sensitive=True,
+            priority=OutboundEmail.PRIORITY_HIGH,
         )
 
         return otp_obj
@@ -196,4 +188,5 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
             token['vehicle'] = user.transporter_profile.vehicle
             token['license_plate'] = user.transporter_profile.license_plate
 
-        return token
\ No newline at end of file
+        # Profile ids for ProfileJWTAuthentication
+        return add_profile_claims(token, user)
\ No newline at end of file
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from farmers.models import Farmer
+from logistics.models import Transporter
+
+from . import authentication
+
+
+# post_save only: a post_delete receiver would stop Django from fast-deleting
+# profiles along with their user. A deleted profile drops out of the cache
+# after PROFILE_CACHE_TTL_SECONDS.
+@receiver(post_save, sender=Transporter)
+@receiver(post_save, sender=Farmer)
+def forget_profiles(sender, instance, **kwargs):
+    if instance.user_id is not None:
+        authentication.forget(instance.user_id)
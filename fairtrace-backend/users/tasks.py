@@ -0,0 +1,10 @@
+# users/tasks.py
+from celery import shared_task
+
+from . import otp
+
+
+@shared_task
+def purge_otps():
+    """Delete expired login codes (users/otp.py)."""
+    return otp.purge()
@@ -1,3 +1,71 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from notifications.models import OutboundEmail
+from notifications.tasks import send_outbox
+
+from . import otp
+from .models import OTP, OTPToken, User
+
+
+@override_settings(OTP_VERIFY_MAX_ATTEMPTS=3, OTP_VERIFY_WINDOW_SECONDS=900)
+class OTPLoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterContext(mock.patch.object(send_outbox, "delay"))
+        self.user = User.objects.create_user(email="farmer@example.com", password="s3cret-pass")
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post("/api/users/login/", {"email": self.user.email, "password": "s3cret-pass"})
+        self.assertEqual(response.status_code, 200)
+        return OutboundEmail.objects.get(purpose="otp").body.split(": ")[1][:6]
+
+    def verify(self, code):
+        return self.client.post("/api/users/verify-otp/", {"email": self.user.email, "otp": code})
+
+    def test_code_works_once(self):
+        code = self.login()
+        with self.assertNumQueries(4):  # the user, one conditional UPDATE, two for the token claims
+            response = self.verify(code)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access", response.data)
+        self.assertEqual(self.verify(code).status_code, 400)
+
+    def test_expired_code_is_rejected(self):
+        code = self.login()
+        OTPToken.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.verify(code).status_code, 400)
+
+    def test_throttles_after_too_many_wrong_codes(self):
+        code = self.login()
+        wrong = f"{(int(code) + 1) % 10**6:06d}"
+        for _ in range(3):
+            self.assertEqual(self.verify(wrong).status_code, 400)
+
+        response = self.verify(code)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertFalse(OTPToken.objects.get().used)
+
+        # a window and a half later the old failures have slid out
+        with mock.patch.object(otp.time, "time", return_value=otp.time.time() + 1350):
+            self.assertEqual(self.verify(code).status_code, 200)
+
+    def test_purge_deletes_expired_codes_in_batches(self):
+        now = timezone.now()
+        OTPToken.objects.bulk_create(
+            OTPToken(user=self.user, otp_hash=str(i), expires_at=now + timedelta(minutes=-1 if i < 5 else 5))
+            for i in range(7)
+        )
+        OTP.objects.create(user=self.user, code="123456")
+        OTP.objects.update(created_at=now - timedelta(minutes=6))
+
+        self.assertEqual(otp.purge(batch_size=2), 6)
+        self.assertEqual(sorted(OTPToken.objects.values_list("otp_hash", flat=True)), ["5", "6"])
+        self.assertFalse(OTP.objects.exists())
@@ -1,6 +1,8 @@
 # users/utils.py
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .authentication import add_profile_claims
+
 
 def get_tokens_for_user(user):
     """
@@ -11,6 +13,7 @@ def get_tokens_for_user(user):
       - is_sacco_admin
       - is_transporter
       - transporter profile (if exists)
+      - logistics transporter and farmer profile ids
     """
     refresh = RefreshToken.for_user(user)
 
@@ -31,6 +34,9 @@ def get_tokens_for_user(user):
     # === Optional: Add full name ===
     refresh['full_name'] = user.get_full_name() or user.email
 
+    # === Profile ids (users/authentication.py) ===
+    add_profile_claims(refresh, user)
+
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
@@ -2,20 +2,21 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.contrib.auth import authenticate
-from django.utils import timezone
-from datetime import datetime, timedelta
-from django.core.mail import send_mail
+from notifications.models import OutboundEmail
+from notifications.outbox import queue_email
 from django.conf import settings
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import MyTokenObtainPairSerializer
-import hashlib, secrets
+import hashlib
 from .serializers import RegisterSerializer, LoginSerializer, VerifyOTPSerializer, ProductStageSerializer
-from products.serializers import ProductSerializer
-from .models import OTPToken, User, Product, ProductStage
+from products.serializers import ProductSerializer, ProductSummarySerializer
+from . import otp
+from .models import User, Product, ProductStage
 from farmers.models import Farmer
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.shortcuts import get_object_or_404
+from fairtrace_backend.pagination import paginated_response
 
 # ----------------------------
 # Blockchain Task Import
@@ -29,12 +30,8 @@ class RegisterAPIView(APIView):
         serializer.is_valid(raise_exception=True)
         farmer = serializer.save()
 
-        # Auto-generate SACCO membership ID
-        year = datetime.now().year
-        unique_number = str(farmer.id).zfill(4)
-        sacco_id = f"FT-{year}-{unique_number}"
-        farmer.sacco_membership = sacco_id
-        farmer.save()
+        # SACCO membership ID, allocated by Farmer.save()
+        sacco_id = farmer.sacco_membership
 
         # Compute blockchain hash
         registration_hash = hashlib.sha256(
@@ -53,23 +50,20 @@ class RegisterAPIView(APIView):
             tx_hash = None
 
         # Send confirmation email
-        try:
-            send_mail(
-                subject="🎉 Welcome to FairTrace – Your Farmer ID",
-                message=(
-                    f"Dear {farmer.full_name},\n\n"
-                    f"Congratulations! You are successfully registered.\n\n"
-                    f"✅ Your Farmer ID: {farmer.uid}\n"
-                    f"✅ SACCO Membership ID: {sacco_id}\n"
-                    f"✅ Blockchain TX: {tx_hash or 'Pending'}\n\n"
-                    f"Keep your IDs safe.\n\n– FairTrace Team"
-                ),
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[farmer.email],
-                fail_silently=True
-            )
-        except Exception as e:
-            print(f"Email sending failed: {e}")
+        queue_email(
+            farmer.email,
+            "🎉 Welcome to FairTrace – Your Farmer ID",
+            (
+                f"Dear {farmer.full_name},\n\n"
+                f"Congratulations! You are successfully registered.\n\n"
+                f"✅ Your Farmer ID: {farmer.uid}\n"
+                f"✅ SACCO Membership ID: {sacco_id}\n"
+                f"✅ Blockchain TX: {tx_hash or 'Pending'}\n\n"
+                f"Keep your IDs safe.\n\n– FairTrace Team"
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            purpose="registration",
+        )
 
         return Response(
             {
@@ -95,20 +89,17 @@ class LoginAPIView(APIView):
         if not user:
             return Response({'detail': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
-        # Generate 6-digit OTP
-        otp_plain = f"{secrets.randbelow(10**6):06d}"
-        otp_hash = hashlib.sha256(otp_plain.encode()).hexdigest()
-        expires_at = timezone.now() + timedelta(minutes=10)  # OTP valid for 10 min
-
-        OTPToken.objects.create(user=user, otp_hash=otp_hash, expires_at=expires_at)
+        otp_plain, _ = otp.issue(user)
 
         # Send OTP via email
-        send_mail(
-            subject='Your FairTrace OTP',
-            message=f'Your FairTrace login code is: {otp_plain}\n\nValid for 10 minutes.',
+        queue_email(
+            user.email,
+            'Your FairTrace OTP',
+            f'Your FairTrace login code is: {otp_plain}\n\nValid for {settings.OTP_TTL_MINUTES} minutes.',
             from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=True
+            purpose="otp",
+            sensitive=True,
+            priority=OutboundEmail.PRIORITY_HIGH,
         )
 
         return Response({'detail': 'otp_sent'}, status=status.HTTP_200_OK)
@@ -121,24 +112,14 @@ class VerifyOTPAPIView(APIView):
     permission_classes = [AllowAny]  # Login already verified credentials
 
     def post(self, request, *args, **kwargs):
-        print("===== VERIFY OTP: incoming request.data =====")
-        try:
-            print(request.data)
-        except Exception as e:
-            print("Could not print request.data:", e)
-
-        # Validate payload
         serializer = VerifyOTPSerializer(data=request.data)
         if not serializer.is_valid():
-            print("===== VERIFY OTP: serializer.errors =====")
-            print(serializer.errors)
             return Response(
                 {"detail": "invalid input", "errors": serializer.errors},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
         data = serializer.validated_data
-        otp = data["otp"]
         email = data.get("email")
         user_id = data.get("user_id")
 
@@ -148,36 +129,27 @@ class VerifyOTPAPIView(APIView):
         except User.DoesNotExist:
             return Response({"detail": "user not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Query non-expired tokens
-        now = timezone.now()
-        tokens_qs = OTPToken.objects.filter(user=user, expires_at__gte=now).order_by("-created_at")
-        print(f"Found {tokens_qs.count()} non-expired tokens for user {user.email}")
-
-        # Compare OTP
-        otp_hash = hashlib.sha256(otp.encode()).hexdigest()
-        for token in tokens_qs:
-            print(f"Checking token id={token.id} created_at={token.created_at}")
-            if token.otp_hash == otp_hash:
-                # Success: consume token and issue JWT with custom claims
-                try:
-                    token.delete()
-                except Exception as e:
-                    print(f"Warning: failed to delete OTP token id={token.id}: {e}")
-
-                refresh = MyTokenObtainPairSerializer.get_token(user)
-                access_token = str(refresh.access_token)
-                refresh_token = str(refresh)
-
-                return Response({
-                    "refresh": refresh_token,
-                    "access": access_token,
-                }, status=status.HTTP_200_OK)
-
-        # No matching tokens
-        return Response(
-            {"detail": "Invalid or expired OTP", "checked": tokens_qs.count()},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+        wait = otp.retry_after(user.id)
+        if wait:
+            return Response(
+                {"detail": "Too many attempts, try again later"},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(wait)},
+            )
+
+        # Verify and consume the code in one UPDATE
+        if not otp.consume(user, data["otp"]):
+            otp.record_failure(user.id)
+            return Response({"detail": "Invalid or expired OTP"}, status=status.HTTP_400_BAD_REQUEST)
+        otp.reset_failures(user.id)
+
+        refresh = MyTokenObtainPairSerializer.get_token(user)
+        return Response({
+            "refresh": str(refresh),
+            "access": str(refresh.access_token),
+        }, status=status.HTTP_200_OK)
+
+
 # ----------------------------
 # Product APIs
 # ----------------------------
@@ -201,9 +173,8 @@ class ProductListAPIView(APIView):
     logger = logging.getLogger(__name__)
 
     def get(self, request):
-        products = Product.objects.filter(farmer=request.user)
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
+        products = Product.objects.for_summary().filter(farmer=request.user)
+        return paginated_response(request, products, ProductSummarySerializer)
 
     def post(self, request):
         self.logger.debug(f"🟡 Incoming product data: {request.data}")
@@ -258,8 +229,7 @@ class TransporterListAPIView(APIView):
 
     def get(self, request):
         transporters = Transporter.objects.select_related("user").all()
-        serializer = TransporterSerializer(transporters, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginated_response(request, transporters, TransporterSerializer)
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -35,6 +35,7 @@ import { useRouter } from "next/navigation";
 import TopNavBar from "../../components/TopNavBar";
 import Footer from "../../components/FooterSection";
 import { jwtDecode } from "jwt-decode";
+import { fetchPage } from "@/utils/pagination";
 
 
 interface JwtPayload {
@@ -103,9 +104,12 @@ export default function Dashboard() {
   const [accessToken, setAccessToken] = useState<string | null>(null);
   const [products, setProducts] = useState<Product[]>([]);
   const [filteredProducts, setFilteredProducts] = useState<Product[]>([]);
+  const [productsNext, setProductsNext] = useState<string | null>(null);
   const [tips, setTips] = useState<Tip[]>([]);
+  const [tipsNext, setTipsNext] = useState<string | null>(null);
   const [wallet, setWallet] = useState<Wallet | null>(null); // ← NEW
   const [feedbacks, setFeedbacks] = useState<Feedback[]>([]);
+  const [feedbacksNext, setFeedbacksNext] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [activeSection, setActiveSection] = useState<string>("dashboard");
   const [searchQuery, setSearchQuery] = useState<string>("");
@@ -221,7 +225,8 @@ export default function Dashboard() {
   };
 
   // =================== FETCHERS ===================
-  const fetchProducts = async () => {
+  // Each list loads its first page; passing the saved `next` cursor appends the following one.
+  const fetchProducts = async (url?: string) => {
     setError(null);
     const token = await getValidAccessToken();
     if (!token) {
@@ -229,16 +234,19 @@ export default function Dashboard() {
       return;
     }
     try {
-      const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/products/`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
-      const data = await res.json();
-      if (!res.ok) {
-        console.error("Backend error fetching products:", data);
-        setError(data.detail || "Failed to fetch products");
+      let data: any[];
+      try {
+        const page = await fetchPage(url ?? `${process.env.NEXT_PUBLIC_API_URL}/products/`, {
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        data = page.results;
+        setProductsNext(page.next);
+      } catch (err: any) {
+        console.error("Backend error fetching products:", err);
+        setError(err.message || "Failed to fetch products");
         return;
       }
-      const formattedProducts = data.map((p: any) => ({
+      const formattedProducts: Product[] = data.map((p: any) => ({
         id: p.uid,
         name: p.title,
         product_type: p.variety,
@@ -246,13 +254,13 @@ export default function Dashboard() {
         acres: p.acres,
         status: p.status,
         pid: p.pid,
-        qr_code: p.qr_code_data,
+        qr_code: p.qr_code_url,
         harvested: false,
         stages: [],
         feedbacks: [],
       }));
-      setProducts(formattedProducts);
-      setFilteredProducts(formattedProducts);
+      // filteredProducts follows through the search effect
+      setProducts((prev) => (url ? [...prev, ...formattedProducts] : formattedProducts));
     } catch (err) {
       console.error("Error fetching products:", err);
       setError("Failed to load products. Please try again.");
@@ -274,33 +282,26 @@ export default function Dashboard() {
     }
   };
 
-  const fetchTips = async (token: string) => {
+  const fetchTips = async (token: string, url?: string) => {
     try {
-      const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/tips/received/`, {
+      const page = await fetchPage<Tip>(url ?? `${process.env.NEXT_PUBLIC_API_URL}/tips/received/`, {
         headers: { Authorization: `Bearer ${token}` },
       });
-      if (!res.ok) {
-        const err = await res.json();
-        console.error("Tips fetch error:", err);
-        throw new Error("Failed to fetch tips");
-      }
-      const data = await res.json();
-      console.log("Fetched tips:", data);
-      setTips(data || []);
+      setTips((prev) => (url ? [...prev, ...page.results] : page.results));
+      setTipsNext(page.next);
     } catch (err) {
       console.error("Error fetching tips:", err);
       setError("Failed to load tips. Please try again.");
     }
   };
 
-  const fetchFeedbacks = async (token: string) => {
+  const fetchFeedbacks = async (token: string, url?: string) => {
     try {
-      const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/feedbacks/`, {
+      const page = await fetchPage<Feedback>(url ?? `${process.env.NEXT_PUBLIC_API_URL}/feedbacks/`, {
         headers: { Authorization: `Bearer ${token}` },
       });
-      if (!res.ok) throw new Error("Failed to fetch feedbacks");
-      const data = await res.json();
-      setFeedbacks(data || []);
+      setFeedbacks((prev) => (url ? [...prev, ...page.results] : page.results));
+      setFeedbacksNext(page.next);
     } catch (err) {
       console.error("Error fetching feedbacks:", err);
       setError("Failed to load feedbacks. Please try again.");
@@ -658,6 +659,13 @@ export default function Dashboard() {
                 </motion.div>
               ))}
             </Box>
+            {productsNext && (
+              <Box sx={{ mt: 3, textAlign: "center" }}>
+                <Button variant="outlined" onClick={() => fetchProducts(productsNext)} sx={{ fontWeight: "600" }}>
+                  Load more products
+                </Button>
+              </Box>
+            )}
 
             {/* Product Details Dialog */}
             <Dialog open={openProductDialog} onClose={handleCloseProductDialog} maxWidth="md" fullWidth>
@@ -783,6 +791,11 @@ export default function Dashboard() {
                   </Card>
                 ))
               )}
+              {tipsNext && (
+                <Button variant="outlined" onClick={() => fetchTips(accessToken!, tipsNext)} sx={{ alignSelf: "center", fontWeight: "600" }}>
+                  Load more tips
+                </Button>
+              )}
             </Box>
           </Box>
         );
@@ -837,6 +850,11 @@ export default function Dashboard() {
                   </CardContent>
                 </Card>
               ))}
+              {feedbacksNext && (
+                <Button variant="outlined" onClick={() => fetchFeedbacks(accessToken!, feedbacksNext)} sx={{ alignSelf: "center", fontWeight: "600" }}>
+                  Load more feedback
+                </Button>
+              )}
             </Box>
           </Box>
         );
@@ -34,6 +34,7 @@ import TopNavBar from "@/app/components/TopNavBar";
 import Footer from "@/app/components/FooterSection";
 import { useParams, useRouter } from "next/navigation";
 import { jwtDecode } from "jwt-decode";
+import { fetchPage } from "@/utils/pagination";
 
 interface Farmer {
   first_name: string;
@@ -67,7 +68,7 @@ interface Product {
   acres: number;
   status: string; // "pending" | "approved" | "in_transit" | "rejected"
   description: string;
-  qr_code_data: string | null;
+  qr_code_url: string | null;
   images?: string[];
   farmer: Farmer;
   stages?: ProductStage[];
@@ -89,6 +90,7 @@ export default function ProductDetails() {
   const [review, setReview] = useState("");
   const [error, setError] = useState<string | null>(null);
   const [transporters, setTransporters] = useState<Transporter[]>([]);
+  const [transportersNext, setTransportersNext] = useState<string | null>(null);
   const [selectedTransporter, setSelectedTransporter] = useState<number | "">("");
   const [transporterNote, setTransporterNote] = useState("");
   const [allocating, setAllocating] = useState(false);
@@ -143,18 +145,17 @@ export default function ProductDetails() {
     }
   };
 
-  const fetchTransporters = async () => {
+  // first page by default; pass `transportersNext` to append the following one
+  const fetchTransporters = async (url?: string) => {
     const token = await getValidAccessToken();
     if (!token) return;
 
     try {
-      const res = await fetch(`${API_BASE}/transporters/`, {
+      const page = await fetchPage<Transporter>(url ?? `${API_BASE}/transporters/`, {
         headers: { Authorization: `Bearer ${token}` },
       });
-      if (res.ok) {
-        const data = await res.json();
-        setTransporters(data);
-      }
+      setTransporters((prev) => (url ? [...prev, ...page.results] : page.results));
+      setTransportersNext(page.next);
     } catch (err) {
       console.error("Failed to load transporters", err);
     }
@@ -625,7 +626,7 @@ export default function ProductDetails() {
               </Box>
 
               {/* QR Code */}
-              {product.qr_code_data && (
+              {product.qr_code_url && (
                 <Box sx={{ textAlign: "center", mb: 4 }}>
                   <Typography
                     sx={{
@@ -649,7 +650,7 @@ export default function ProductDetails() {
                     }}
                   >
                     <img
-                      src={product.qr_code_data}
+                      src={product.qr_code_url}
                       alt="QR Code"
                       style={{ width: "160px", height: "160px" }}
                     />
@@ -875,6 +876,14 @@ export default function ProductDetails() {
                 </MenuItem>
               ))}
             </Select>
+            {transportersNext && (
+              <Button
+                onClick={() => fetchTransporters(transportersNext)}
+                sx={{ mt: 1, alignSelf: "flex-start", color: "#1a3c34", fontWeight: 700 }}
+              >
+                Load more transporters
+              </Button>
+            )}
           </FormControl>
 
           <TextField
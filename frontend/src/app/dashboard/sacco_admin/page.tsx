@@ -28,6 +28,7 @@ import TopNavBar from "@/app/components/TopNavBar";
 import Footer from "@/app/components/FooterSection";
 import { jwtDecode } from "jwt-decode";
 import { useRouter } from "next/navigation";
+import { fetchPage } from "@/utils/pagination";
 
 interface Farmer {
   first_name: string;
@@ -63,6 +64,8 @@ interface AdminUser {
 
 export default function SaccoAdmin() {
   const [products, setProducts] = useState<Product[]>([]);
+  const [productsNext, setProductsNext] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [selectedProduct, setSelectedProduct] = useState<Product | null>(null);
   const [review, setReview] = useState("");
@@ -117,18 +120,21 @@ export default function SaccoAdmin() {
   /* --------------------------------------------------------------- */
   /* 2. FETCH PRODUCTS — NOW MATCHES DETAIL PAGE RESPONSE */
   /* --------------------------------------------------------------- */
-  const fetchProducts = async (token: string) => {
+  // first page by default; pass `productsNext` to append the following one
+  const fetchProducts = async (token: string, url?: string) => {
     setError(null);
     try {
-      const res = await fetch(`${API_BASE}/sacco_admin/products/`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
-      if (!res.ok) {
-        const err = await res.json();
-        setError(err.detail || "Failed to fetch products.");
+      let data: any[];
+      try {
+        const page = await fetchPage(url ?? `${API_BASE}/sacco_admin/products/`, {
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        data = page.results;
+        setProductsNext(page.next);
+      } catch (err: any) {
+        setError(err.message || "Failed to fetch products.");
         return;
       }
-      const data = await res.json();
 
       const mappedProducts: Product[] = data.map((p: any) => {
         const f = p.farmer || {};
@@ -149,12 +155,21 @@ export default function SaccoAdmin() {
         };
       });
 
-      setProducts(mappedProducts);
+      setProducts((prev) => (url ? [...prev, ...mappedProducts] : mappedProducts));
     } catch (err) {
       setError("Network error. Please try again.");
     }
   };
 
+  const loadMoreProducts = async () => {
+    if (!productsNext) return;
+    const token = await getValidAccessToken();
+    if (!token) return;
+    setLoadingMore(true);
+    await fetchProducts(token, productsNext);
+    setLoadingMore(false);
+  };
+
   /* --------------------------------------------------------------- */
   /* 3. FETCH STAGES */
   /* --------------------------------------------------------------- */
@@ -581,6 +596,19 @@ export default function SaccoAdmin() {
           </TableContainer>
         </Box>
 
+        {productsNext && (
+          <Box sx={{ textAlign: "center", mt: 3 }}>
+            <Button
+              variant="outlined"
+              onClick={loadMoreProducts}
+              disabled={loadingMore}
+              sx={{ color: "#1a3c34", borderColor: "#1a3c34", fontWeight: 700 }}
+            >
+              {loadingMore ? <CircularProgress size={18} /> : "Load more"}
+            </Button>
+          </Box>
+        )}
+
         {/* Empty State */}
         {products.length === 0 && !error && (
           <Box sx={{ textAlign: "center", py: 10 }}>
@@ -36,6 +36,7 @@ import { jwtDecode } from "jwt-decode";
 import html2canvas from "html2canvas";
 import jsPDF from "jspdf";
 import { initContracts, getBlockchainUtils } from "@/utils/blockchain";
+import { fetchPage } from "@/utils/pagination";
 
 const theme = createTheme({
   palette: {
@@ -90,6 +91,8 @@ interface JwtPayload { user_id: number; is_transporter?: boolean; exp: number; }
 export default function TransporterDashboard() {
   const [transporter, setTransporter] = useState<Transporter | null>(null);
   const [deliveries, setDeliveries] = useState<DeliveryRequest[]>([]);
+  const [deliveriesNext, setDeliveriesNext] = useState<string | null>(null);
+  const loadedMore = useRef(false);
   const [loading, setLoading] = useState(true);
   const [blockchainReady, setBlockchainReady] = useState(false);
   const [activeTab, setActiveTab] = useState(0);
@@ -147,15 +150,15 @@ export default function TransporterDashboard() {
     }
   };
 
-  const fetchDeliveries = async (token: string) => {
+  // first page by default; pass `deliveriesNext` to append the following one
+  const fetchDeliveries = async (token: string, url?: string) => {
     try {
       setError(null);
-      const res = await fetch(`${API_BASE}/logistics/transporters/me/products/`, {
+      const page = await fetchPage(url ?? `${API_BASE}/logistics/transporters/me/products/`, {
         headers: { Authorization: `Bearer ${token}` },
-      });
-      if (res.ok) {
-        const data = await res.json();
-        const mapped = data.map((p: any) => ({
+      }).catch(() => null);
+      if (page) {
+        const mapped: DeliveryRequest[] = page.results.map((p: any) => ({
           uid: p.uid,
           pid: p.pid,
           title: p.title,
@@ -169,7 +172,21 @@ export default function TransporterDashboard() {
           transporter_note: p.transporter_note,
           status: p.status,
         }));
-        setDeliveries(mapped);
+        if (url) {
+          loadedMore.current = true;
+          setDeliveries(prev => [...prev, ...mapped.filter(d => !prev.some(p => p.uid === d.uid))]);
+          setDeliveriesNext(page.next);
+        } else if (loadedMore.current) {
+          // refreshes re-read the first page only; rows from later pages stay as loaded
+          const fresh = new Map(mapped.map(d => [d.uid, d]));
+          setDeliveries(prev => [
+            ...mapped.filter(d => !prev.some(p => p.uid === d.uid)),
+            ...prev.map(d => fresh.get(d.uid) ?? d),
+          ]);
+        } else {
+          setDeliveries(mapped);
+          setDeliveriesNext(page.next);
+        }
       } else {
         setError("Failed to load deliveries");
       }
@@ -180,6 +197,12 @@ export default function TransporterDashboard() {
     }
   };
 
+  const loadMoreDeliveries = async () => {
+    const token = localStorage.getItem("access");
+    if (!token || !deliveriesNext) return;
+    await fetchDeliveries(token, deliveriesNext);
+  };
+
   // FIXED: Now syncs with backend so status NEVER reverts
   const handleAccept = async (uid: string) => {
     if (!blockchainReady) return alert("Blockchain still loading...");
@@ -474,6 +497,14 @@ export default function TransporterDashboard() {
               )}
             </Box>
 
+            {deliveriesNext && (
+              <Box sx={{ mt: 3, textAlign: "center" }}>
+                <Button onClick={loadMoreDeliveries} sx={{ color: "#1a3c34", border: "1px solid #1a3c34", fontWeight: 600 }}>
+                  Load more deliveries
+                </Button>
+              </Box>
+            )}
+
             <Box sx={{ mt: 3, textAlign: "center" }}>
               <Button startIcon={<Stamp size={18} />} onClick={handleDownloadPDF} sx={{ color: "#1a3c34", border: "1px solid #1a3c34", fontWeight: 600 }}>
                 Download Dispatch Report (PDF)
@@ -21,7 +21,7 @@ interface Product {
   title: string;
   status: string;
   pid: string;
-  qr_code_data?: string;
+  qr_code_url?: string;
   tx_hash?: string;
   farmer?: { name: string; location: string };
 }
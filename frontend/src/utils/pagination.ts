@@ -0,0 +1,22 @@
+// src/utils/pagination.ts
+
+// List endpoints return { next, previous, results } pages (keyset cursors).
+// fetchPage loads one of them; callers keep `next` and ask for it only when
+// the user wants more rows ("Load more"), so a dashboard never pulls a whole
+// table. Endpoints that still answer with a plain array come back as a
+// single page with no `next`.
+export interface Page<T> {
+  results: T[];
+  next: string | null;
+}
+
+export async function fetchPage<T = any>(url: string, init?: RequestInit): Promise<Page<T>> {
+  const res = await fetch(url, init);
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.detail || `Request failed (${res.status})`);
+  }
+  const data = await res.json();
+  if (Array.isArray(data)) return { results: data, next: null };
+  return { results: data.results ?? [], next: data.next ?? null };
+}